@@ -0,0 +1,311 @@
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import typer
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SEED = 20240601
+MB = 1 << 20
+TUI_SCREENS = ["create", "run", "test", "iotest", "config"]
+
+# Importing main.py must stay cheap: commands import what they use
+IMPORT_BUDGET_MS = 150
+EAGER_IMPORT_BLOCKLIST = ["yaml", "src.contest", "textual", "rich.table"]
+
+app = typer.Typer()
+
+
+@dataclass
+class Measurement:
+    samples: List[float]
+    unit: str = "s"
+    params: Dict[str, object] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "unit": self.unit,
+            "min": min(self.samples),
+            "median": statistics.median(self.samples),
+            "mean": statistics.fmean(self.samples),
+            "max": max(self.samples),
+            "samples": self.samples,
+            **({"params": self.params} if self.params else {}),
+        }
+
+
+def timed(function: Callable[[], object], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+@contextmanager
+def workspace() -> Iterator[Path]:
+    """Run inside a scratch copy of the config and templates."""
+    previous = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix="seepee-bench-") as directory:
+        directory = Path(directory)
+        shutil.copytree(ROOT / "config", directory / "config")
+        shutil.copytree(ROOT / "templates", directory / "templates")
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(previous)
+
+
+def make_output(size: int) -> str:
+    rng = random.Random(SEED)
+    lines = []
+    length = 0
+    while length < min(size, MB):
+        line = " ".join(str(rng.randrange(10**9)) for _ in range(8)) + "\n"
+        lines.append(line)
+        length += len(line)
+    block = "".join(lines)
+    return (block * (size // len(block) + 1))[:size]
+
+
+def bench_cli_startup(repeat: int) -> Measurement:
+    command = [sys.executable, str(ROOT / "main.py"), "--help"]
+    return Measurement(
+        timed(lambda: subprocess.run(command, capture_output=True, check=True), repeat),
+        params={"command": "main.py --help"},
+    )
+
+
+def parse_import_times(report: str) -> Dict[str, int]:
+    """Map each top-level module in a -X importtime report to its cumulative µs."""
+    times = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def bench_import_main(repeat: int) -> Measurement:
+    samples = []
+    modules = set()
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import main"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(sum(parse_import_times(result.stderr).values()) / 1e6)
+        modules = {
+            line.split("|")[2].strip()
+            for line in result.stderr.splitlines()
+            if line.startswith("import time:") and line.count("|") == 2
+        }
+    blocked = sorted(
+        module
+        for module in modules
+        if any(
+            module == name or module.startswith(f"{name}.")
+            for name in EAGER_IMPORT_BLOCKLIST
+        )
+    )
+    return Measurement(
+        samples, params={"budget_ms": IMPORT_BUDGET_MS, "eager_imports": blocked}
+    )
+
+
+def check_import_budget(measurement: Measurement) -> List[str]:
+    problems = []
+    median_ms = statistics.median(measurement.samples) * 1000
+    if median_ms > IMPORT_BUDGET_MS:
+        problems.append(
+            f"importing main.py took {median_ms:.0f} ms, "
+            f"over the {IMPORT_BUDGET_MS} ms budget"
+        )
+    for module in measurement.params["eager_imports"]:
+        problems.append(f"importing main.py eagerly imports {module}")
+    return problems
+
+
+def bench_manager_cold(repeat: int) -> Measurement:
+    code = "from src.contest import ContestManager; ContestManager()"
+    command = [sys.executable, "-c", code]
+    paths = [str(ROOT), os.environ.get("PYTHONPATH")]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, paths))}
+    return Measurement(
+        timed(lambda: subprocess.run(command, env=env, check=True), repeat),
+        params={"includes": "interpreter start and imports"},
+    )
+
+
+def bench_manager_init(repeat: int) -> Measurement:
+    from src.contest import ContestManager
+
+    return Measurement(timed(ContestManager, repeat))
+
+
+def bench_config_load(repeat: int) -> Measurement:
+    from src.config import Config
+
+    config = Config()
+    return Measurement(timed(config.load_config, repeat))
+
+
+def bench_create_problems(repeat: int) -> Measurement:
+    from src.contest import ContestManager
+
+    manager = ContestManager()
+    problems = list(string.ascii_uppercase)
+    counter = iter(range(repeat))
+
+    def create() -> None:
+        contest_dir = manager.create_contest_dir(f"bench{next(counter)}")
+        manager.create_problem_files(contest_dir, problems)
+
+    return Measurement(timed(create, repeat), params={"problems": len(problems)})
+
+
+def bench_verify_output(repeat: int, size: int) -> Measurement:
+    from src.contest import ContestManager
+
+    manager = ContestManager()
+    actual = make_output(size)
+    expected = actual[:-1] + "\n"
+    return Measurement(
+        timed(lambda: manager.verify_output(actual, expected), repeat),
+        params={"bytes": size},
+    )
+
+
+def bench_tui_push(repeat: int) -> Dict[str, Measurement]:
+    from src.tui import SeePeeTUI
+
+    samples: Dict[str, List[float]] = {name: [] for name in TUI_SCREENS}
+
+    async def measure() -> None:
+        tui = SeePeeTUI()
+        async with tui.run_test() as pilot:
+            await pilot.pause()
+            for name in TUI_SCREENS:
+                start = time.perf_counter()
+                await tui.push_screen(name)
+                await pilot.pause()
+                samples[name].append(time.perf_counter() - start)
+                tui.pop_screen()
+                await pilot.pause()
+
+    for _ in range(repeat):
+        asyncio.run(measure())
+    return {f"tui_push_{name}": Measurement(samples[name]) for name in TUI_SCREENS}
+
+
+def environment() -> Dict[str, object]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "seed": SEED,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+@app.command()
+def main(
+    repeat: int = typer.Option(5, "--repeat", "-r", help="Samples per benchmark"),
+    quick: bool = typer.Option(False, "--quick", help="Skip the 100 MB comparison"),
+    only: Optional[List[str]] = typer.Option(
+        None, "--only", help="Run only benchmarks whose name starts with this"
+    ),
+    output: Optional[Path] = typer.Option(
+        None, "--output", "-o", help="Write the JSON report to this file"
+    ),
+    check: bool = typer.Option(
+        False, "--check", help="Fail if importing main.py is over its budget"
+    ),
+):
+    """Measure SeePee's own overhead and print a JSON report."""
+
+    benchmarks: Dict[str, Callable[[], object]] = {
+        "import_main": lambda: bench_import_main(repeat),
+        "cli_startup": lambda: bench_cli_startup(repeat),
+        "manager_cold": lambda: bench_manager_cold(repeat),
+        "manager_init": lambda: bench_manager_init(repeat),
+        "config_load": lambda: bench_config_load(repeat),
+        "create_problems": lambda: bench_create_problems(repeat),
+        "verify_output_1mb": lambda: bench_verify_output(repeat, MB),
+        "verify_output_100mb": lambda: bench_verify_output(repeat, 100 * MB),
+        "tui_push": lambda: bench_tui_push(repeat),
+    }
+    if quick:
+        del benchmarks["verify_output_100mb"]
+    if check and only:
+        only.append("import_main")
+
+    results: Dict[str, Measurement] = {}
+    with workspace():
+        for name, run in benchmarks.items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            typer.echo(f"Running {name}...", err=True)
+            measured = run()
+            if isinstance(measured, dict):
+                results.update(measured)
+            else:
+                results[name] = measured
+
+    report = json.dumps(
+        {
+            "environment": environment(),
+            "benchmarks": {name: m.to_dict() for name, m in results.items()},
+        },
+        indent=2,
+    )
+    if output is None:
+        typer.echo(report)
+    else:
+        output.write_text(report + "\n")
+
+    if check:
+        problems = check_import_budget(results["import_main"])
+        for problem in problems:
+            typer.echo(f"Import budget: {problem}", err=True)
+        if problems:
+            raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    app()
@@ -1,15 +1,58 @@
+import time
 import typer
-import click
 from pathlib import Path
 from typing import Optional, List
-from rich import print
-from rich.console import Console
-from rich.table import Table
-from src.contest import ContestManager
+from src.lazy import Lazy
+
+# Commands import what they need so that startup, --help and the TUI do not
+# pay for Rich tables, YAML or the contest manager up front
+
+
+def make_console():
+    from rich.console import Console
+
+    return Console()
+
+
+def make_manager():
+    from src.contest import ContestManager
+
+    return ContestManager()
+
+
+def resolve_profile(profile: Optional[str]) -> Optional[str]:
+    """Exit with an error if a compile profile is not configured."""
+    if profile is None:
+        profile = manager.config.get_default_profile()
+    profiles = manager.config.get_compile_profiles()
+    if profile is not None and profile not in profiles:
+        available = ", ".join(profiles) or "none configured"
+        console.print(
+            f"[red]Unknown compile profile '{profile}' (available: {available})[/red]"
+        )
+        raise typer.Exit(1)
+    return profile
+
+
+def print_regression(problem: str, comparison) -> None:
+    """Print which tests got slower in a problem's latest source version."""
+    from src.process import format_time
+
+    console.print(
+        f"[red]⚠ Problem {problem}: version {comparison.version.source_hash[:8]} is "
+        f"{comparison.ratio - 1:.0%} slower than {comparison.baseline.source_hash[:8]} "
+        f"on {len(comparison.tests)} shared tests[/red]"
+    )
+    for regression in comparison.regressions:
+        console.print(
+            f"[red]  {regression.test}: {format_time(regression.before)} → "
+            f"{format_time(regression.after)} ({regression.ratio:.2f}x)[/red]"
+        )
+
 
 app = typer.Typer()
-console = Console()
-manager = ContestManager()
+console = Lazy(make_console)
+manager = Lazy(make_manager)
 
 
 @app.command()
@@ -18,8 +61,28 @@ def create(
     problems: str = typer.Argument(
         "A-F", help="Problem range (e.g., 'A-D' or 'A,B,C')"
     ),
+    warm: Optional[bool] = typer.Option(
+        None,
+        "--warm/--no-warm",
+        help="Precompile the template in the background (default: warm_up.enabled)",
+    ),
+    count: int = typer.Option(
+        1,
+        "--count",
+        "-n",
+        min=1,
+        help="Create this many consecutive contests, e.g. abc300 to abc309",
+    ),
 ):
     """Create a new contest directory with problem files."""
+    from rich.table import Table
+    from src.scaffold import contest_series
+
+    try:
+        contests = contest_series(contest, count)
+    except ValueError as error:
+        console.print(f"[red]{error}[/red]")
+        raise typer.Exit(1)
 
     if "-" in problems:
         start, end = problems.split("-")
@@ -48,10 +111,12 @@ def create(
     else:
         template_name = None
 
-    contest_dir = manager.create_contest_dir(contest)
-    manager.create_problem_files(contest_dir, problems_list, template_name)
+    workspace = manager.config.get_workspace_path()
+    contest_dirs = [workspace / name for name in contests]
+    manager.create_contests(contest_dirs, problems_list, template_name)
 
-    table = Table(title=f"Contest {contest} Created")
+    title = f"Contest {contest}" if count == 1 else f"Contests {contest}-{contests[-1]}"
+    table = Table(title=f"{title} Created")
     table.add_column("Problem", style="cyan")
     table.add_column("Files Created", style="green")
     table.add_column("Template", style="yellow")
@@ -65,15 +130,71 @@ def create(
 
     console.print(table)
 
+    if warm is None:
+        warm = manager.config.get_warm_up_enabled()
+    if warm:
+        # The first contest of a series is the one about to be solved
+        manager.start_warm_up(contest_dirs[0], resolve_profile(None))
+        console.print("[yellow]Warming up the compile cache in the background[/yellow]")
+
 
 @app.command()
-def run(contest: str, problem: str, input_content: Optional[str] = None):
+def warm(
+    contest: str,
+    profile: Optional[str] = typer.Option(
+        None, "--profile", "-p", help="Compile profile from compile.profiles"
+    ),
+):
+    """Build the precompiled header and compile a contest's problems into the cache."""
+    from rich.table import Table
+    from src.process import format_time
+
+    contest_dir = Path(contest)
+    if not contest_dir.exists():
+        console.print(f"[red]Contest directory '{contest}' not found!")
+        raise typer.Exit(1)
+
+    results = manager.warm_up(contest_dir, resolve_profile(profile))
+    table = Table(title=f"Contest {contest} Warm-up")
+    table.add_column("Problems", style="cyan")
+    table.add_column("Compile")
+    for problems, compiled in results:
+        if not compiled.success:
+            status = "[red]error[/red]"
+        elif compiled.cached:
+            status = "[green]cached[/green]"
+        else:
+            status = f"[green]{format_time(compiled.compile_time)}[/green]"
+        table.add_row(", ".join(problems), status)
+    console.print(table)
+
+
+@app.command()
+def run(
+    contest: str,
+    problem: str,
+    input_content: Optional[str] = None,
+    time_limit: Optional[float] = typer.Option(
+        None, "--time-limit", "-t", help="Time limit in seconds"
+    ),
+    memory_limit: Optional[int] = typer.Option(
+        None, "--memory-limit", "-m", help="Memory limit in MB"
+    ),
+    profile: Optional[str] = typer.Option(
+        None, "--profile", "-p", help="Compile profile from compile.profiles"
+    ),
+):
     """Compile and run a specific problem from a contest."""
+    from rich.table import Table
+    from rich.text import Text
+    from src.judge import Verdict, describe_verdict, judge
+    from src.process import format_memory, format_time
 
     contest_dir = Path(contest)
     if not contest_dir.exists():
         console.print(f"[red]Contest directory '{contest}' not found!")
         raise typer.Exit(1)
+    profile = resolve_profile(profile)
 
     problem_path = contest_dir / manager.config.get_problem_file_name(problem)
     input_path = contest_dir / manager.config.get_input_file_name(problem)
@@ -85,62 +206,404 @@ def run(contest: str, problem: str, input_content: Optional[str] = None):
     console.print(
         f"\n[yellow]Running problem {problem} from contest {contest}[/yellow]"
     )
-    output, error, success = manager.compile_and_run(problem_path, input_path)
+    limits = manager.get_limits(contest_dir, problem, time_limit, memory_limit, profile)
+    compiled, result = manager.compile_and_run(
+        problem_path, input_path, limits, profile=profile
+    )
+    if result is not None:
+        manager.record_run(
+            contest_dir, problem, compiled, input_path, result, limits, profile
+        )
 
-    if success:
+    if result is not None and result.success:
         console.print("\n[green]Compilation successful![/green]")
         console.print("\n[bold]Output:[/bold]")
-        console.print(output)
+        console.print(Text(manager.preview(result.captured_stdout)))
     else:
         console.print("\n[red]Compilation/Runtime Error:[/red]")
-        console.print(error)
+        if result is None:
+            console.print(Text(compiled.error))
+        else:
+            console.print(Text(manager.preview(result.captured_stderr)))
+            console.print(f"[red]{result.exit_description}[/red]")
+
+    if result is not None:
+        verdict = judge(result, limits, matches=True)
+        if verdict in (Verdict.TLE, Verdict.MLE):
+            console.print(f"\n[red]{describe_verdict(verdict)}[/red]")
+
+    table = Table(title="Resources")
+    table.add_column("Compile", style="cyan")
+    table.add_column("Wall Time", style="green")
+    table.add_column("CPU Time (user + sys)", style="green")
+    table.add_column("Peak Memory", style="yellow")
+    compile_time = "cached" if compiled.cached else format_time(compiled.compile_time)
+    if result is None:
+        table.add_row(compile_time, "-", "-", "-")
+    else:
+        table.add_row(
+            compile_time,
+            format_time(result.wall_time),
+            f"{format_time(result.cpu_time)} "
+            f"({format_time(result.user_time)} + {format_time(result.sys_time)})",
+            format_memory(result.max_rss_kb),
+        )
+    console.print(table)
 
 
 @app.command()
-def test(contest: str, problem: str):
-    """Run a problem and verify output against expected output file."""
+def test(
+    contest: str,
+    problem: Optional[str] = typer.Argument(
+        None, help="Problem to test (default: every problem in the contest)"
+    ),
+    time_limit: Optional[float] = typer.Option(
+        None, "--time-limit", "-t", help="Time limit in seconds"
+    ),
+    memory_limit: Optional[int] = typer.Option(
+        None, "--memory-limit", "-m", help="Memory limit in MB"
+    ),
+    compare: Optional[str] = typer.Option(
+        None,
+        "--compare",
+        "-c",
+        help="Output comparison mode: exact/tokens/whitespace/float",
+    ),
+    profile: Optional[str] = typer.Option(
+        None, "--profile", "-p", help="Compile profile from compile.profiles"
+    ),
+):
+    """Run a problem against all of its test cases and verify the outputs."""
+    from rich.table import Table
+    from rich.text import Text
+    from src.diff import render_side
+    from src.process import format_memory, format_time
 
     contest_dir = Path(contest)
+    if not contest_dir.exists():
+        console.print(f"[red]Contest directory '{contest}' not found!")
+        raise typer.Exit(1)
+
+    profile = resolve_profile(profile)
+    if problem is None:
+        test_contest(contest_dir, time_limit, memory_limit, compare, profile)
+        return
+
     problem_path = contest_dir / manager.config.get_problem_file_name(problem)
-    input_path = contest_dir / manager.config.get_input_file_name(problem)
-    output_path = contest_dir / manager.config.get_output_file_name(problem)
+    cases = manager.discover_tests(contest_dir, problem)
+    if not cases:
+        console.print(f"\n[red]No test cases found for problem {problem}![/red]")
+        raise typer.Exit(1)
+
+    for case in cases:
+        if not case.output_path.exists():
+            console.print(
+                f"\n[yellow]Warning: Expected output file {case.output_path} not found![/yellow]"
+            )
+            console.print(
+                "[yellow]Creating empty output file. Please add expected output to this file.[/yellow]"
+            )
+            case.output_path.touch()
+
+    compiled = manager.compile(problem_path, profile=profile)
+    if not compiled.success:
+        console.print("\n[red]Compilation Error:[/red]")
+        console.print(Text(compiled.error))
+        raise typer.Exit(1)
 
-    if not output_path.exists():
+    compile_time = "cached" if compiled.cached else format_time(compiled.compile_time)
+    limits = manager.get_limits(contest_dir, problem, time_limit, memory_limit, profile)
+    console.print(f"\n[cyan]Compile time: {compile_time}[/cyan]")
+    console.print(
+        f"[cyan]Limits: {format_time(limits.time)}, {limits.memory} MB[/cyan]"
+    )
+    try:
+        options = manager.get_compare_options(contest_dir, problem, compare)
+    except ValueError:
         console.print(
-            f"\n[yellow]Warning: Expected output file {output_path} not found![/yellow]"
+            "[red]Invalid comparison mode. Use 'exact', 'tokens', 'whitespace' or 'float'[/red]"
         )
+        raise typer.Exit(1)
+    if options.checker is not None:
+        console.print(f"[cyan]Checker: {options.checker.name}[/cyan]")
+    results = manager.run_tests(compiled.executable, cases, limits, options)
+    manager.record_results(contest_dir, problem, compiled, results, profile)
+    passed = sum(result.passed for result in results)
+
+    if passed == len(results):
+        console.print(f"\n[green]✓ All {len(results)} test cases passed![/green]")
+    else:
         console.print(
-            "[yellow]Creating empty output file. Please add expected output to this file.[/yellow]"
+            f"\n[red]✗ {len(results) - passed} of {len(results)} test cases failed![/red]"
         )
-        output_path.touch()
-        raise typer.Exit(1)
 
-    with open(output_path) as f:
-        expected_output = f.read()
+    table = Table(title="Output Comparison")
+    table.add_column("Case", style="cyan")
+    table.add_column("Result")
+    table.add_column("Expected", style="green")
+    table.add_column("Got")
+    table.add_column("Time", style="yellow")
+    table.add_column("CPU", style="yellow")
+    table.add_column("Memory", style="yellow")
+    for result in results:
+        status = Text(
+            f"{'✓' if result.passed else '✗'} {result.status}",
+            style="green" if result.passed else "red",
+        )
+        expected = Text(result.expected)
+        got = Text(
+            result.output if result.success else result.error,
+            style="blue" if result.passed else "red",
+        )
+        if result.diff is not None:
+            expected = render_side(result.diff.expected, "green")
+            got = render_side(result.diff.actual, "red")
+        table.add_row(
+            result.case.name,
+            status,
+            expected,
+            got,
+            format_time(result.process.wall_time),
+            format_time(result.process.cpu_time),
+            format_memory(result.process.max_rss_kb),
+        )
+    console.print(table)
+
+    comparison = manager.find_regression(contest_dir, problem)
+    if comparison is not None:
+        print_regression(problem, comparison)
 
-    output, error, success = manager.compile_and_run(problem_path, input_path)
-    if not success:
-        console.print("\n[red]Compilation/Runtime Error:[/red]")
-        console.print(error)
+
+def test_contest(
+    contest_dir: Path,
+    time_limit: Optional[float],
+    memory_limit: Optional[int],
+    compare: Optional[str],
+    profile: Optional[str],
+):
+    """Compile every problem of a contest concurrently and test them all."""
+    from rich.table import Table
+    from rich.text import Text
+    from src.process import format_memory, format_time
+
+    problems = manager.discover_problems(contest_dir)
+    if not problems:
+        console.print(f"\n[red]No problems found in contest {contest_dir}![/red]")
         raise typer.Exit(1)
 
-    if manager.verify_output(output, expected_output):
-        console.print("\n[green]✓ Output matches expected output![/green]")
-    else:
-        console.print("\n[red]✗ Output does not match expected output![/red]")
+    try:
+        settings = [
+            (
+                manager.get_limits(
+                    contest_dir, problem, time_limit, memory_limit, profile
+                ),
+                manager.get_compare_options(contest_dir, problem, compare),
+            )
+            for problem in problems
+        ]
+    except ValueError:
+        console.print(
+            "[red]Invalid comparison mode. Use 'exact', 'tokens', 'whitespace' or 'float'[/red]"
+        )
+        raise typer.Exit(1)
 
-    table = Table(title="Output Comparison")
-    table.add_column("Expected", style="green")
-    table.add_column(
-        "Got", style="blue" if manager.verify_output(output, expected_output) else "red"
+    console.print(
+        f"\n[yellow]Compiling {len(problems)} problems from contest {contest_dir}[/yellow]"
+    )
+    compiled = manager.compile_all(
+        [contest_dir / manager.config.get_problem_file_name(p) for p in problems],
+        profile,
     )
-    table.add_row(expected_output, output)
+
+    batches = []
+    for problem, result, (limits, options) in zip(problems, compiled, settings):
+        cases = []
+        if result.success:
+            cases = [
+                case
+                for case in manager.discover_tests(contest_dir, problem)
+                if case.output_path.exists()
+            ]
+        batches.append((result.executable, cases, limits, options))
+    results = manager.run_test_batches(batches)
+    for problem, result, problem_results in zip(problems, compiled, results):
+        if result.success:
+            manager.record_results(
+                contest_dir, problem, result, problem_results, profile
+            )
+
+    table = Table(title=f"Contest {contest_dir}")
+    table.add_column("Problem", style="cyan")
+    table.add_column("Compile", style="yellow")
+    table.add_column("Passed")
+    table.add_column("Verdicts")
+    table.add_column("Slowest", style="yellow")
+    table.add_column("Memory", style="yellow")
+    all_passed = True
+    for problem, result, problem_results in zip(problems, compiled, results):
+        if not result.success:
+            all_passed = False
+            table.add_row(
+                problem, Text("✗ Compilation Error", style="red"), "-", "", "-", "-"
+            )
+            continue
+
+        compile_time = "cached" if result.cached else format_time(result.compile_time)
+        if not problem_results:
+            table.add_row(problem, compile_time, Text("no tests", style="yellow"))
+            continue
+
+        passed = sum(r.passed for r in problem_results)
+        all_passed = all_passed and passed == len(problem_results)
+        verdicts = Text()
+        for r in problem_results:
+            verdicts.append(f"{r.verdict.value} ", style="green" if r.passed else "red")
+        table.add_row(
+            problem,
+            compile_time,
+            Text(
+                f"{passed}/{len(problem_results)}",
+                style="green" if passed == len(problem_results) else "red",
+            ),
+            verdicts,
+            format_time(max(r.process.wall_time for r in problem_results)),
+            format_memory(max(r.process.max_rss_kb for r in problem_results)),
+        )
     console.print(table)
 
+    if all_passed:
+        console.print("[green]✓ All problems passed![/green]")
+    else:
+        console.print("[red]✗ Some problems failed![/red]")
+
+    for problem, result in zip(problems, compiled):
+        comparison = (
+            manager.find_regression(contest_dir, problem) if result.success else None
+        )
+        if comparison is not None:
+            print_regression(problem, comparison)
+
+
+@app.command()
+def watch(
+    contest: str,
+    problem: str,
+    time_limit: Optional[float] = typer.Option(
+        None, "--time-limit", "-t", help="Time limit in seconds"
+    ),
+    memory_limit: Optional[int] = typer.Option(
+        None, "--memory-limit", "-m", help="Memory limit in MB"
+    ),
+    compare: Optional[str] = typer.Option(
+        None,
+        "--compare",
+        "-c",
+        help="Output comparison mode: exact/tokens/whitespace/float",
+    ),
+    profile: Optional[str] = typer.Option(
+        None, "--profile", "-p", help="Compile profile from compile.profiles"
+    ),
+):
+    """Recompile and retest a problem every time its source or tests change."""
+    from src.watch import Watcher
+
+    contest_dir = Path(contest)
+    if not contest_dir.exists():
+        console.print(f"[red]Contest directory '{contest}' not found!")
+        raise typer.Exit(1)
+
+    problem_path = contest_dir / manager.config.get_problem_file_name(problem)
+    if not problem_path.exists():
+        console.print(f"[red]Problem {problem} not found in contest {contest}!")
+        raise typer.Exit(1)
+    profile = resolve_profile(profile)
+
+    watcher = Watcher.for_problem(manager.config, contest_dir, problem)
+    console.print(
+        f"\n[yellow]Watching problem {problem} from contest {contest} "
+        f"({watcher.backend_name}). Press Ctrl+C to stop.[/yellow]"
+    )
+    try:
+        while True:
+            watch_cycle(
+                contest_dir, problem, time_limit, memory_limit, compare, profile
+            )
+            watcher.wait()
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Stopped watching.[/yellow]")
+    finally:
+        watcher.close()
+
+
+def watch_cycle(
+    contest_dir: Path,
+    problem: str,
+    time_limit: Optional[float],
+    memory_limit: Optional[int],
+    compare: Optional[str],
+    profile: Optional[str],
+):
+    """Compile and test a problem once, printing a single summary line."""
+    from rich.text import Text
+    from src.process import format_time
+
+    stamp = f"[dim]{time.strftime('%H:%M:%S')}[/dim]"
+    problem_path = contest_dir / manager.config.get_problem_file_name(problem)
+    cases = [
+        case
+        for case in manager.discover_tests(contest_dir, problem)
+        if case.output_path.exists()
+    ]
+    if not cases:
+        console.print(f"{stamp} [yellow]No test cases with expected output[/yellow]")
+        return
+
+    try:
+        limits = manager.get_limits(
+            contest_dir, problem, time_limit, memory_limit, profile
+        )
+        options = manager.get_compare_options(contest_dir, problem, compare)
+    except (ValueError, KeyError, TypeError) as e:
+        console.print(f"{stamp} [red]Invalid contest settings: {e}[/red]")
+        return
+
+    compiled = manager.compile(problem_path, profile=profile)
+    if not compiled.success:
+        console.print(f"{stamp} [red]✗ Compilation Error[/red]")
+        console.print(Text(compiled.error))
+        return
+
+    results = manager.run_tests(compiled.executable, cases, limits, options)
+    manager.record_results(contest_dir, problem, compiled, results, profile)
+    passed = sum(result.passed for result in results)
+    compile_time = "cached" if compiled.cached else format_time(compiled.compile_time)
+    slowest = max(result.process.wall_time for result in results)
+    line = Text.from_markup(f"{stamp} ")
+    if passed == len(results):
+        line.append(f"✓ {passed}/{len(results)} passed", style="green")
+    else:
+        line.append(f"✗ {passed}/{len(results)} passed", style="red")
+    line.append(f" | compile {compile_time} | slowest {format_time(slowest)}")
+    failures = [
+        f"{result.case.name} {result.verdict.value}"
+        for result in results
+        if not result.passed
+    ]
+    if failures:
+        line.append(f" | {', '.join(failures)}", style="red")
+    comparison = manager.find_regression(contest_dir, problem)
+    if comparison is not None:
+        line.append(
+            f" | {comparison.ratio - 1:.0%} slower than the previous version",
+            style="red",
+        )
+    console.print(line)
+
 
 @app.command()
 def iotest(contest: str, problem: str):
-    """Interactively add input and expected output for a problem."""
+    """Interactively add a test case to a problem's packed test store."""
+    from rich.table import Table
 
     contest_dir = Path(contest)
     if not contest_dir.exists():
@@ -172,8 +635,6 @@ def iotest(contest: str, problem: str):
         raise typer.Exit(1)
 
     input_text = "\n".join(input_content)
-    manager.write_input(contest_dir, problem, input_text)
-    console.print("\n[green]Test input saved successfully![/green]")
 
     console.print(
         "\n[yellow]Paste your expected output below (press Ctrl+D or Ctrl+Z on Windows when done):[/yellow]"
@@ -190,14 +651,13 @@ def iotest(contest: str, problem: str):
         console.print("\n[red]Output cancelled![/red]")
         raise typer.Exit(1)
 
-    if output_content:
-        output_text = "\n".join(output_content)
-        manager.write_output(contest_dir, problem, output_text)
-        console.print("\n[green]Expected output saved successfully![/green]")
-    else:
+    output_text = "\n".join(output_content)
+    if not output_content:
         console.print(
-            "\n[yellow]No expected output provided. You can add it later.[/yellow]"
+            "\n[yellow]No expected output provided, so the test expects none.[/yellow]"
         )
+    case = manager.add_test_case(contest_dir, problem, input_text, output_text)
+    console.print(f"\n[green]Test case saved as {case.name}![/green]")
 
     table = Table(title=f"Test Case for Problem {problem}")
     table.add_column("Type", style="cyan")
@@ -208,7 +668,556 @@ def iotest(contest: str, problem: str):
     console.print(table)
 
     if output_content and typer.confirm("\nWould you like to test the solution now?"):
-        test(contest, problem)
+        test(contest, problem, None, None, None, None)
+
+
+@app.command()
+def stress(
+    contest: str,
+    problem: str,
+    iterations: int = typer.Option(
+        1000, "--iterations", "-n", help="Number of random tests to run"
+    ),
+    workers: Optional[int] = typer.Option(
+        None, "--workers", "-w", help="Number of tests to run in parallel"
+    ),
+    seed: int = typer.Option(1, "--seed", "-s", help="Seed of the first test"),
+    generator: Optional[str] = typer.Option(
+        None, "--generator", "-g", help="Generator source file"
+    ),
+    brute: Optional[str] = typer.Option(
+        None, "--brute", "-b", help="Brute-force solution source file"
+    ),
+    time_limit: Optional[float] = typer.Option(
+        None, "--time-limit", "-t", help="Time limit in seconds"
+    ),
+    memory_limit: Optional[int] = typer.Option(
+        None, "--memory-limit", "-m", help="Memory limit in MB"
+    ),
+    compare: Optional[str] = typer.Option(
+        None,
+        "--compare",
+        "-c",
+        help="Output comparison mode: exact/tokens/whitespace/float",
+    ),
+    profile: Optional[str] = typer.Option(
+        None, "--profile", "-p", help="Compile profile from compile.profiles"
+    ),
+):
+    """Compare a solution against a brute force on generated tests."""
+    from rich.progress import Progress
+    from rich.table import Table
+    from rich.text import Text
+    from src.diff import first_divergence, render_side
+    from src.judge import describe_verdict
+    from src.stress import StressTester
+
+    contest_dir = Path(contest)
+    if not contest_dir.exists():
+        console.print(f"[red]Contest directory '{contest}' not found!")
+        raise typer.Exit(1)
+
+    sources = {
+        "Solution": contest_dir / manager.config.get_problem_file_name(problem),
+        "Brute": (
+            Path(brute)
+            if brute
+            else contest_dir / manager.config.get_brute_file_name(problem)
+        ),
+        "Generator": (
+            Path(generator)
+            if generator
+            else contest_dir / manager.config.get_generator_file_name(problem)
+        ),
+    }
+    for name, path in sources.items():
+        if not path.exists():
+            console.print(f"[red]{name} file {path} not found!")
+            raise typer.Exit(1)
+
+    try:
+        options = manager.get_compare_options(contest_dir, problem, compare)
+    except ValueError:
+        console.print(
+            "[red]Invalid comparison mode. Use 'exact', 'tokens', 'whitespace' or 'float'[/red]"
+        )
+        raise typer.Exit(1)
+    profile = resolve_profile(profile)
+    limits = manager.get_limits(contest_dir, problem, time_limit, memory_limit, profile)
+
+    tester = StressTester(
+        manager.get(),
+        sources["Solution"],
+        sources["Brute"],
+        sources["Generator"],
+        profile,
+    )
+    for name, compiled in zip(sources, tester.compile().values()):
+        if not compiled.success:
+            console.print(f"\n[red]Compilation Error in {name.lower()}:[/red]")
+            console.print(Text(compiled.error))
+            raise typer.Exit(1)
+
+    console.print(
+        f"\n[yellow]Stress testing problem {problem} from contest {contest}[/yellow]"
+    )
+    with Progress(console=console.get(), transient=True) as progress:
+        task = progress.add_task("Testing", total=iterations)
+        report = tester.run(
+            iterations,
+            limits,
+            options,
+            first_seed=seed,
+            workers=workers,
+            on_progress=lambda done: progress.update(task, completed=done),
+        )
+
+    failure = report.failure
+    if failure is None:
+        console.print(f"\n[green]✓ All {report.iterations} tests passed![/green]")
+        return
+
+    if failure.stage != "solution":
+        console.print(
+            f"\n[red]✗ The {failure.stage} failed on seed {failure.seed}: "
+            f"{failure.process.exit_description}[/red]"
+        )
+        console.print(Text(manager.preview(failure.process.captured_stderr)))
+        raise typer.Exit(1)
+
+    console.print(
+        f"\n[red]✗ {describe_verdict(failure.verdict, failure.process)} "
+        f"on seed {failure.seed}[/red]"
+    )
+    table = Table(title="Failing Test")
+    table.add_column("Input", style="cyan")
+    table.add_column("Expected", style="green")
+    table.add_column("Got", style="red")
+    process = failure.process
+    got = process.captured_stdout if process.success else process.captured_stderr
+    expected, got = Text(manager.preview(failure.expected)), Text(manager.preview(got))
+    if failure.mismatch is not None:
+        diff = first_divergence(
+            process.captured_stdout,
+            failure.expected,
+            failure.mismatch,
+            manager.config.get_output_settings()["diff_context"],
+        )
+        expected = render_side(diff.expected, "green")
+        got = render_side(diff.actual, "red")
+    table.add_row(Text(manager.preview(failure.input)), expected, got)
+    console.print(table)
+    if failure.mismatch is not None:
+        console.print(f"[red]First difference at {failure.mismatch}[/red]")
+
+    saved = tester.save_failure(contest_dir, problem, failure)
+    console.print(f"[yellow]Saved failing test to {saved.parent}[/yellow]")
+    raise typer.Exit(1)
+
+
+@app.command()
+def scale(
+    contest: str,
+    problem: str,
+    min_size: Optional[int] = typer.Option(
+        None, "--min", help="Smallest n (default: scale.min)"
+    ),
+    max_size: Optional[int] = typer.Option(
+        None, "--max", help="Largest n (default: scale.max)"
+    ),
+    points: Optional[int] = typer.Option(
+        None, "--points", "-k", help="Number of sizes between --min and --max"
+    ),
+    target: Optional[int] = typer.Option(
+        None, "--target", "-N", help="n to project the running time at"
+    ),
+    repeats: Optional[int] = typer.Option(
+        None, "--repeats", "-r", help="Runs per size; the fastest one counts"
+    ),
+    seed: int = typer.Option(1, "--seed", "-s", help="Seed passed to the generator"),
+    generator: Optional[str] = typer.Option(
+        None, "--generator", "-g", help="Generator source file"
+    ),
+    time_limit: Optional[float] = typer.Option(
+        None, "--time-limit", "-t", help="Time limit in seconds"
+    ),
+    memory_limit: Optional[int] = typer.Option(
+        None, "--memory-limit", "-m", help="Memory limit in MB"
+    ),
+    profile: Optional[str] = typer.Option(
+        None, "--profile", "-p", help="Compile profile from compile.profiles"
+    ),
+):
+    """Estimate a solution's complexity from generated inputs of growing size."""
+    from rich.progress import Progress
+    from rich.table import Table
+    from rich.text import Text
+    from src.judge import Verdict, describe_verdict
+    from src.process import format_memory, format_time
+    from src.scale import ScaleTester, format_size, geometric_sizes
+
+    settings = manager.config.get_scale_settings()
+    min_size = settings["min"] if min_size is None else min_size
+    max_size = settings["max"] if max_size is None else max_size
+    points = settings["points"] if points is None else points
+    if min_size < 1:
+        raise typer.BadParameter("must be at least 1", param_hint="--min")
+    if max_size < min_size:
+        raise typer.BadParameter("must not be below --min", param_hint="--max")
+    if points < 2:
+        raise typer.BadParameter("must be at least 2", param_hint="--points")
+
+    contest_dir = Path(contest)
+    if not contest_dir.exists():
+        console.print(f"[red]Contest directory '{contest}' not found!")
+        raise typer.Exit(1)
+
+    sources = {
+        "Solution": contest_dir / manager.config.get_problem_file_name(problem),
+        "Generator": (
+            Path(generator)
+            if generator
+            else contest_dir / manager.config.get_generator_file_name(problem)
+        ),
+    }
+    for name, path in sources.items():
+        if not path.exists():
+            console.print(f"[red]{name} file {path} not found!")
+            raise typer.Exit(1)
+
+    sizes = geometric_sizes(min_size, max_size, points)
+    target = target or settings["target"]
+    profile = resolve_profile(profile)
+    limits = manager.get_limits(contest_dir, problem, time_limit, memory_limit, profile)
+
+    tester = ScaleTester(
+        manager.get(), sources["Solution"], sources["Generator"], profile
+    )
+    for name, compiled in zip(sources, tester.compile().values()):
+        if not compiled.success:
+            console.print(f"\n[red]Compilation Error in {name.lower()}:[/red]")
+            console.print(Text(compiled.error))
+            raise typer.Exit(1)
+
+    console.print(
+        f"\n[yellow]Scaling problem {problem} from n={format_size(sizes[0])} "
+        f"to n={format_size(sizes[-1])}[/yellow]"
+    )
+    with Progress(console=console.get(), transient=True) as progress:
+        task = progress.add_task("Measuring", total=len(sizes))
+        report = tester.run(
+            sizes,
+            limits,
+            repeats or settings["repeats"],
+            seed,
+            on_progress=lambda done: progress.update(task, completed=done),
+        )
+
+    table = Table(title=f"Scaling of Problem {problem}")
+    table.add_column("n", style="cyan", justify="right")
+    table.add_column("Input", justify="right")
+    table.add_column("Result")
+    table.add_column("Wall Time", style="yellow", justify="right")
+    table.add_column("CPU Time", style="yellow", justify="right")
+    table.add_column("Peak Memory", style="yellow", justify="right")
+    for point in report.points:
+        passed = point.verdict == Verdict.AC
+        table.add_row(
+            format_size(point.size),
+            f"{point.input_bytes / 2**20:.1f} MB",
+            Text(
+                "✓ OK" if passed else describe_verdict(point.verdict, point.process),
+                style="green" if passed else "red",
+            ),
+            format_time(point.process.wall_time),
+            format_time(point.cpu_time),
+            format_memory(point.process.max_rss_kb),
+        )
+    if report.points:
+        console.print(table)
+
+    if report.generator_failure is not None:
+        console.print(
+            f"[red]✗ The generator failed at n={format_size(report.failed_size)}: "
+            f"{report.generator_failure.exit_description}[/red]"
+        )
+        console.print(Text(manager.preview(report.generator_failure.captured_stderr)))
+
+    fit = report.fit()
+    if fit is None:
+        console.print(
+            "[yellow]Too few runs took long enough to measure; "
+            "try a larger --max[/yellow]"
+        )
+        return
+
+    projected = fit.project(target)
+    console.print(
+        f"≈ {fit.model} (log-log slope {fit.slope:.2f}), "
+        f"projected {format_time(projected)} at n={format_size(target)}"
+    )
+    if projected > limits.time:
+        console.print(f"[red]✗ Over the {format_time(limits.time)} time limit[/red]")
+    else:
+        console.print(
+            f"[green]✓ Within the {format_time(limits.time)} time limit[/green]"
+        )
+
+
+@app.command()
+def interact(
+    contest: str,
+    problem: str,
+    case: Optional[str] = typer.Option(
+        None, "--case", "-c", help="Run only this test case and show its transcript"
+    ),
+    interactor: Optional[str] = typer.Option(
+        None, "--interactor", "-i", help="Interactor source file"
+    ),
+    time_limit: Optional[float] = typer.Option(
+        None, "--time-limit", "-t", help="Time limit in seconds"
+    ),
+    memory_limit: Optional[int] = typer.Option(
+        None, "--memory-limit", "-m", help="Memory limit in MB"
+    ),
+    profile: Optional[str] = typer.Option(
+        None, "--profile", "-p", help="Compile profile from compile.profiles"
+    ),
+):
+    """Run an interactive problem's solution against its interactor."""
+    from rich.progress import Progress
+    from rich.text import Text
+    from src.interactive import InteractiveRunner, results_table, transcript_text
+    from src.process import format_time
+
+    contest_dir = Path(contest)
+    if not contest_dir.exists():
+        console.print(f"[red]Contest directory '{contest}' not found!")
+        raise typer.Exit(1)
+
+    sources = {
+        "Solution": contest_dir / manager.config.get_problem_file_name(problem),
+        "Interactor": (
+            Path(interactor)
+            if interactor
+            else contest_dir / manager.config.get_interactor_file_name(problem)
+        ),
+    }
+    for name, path in sources.items():
+        if not path.exists():
+            console.print(f"[red]{name} file {path} not found!")
+            raise typer.Exit(1)
+
+    cases = manager.discover_tests(contest_dir, problem)
+    if case is not None:
+        cases = [c for c in cases if c.name == case]
+    if not cases:
+        console.print(f"\n[red]No test cases found for problem {problem}![/red]")
+        raise typer.Exit(1)
+
+    profile = resolve_profile(profile)
+    runner = InteractiveRunner(
+        manager.get(), sources["Solution"], sources["Interactor"], profile
+    )
+    for name, compiled in zip(sources, runner.compile().values()):
+        if not compiled.success:
+            console.print(f"\n[red]Compilation Error in {name.lower()}:[/red]")
+            console.print(Text(compiled.error))
+            raise typer.Exit(1)
+
+    limits = manager.get_limits(contest_dir, problem, time_limit, memory_limit, profile)
+    console.print(
+        f"\n[cyan]Limits: {format_time(limits.time)}, {limits.memory} MB[/cyan]"
+    )
+    with Progress(console=console.get(), transient=True) as progress:
+        task = progress.add_task("Interacting", total=len(cases))
+        results = runner.run_all(
+            cases, limits, on_result=lambda _: progress.advance(task)
+        )
+    passed = sum(result.passed for result in results)
+
+    if passed == len(results):
+        console.print(f"\n[green]✓ All {len(results)} test cases passed![/green]")
+    else:
+        console.print(
+            f"\n[red]✗ {len(results) - passed} of {len(results)} test cases failed![/red]"
+        )
+
+    console.print(results_table(results))
+
+    # One transcript is enough to debug: the first failure, or the only case
+    shown = next((r for r in results if not r.passed), results[0])
+    settings = manager.config.get_output_settings()
+    console.print(
+        f"\n[cyan]Transcript of {shown.case.name} "
+        "(> solution to interactor, < interactor to solution):[/cyan]"
+    )
+    console.print(
+        transcript_text(
+            shown.interaction.messages,
+            settings["head_lines"],
+            settings["tail_lines"],
+            shown.interaction.truncated,
+        )
+    )
+    if shown.solution.stderr.strip():
+        console.print("[red]Solution stderr:[/red]")
+        console.print(Text(manager.preview(shown.solution.captured_stderr)))
+
+
+@app.command(name="profile")
+def profile_problem(
+    contest: str,
+    problem: str,
+    top: Optional[int] = typer.Option(
+        None, "--top", "-n", help="Number of functions and lines to show"
+    ),
+    time_limit: Optional[float] = typer.Option(
+        None, "--time-limit", "-t", help="Time limit in seconds"
+    ),
+    memory_limit: Optional[int] = typer.Option(
+        None, "--memory-limit", "-m", help="Memory limit in MB"
+    ),
+    profile: Optional[str] = typer.Option(
+        None, "--profile", "-p", help="Compile profile from compile.profiles"
+    ),
+):
+    """Profile a solution on its largest test with gprof and gcov."""
+    from rich.text import Text
+    from src.judge import Verdict, describe_verdict
+    from src.process import format_memory, format_time
+    from src.profiler import Profiler, function_table, line_table
+
+    contest_dir = Path(contest)
+    if not contest_dir.exists():
+        console.print(f"[red]Contest directory '{contest}' not found!")
+        raise typer.Exit(1)
+    profile = resolve_profile(profile)
+
+    problem_path = contest_dir / manager.config.get_problem_file_name(problem)
+    if not problem_path.exists():
+        console.print(f"[red]Problem {problem} not found in contest {contest}!")
+        raise typer.Exit(1)
+
+    limits = manager.get_limits(contest_dir, problem, time_limit, memory_limit, profile)
+    profiler = Profiler.for_problem(
+        manager.get(), contest_dir, problem, limits, profile
+    )
+    if profiler is None:
+        console.print(f"\n[red]No non-empty test input for problem {problem}![/red]")
+        raise typer.Exit(1)
+
+    console.print(
+        f"\n[yellow]Profiling problem {problem} on {profiler.case.name} "
+        f"({profiler.case.input_size:,} bytes of input)[/yellow]"
+    )
+    report = profiler.run()
+    if report.compile_error:
+        console.print("\n[red]Compilation Error:[/red]")
+        console.print(Text(report.compile_error))
+        raise typer.Exit(1)
+
+    process = report.process
+    console.print(
+        f"[cyan]Instrumented compile: {format_time(report.compile_time)} | "
+        f"Wall: {format_time(process.wall_time)} | "
+        f"CPU: {format_time(process.cpu_time)}[/cyan]"
+    )
+    if report.verdict != Verdict.AC:
+        # A TLE run is still profiled up to the moment it was stopped
+        console.print(f"[red]{describe_verdict(report.verdict, process)}[/red]")
+    for note in report.notes:
+        console.print(f"[yellow]{note}[/yellow]")
+
+    top = top or profiler.settings["top"]
+    if report.functions:
+        console.print(function_table(report.functions, top))
+    if report.lines:
+        console.print(line_table(report.lines, top))
+
+
+@app.command()
+def history(
+    contest: str,
+    problem: Optional[str] = typer.Argument(
+        None, help="Problem to show (default: every problem with recorded runs)"
+    ),
+    limit: int = typer.Option(
+        10, "--limit", "-n", help="Number of most recent source versions to show"
+    ),
+    clear: bool = typer.Option(False, "--clear", help="Forget the contest's runs"),
+):
+    """Show recorded run trends and flag source versions that got slower."""
+    from rich.table import Table
+    from rich.text import Text
+    from src.history import compare_versions, previous_version
+    from src.process import format_memory, format_time
+
+    contest_dir = Path(contest)
+    key = str(contest_dir.resolve())
+    if clear:
+        removed = manager.history.clear(key)
+        console.print(f"[green]Forgot {removed} recorded runs of {contest}![/green]")
+        return
+
+    problems = [problem] if problem else manager.history.problems(key)
+    if not problems:
+        console.print(f"[yellow]No runs recorded for contest {contest} yet[/yellow]")
+        return
+
+    settings = manager.config.get_history_settings()
+    regressions = []
+    for name in sorted(problems):
+        versions = manager.history.versions(key, name)
+        if not versions:
+            console.print(f"[yellow]No runs recorded for problem {name} yet[/yellow]")
+            continue
+
+        table = Table(title=f"History of Problem {name}")
+        table.add_column("Version", style="cyan")
+        table.add_column("Profile")
+        table.add_column("Last Run")
+        table.add_column("Runs")
+        table.add_column("Passed")
+        table.add_column("Slowest", style="yellow")
+        table.add_column("Memory", style="yellow")
+        table.add_column("Change")
+        for version in versions[-limit:]:
+            change = Text("-")
+            baseline = previous_version(versions, version)
+            if baseline is not None:
+                comparison = compare_versions(
+                    version, baseline, settings["slowdown"], settings["min_delta"]
+                )
+                if comparison is not None:
+                    change = Text(
+                        f"{comparison.ratio - 1:+.0%}",
+                        style="red" if comparison.regressed else "green",
+                    )
+            passed = "-"
+            if version.judged:
+                passed = Text(
+                    f"{version.passed}/{version.judged}",
+                    style="green" if version.passed == version.judged else "red",
+                )
+            table.add_row(
+                version.source_hash[:8],
+                version.profile or "-",
+                time.strftime("%Y-%m-%d %H:%M", time.localtime(version.last_run)),
+                str(version.runs),
+                passed,
+                format_time(version.slowest),
+                format_memory(version.peak_kb),
+                change,
+            )
+        console.print(table)
+
+        comparison = manager.find_regression(contest_dir, name)
+        if comparison is not None:
+            regressions.append((name, comparison))
+
+    for name, comparison in regressions:
+        print_regression(name, comparison)
 
 
 @app.command()
@@ -226,6 +1235,7 @@ def config(action: str = typer.Argument("show", help="Action to perform: show/up
 
 def show_config():
     """Display current configuration."""
+    from rich.table import Table
 
     compiler_table = Table(title="Compiler Settings")
     compiler_table.add_column("Setting", style="cyan")
@@ -233,6 +1243,10 @@ def show_config():
 
     compiler_table.add_row("Compiler", manager.config.config["compile"]["command"])
     compiler_table.add_row("Flags", " ".join(manager.config.get_compiler_flags()))
+    default_profile = manager.config.get_default_profile()
+    for name, flags in manager.config.get_compile_profiles().items():
+        label = f"Profile {name}" + (" (default)" if name == default_profile else "")
+        compiler_table.add_row(label, " ".join(flags))
     console.print(compiler_table)
 
     paths_table = Table(title="\nPath Settings")
@@ -286,6 +1300,8 @@ def update_config():
             "Enter new compiler", default=manager.config.config["compile"]["command"]
         )
         manager.config.update_compiler(new_compiler)
+        console.print("[yellow]Rebuilding precompiled headers...[/yellow]")
+        manager.pch.prepare_all()
         console.print("[green]Compiler updated successfully![/green]")
 
     elif choice == "Compiler Flags":
@@ -294,6 +1310,8 @@ def update_config():
             "Enter compiler flags (space-separated)", default=current_flags
         )
         manager.config.update_compiler_flags(new_flags.split())
+        console.print("[yellow]Rebuilding precompiled headers...[/yellow]")
+        manager.pch.prepare_all()
         console.print("[green]Compiler flags updated successfully![/green]")
 
     elif choice == "Default Template":
@@ -315,6 +1333,100 @@ def update_config():
     show_config()
 
 
+@app.command()
+def cache(action: str = typer.Argument("show", help="Action to perform: show/clear")):
+    """Show or clear the compile cache."""
+    from rich.table import Table
+
+    if action == "show":
+        stats = manager.cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "-"
+
+        table = Table(title="Compile Cache")
+        table.add_column("Setting", style="cyan")
+        table.add_column("Value", style="green")
+        table.add_row("Directory", str(manager.cache.cache_dir))
+        table.add_row("Entries", str(stats["entries"]))
+        table.add_row(
+            "Size",
+            f"{stats['size'] / 2**20:.1f} MB / {stats['max_size'] / 2**20:.0f} MB",
+        )
+        table.add_row("Hits", str(stats["hits"]))
+        table.add_row("Misses", str(stats["misses"]))
+        table.add_row("Hit Rate", hit_rate)
+        table.add_row("Precompiled Headers", str(len(manager.pch.builds())))
+        console.print(table)
+    elif action == "clear":
+        manager.cache.clear()
+        manager.pch.clear()
+        console.print("[green]Compile cache cleared![/green]")
+    else:
+        console.print("[red]Invalid action. Use 'show' or 'clear'[/red]")
+        raise typer.Exit(1)
+
+
+@app.command()
+def serve(
+    workers: Optional[int] = typer.Option(
+        None, "--workers", "-w", help="Number of worker processes"
+    ),
+    socket_path: Optional[Path] = typer.Option(
+        None, "--socket", help="Unix socket to listen on"
+    ),
+    status: bool = typer.Option(
+        False, "--status", help="Show a running server's queue and exit"
+    ),
+):
+    """Run a local judge server for your jobs and those of server.allow_users."""
+    import signal
+    from rich.table import Table
+    from src.remote import JudgeClient
+    from src.server import JudgeServer
+
+    settings = manager.config.get_server_settings()
+    socket_path = socket_path or settings["socket"]
+
+    if status:
+        state = JudgeClient(socket_path, settings["owner"]).status()
+        if state is None:
+            console.print(f"[red]No judge server is listening on {socket_path}[/red]")
+            raise typer.Exit(1)
+        table = Table(title="Judge Server")
+        table.add_column("Setting", style="cyan")
+        table.add_column("Value", style="green")
+        table.add_row("Socket", str(socket_path))
+        table.add_row("Workers", str(state["workers"]))
+        table.add_row("Running", str(state["running"]))
+        queued = ", ".join(
+            f"{user}: {count}" for user, count in state["queued"].items()
+        )
+        table.add_row("Queued", queued or "-")
+        table.add_row("Completed", str(state["completed"]))
+        table.add_row("Deduplicated Compiles", str(state["deduplicated"]))
+        console.print(table)
+        return
+
+    server = JudgeServer(
+        socket_path, workers or settings["workers"], settings["allow_users"]
+    )
+    # Stopped by a service manager the same way as by Ctrl+C, so the socket
+    # is removed either way
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever(
+            on_ready=lambda: console.print(
+                f"[green]Listening on {socket_path} with {server.workers} workers "
+                "(Ctrl+C to stop)[/green]"
+            )
+        )
+    except RuntimeError as error:
+        console.print(f"[red]{error}[/red]")
+        raise typer.Exit(1)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Judge server stopped[/yellow]")
+
+
 @app.command()
 def tui():
     """Launch the Terminal User Interface."""
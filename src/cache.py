@@ -0,0 +1,178 @@
+import atexit
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Sequence
+
+# Caches holding hit and miss counts that are not written yet, flushed by a
+# single exit hook however many caches a process makes
+_unflushed: "set[CompileCache]" = set()
+
+
+@atexit.register
+def _flush_all() -> None:
+    for cache in list(_unflushed):
+        cache.flush()
+
+
+class CompileCache:
+    INDEX_FILE = "index.json"
+    LOCK_FILE = "index.lock"
+    # A hit only rewrites the index when its entry was last used this long
+    # ago, so runs of the same binary do not rewrite it every time
+    TOUCH_INTERVAL = 10.0
+    # Entries used this recently are never evicted, since another process may
+    # be about to run the binary it just looked up
+    EVICT_GRACE = 30.0
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.artifacts_dir = self.cache_dir / "artifacts"
+        self.index_path = self.cache_dir / self.INDEX_FILE
+        self.lock_path = self.cache_dir / self.LOCK_FILE
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Hits and misses not yet written, saved with the next index write
+        self._pending = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(
+        source: bytes,
+        compiler: str,
+        flags: List[str],
+        command_template: str,
+        headers: Sequence[bytes] = (),
+    ) -> str:
+        # Headers are the contents of the source's own quoted includes, which
+        # change the build as much as the source does
+        digest = hashlib.sha256()
+        for part in (compiler, "\0".join(flags), command_template):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        for header in headers:
+            digest.update(hashlib.sha256(header).digest())
+        digest.update(source)
+        return digest.hexdigest()
+
+    def artifact_path(self, key: str) -> Path:
+        return self.artifacts_dir / key
+
+    def temp_path(self, key: str) -> Path:
+        self.artifacts_dir.mkdir(parents=True, exist_ok=True)
+        return self.artifacts_dir / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        path = self.artifact_path(key)
+        now = time.time()
+        with self._locked():
+            index = self._load_index()
+            entry = index["entries"].get(key)
+            if entry is not None and path.exists():
+                self._count("hits")
+                if now - entry["last_used"] >= self.TOUCH_INTERVAL:
+                    entry["last_used"] = now
+                    self._save_index(index)
+                return path
+
+            self._count("misses")
+            if entry is not None:
+                del index["entries"][key]
+                self._save_index(index)
+            return None
+
+    def store(self, key: str, built_path: Path) -> Path:
+        path = self.artifact_path(key)
+        with self._locked():
+            os.replace(built_path, path)
+            index = self._load_index()
+            index["entries"][key] = {
+                "size": path.stat().st_size,
+                "last_used": time.time(),
+            }
+            self._evict(index, keep=key)
+            self._save_index(index)
+        return path
+
+    def flush(self) -> None:
+        # Nothing to write means no lock file and no cache directory either
+        with self._lock:
+            if not any(self._pending.values()):
+                return
+        with self._locked():
+            if any(self._pending.values()):
+                self._save_index(self._load_index())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._locked():
+            index = self._load_index()
+            pending = dict(self._pending)
+        return {
+            "hits": index["hits"] + pending["hits"],
+            "misses": index["misses"] + pending["misses"],
+            "entries": len(index["entries"]),
+            "size": sum(e["size"] for e in index["entries"].values()),
+            "max_size": self.max_bytes,
+        }
+
+    def clear(self) -> None:
+        with self._locked():
+            index = self._load_index()
+            for key in list(index["entries"]):
+                self.artifact_path(key).unlink(missing_ok=True)
+            self._pending = {"hits": 0, "misses": 0}
+            self._save_index({"entries": {}, "hits": 0, "misses": 0})
+
+    def _count(self, name: str) -> None:
+        self._pending[name] += 1
+        _unflushed.add(self)
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        # The index is shared by every SeePee process using this cache: CLI
+        # runs, background warm-ups and judge server workers alike, so each
+        # read-modify-write of it holds the lock file as well
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                yield
+
+    def _evict(self, index: Dict[str, Any], keep: str) -> None:
+        entries = index["entries"]
+        total = sum(e["size"] for e in entries.values())
+        recent = time.time() - self.EVICT_GRACE
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep or entries[key]["last_used"] > recent:
+                continue
+            total -= entries.pop(key)["size"]
+            self.artifact_path(key).unlink(missing_ok=True)
+
+    def _load_index(self) -> Dict[str, Any]:
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = {}
+        index.setdefault("entries", {})
+        index.setdefault("hits", 0)
+        index.setdefault("misses", 0)
+        return index
+
+    def _save_index(self, index: Dict[str, Any]) -> None:
+        for name, count in self._pending.items():
+            index[name] += count
+        self._pending = {"hits": 0, "misses": 0}
+        _unflushed.discard(self)
+        tmp_path = self.index_path.with_name(
+            f"{self.INDEX_FILE}.{os.getpid()}.{threading.get_ident()}"
+        )
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
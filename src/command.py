@@ -0,0 +1,132 @@
+import functools
+import re
+import shlex
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+PLACEHOLDER_RE = re.compile(r"^\{(\w+)\}$")
+SHELL_SYNTAX_RE = re.compile(r"[$`*?\[\]~]|^\w+=")
+OPERATOR_CHARS = set("();<>|&")
+
+Value = Union[str, Sequence[str]]
+
+
+@dataclass
+class Command:
+    argv: List[str] = field(default_factory=list)
+    stdin: Optional[Path] = None
+    shell: Optional[str] = None
+
+    @property
+    def uses_shell(self) -> bool:
+        return self.shell is not None
+
+    def __str__(self) -> str:
+        if self.shell is not None:
+            return self.shell
+        text = shlex.join(self.argv)
+        if self.stdin is not None:
+            text += f" < {shlex.quote(str(self.stdin))}"
+        return text
+
+
+class CommandTemplate:
+    def __init__(self, template: str):
+        self.template = template
+        self.tokens: Optional[List[str]] = None
+        self.stdin_token: Optional[str] = None
+        self._parse()
+
+    @property
+    def needs_shell(self) -> bool:
+        return self.tokens is None
+
+    def render(
+        self,
+        values: Dict[str, Value],
+        append_to: Optional[str] = None,
+        extra_args: Sequence[str] = (),
+    ) -> Command:
+        if self.tokens is None:
+            return Command(shell=self._render_shell(values, append_to, extra_args))
+
+        argv = []
+        for token in self.tokens:
+            match = PLACEHOLDER_RE.match(token)
+            value = values.get(match.group(1)) if match else None
+            if value is not None and not isinstance(value, str):
+                argv.extend(value)
+            else:
+                argv.append(token.format(**self._joined(values)))
+            if append_to is not None and f"{{{append_to}}}" in token:
+                argv.extend(extra_args)
+
+        stdin = None
+        if self.stdin_token is not None:
+            stdin = Path(self.stdin_token.format(**self._joined(values)))
+        return Command(argv=argv, stdin=stdin)
+
+    def _render_shell(
+        self,
+        values: Dict[str, Value],
+        append_to: Optional[str],
+        extra_args: Sequence[str],
+    ) -> str:
+        values = self._joined(values)
+        if append_to is not None and extra_args:
+            values[append_to] = " ".join(
+                [values[append_to], *map(shlex.quote, extra_args)]
+            )
+        return self.template.format(**values)
+
+    @staticmethod
+    def _joined(values: Dict[str, Value]) -> Dict[str, str]:
+        return {
+            name: value if isinstance(value, str) else " ".join(value)
+            for name, value in values.items()
+        }
+
+    def _parse(self) -> None:
+        try:
+            lexer = shlex.shlex(self.template, posix=True, punctuation_chars=True)
+            lexer.whitespace_split = True
+            tokens = list(lexer)
+        except ValueError:
+            return
+
+        # Only a plain "< file" redirection can be done without a shell
+        argv, stdin_token = [], None
+        iterator = iter(tokens)
+        for token in iterator:
+            if set(token) <= OPERATOR_CHARS:
+                if token != "<" or stdin_token is not None:
+                    return
+                stdin_token = next(iterator, None)
+                if stdin_token is None or set(stdin_token) <= OPERATOR_CHARS:
+                    return
+                continue
+            if SHELL_SYNTAX_RE.search(token):
+                return
+            argv.append(token)
+
+        if argv:
+            self.tokens = argv
+            self.stdin_token = stdin_token
+
+
+def split_words(values: Sequence[str]) -> List[str]:
+    # Config values used to be pasted into a shell command line, so a single
+    # entry such as "-O2 -Wall" or "ccache g++" still means several words
+    words = []
+    for value in values:
+        try:
+            words.extend(shlex.split(value))
+        except ValueError:
+            words.append(value)
+    return words
+
+
+@functools.lru_cache(maxsize=None)
+def parse_template(template: str) -> CommandTemplate:
+    return CommandTemplate(template)
@@ -0,0 +1,355 @@
+import math
+import re
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, List, Optional
+
+CHUNK_SIZE = 1 << 16
+SNIPPET_SIZE = 32
+
+TOKEN_OR_NEWLINE_RE = re.compile(rb"\S+|\n")
+LINE_BREAKS_RE = re.compile(rb"\s*\n\s*")
+LINE_MARKERS = [bytes([byte]) for byte in range(32) if not chr(byte).isspace()]
+NEWLINE = b"\n"
+END_OF_OUTPUT = "<end of output>"
+WHITESPACE = (b" ", b"\t", b"\n", b"\r", b"\x0b", b"\x0c")
+
+
+class CompareMode(str, Enum):
+    EXACT = "exact"
+    TOKENS = "tokens"
+    WHITESPACE = "whitespace"
+    FLOAT = "float"
+
+
+@dataclass
+class CompareOptions:
+    mode: CompareMode = CompareMode.EXACT
+    abs_eps: float = 1e-6
+    rel_eps: float = 1e-6
+    # A special judge's source; when set, it decides instead of the mode
+    checker: Optional[Path] = None
+
+
+@dataclass
+class Mismatch:
+    line: int
+    column: int
+    offset: int
+    expected: str
+    actual: str
+    expected_line: int
+    expected_column: int
+
+    def __str__(self) -> str:
+        return (
+            f"line {self.line}, column {self.column} (byte {self.offset}): "
+            f"expected {self.expected!r}, got {self.actual!r}"
+        )
+
+
+def compare_files(
+    actual_path: Path, expected_path: Path, options: Optional[CompareOptions] = None
+) -> Optional[Mismatch]:
+    with open(actual_path, "rb") as actual, open(expected_path, "rb") as expected:
+        return compare_streams(actual, expected, options)
+
+
+def compare_streams(
+    actual: BinaryIO, expected: BinaryIO, options: Optional[CompareOptions] = None
+) -> Optional[Mismatch]:
+    options = options or CompareOptions()
+    if options.mode == CompareMode.EXACT:
+        return _compare_bytes(_ByteReader(actual), _ByteReader(expected))
+
+    line_breaks = options.mode == CompareMode.WHITESPACE
+    equal = None
+    if options.mode == CompareMode.FLOAT:
+        equal = _float_equal(options.abs_eps, options.rel_eps)
+    return _compare_tokens(
+        _TokenReader(actual, line_breaks), _TokenReader(expected, line_breaks), equal
+    )
+
+
+class _ByteReader:
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.buffer = b""
+        self.view = memoryview(self.buffer)
+        self.pos = 0
+        self.offset = 0
+        self.line = 1
+        self.line_start = 0
+
+    @property
+    def available(self) -> int:
+        return len(self.buffer) - self.pos
+
+    def fill(self, minimum: int = 1) -> bool:
+        while self.available < minimum:
+            chunk = self.stream.read(CHUNK_SIZE)
+            if not chunk:
+                return self.available > 0
+            self.buffer = self.buffer[self.pos :] + chunk
+            self.view = memoryview(self.buffer)
+            self.pos = 0
+        return True
+
+    def advance(self, count: int) -> None:
+        end = self.pos + count
+        newlines = self.buffer.count(NEWLINE, self.pos, end)
+        if newlines:
+            last_newline = self.buffer.rfind(NEWLINE, self.pos, end)
+            self.line += newlines
+            self.line_start = self.offset + (last_newline - self.pos) + 1
+        self.offset += count
+        self.pos = end
+
+    def skip_whitespace(self) -> None:
+        while self.fill():
+            rest = self.buffer[self.pos :]
+            stripped = len(rest) - len(rest.lstrip())
+            self.advance(stripped)
+            if self.available:
+                return
+
+    def rest_is_whitespace(self) -> bool:
+        self.skip_whitespace()
+        return not self.fill()
+
+    def snippet(self) -> str:
+        if not self.fill(SNIPPET_SIZE):
+            return END_OF_OUTPUT
+        text = self.buffer[self.pos : self.pos + SNIPPET_SIZE].split(NEWLINE)[0]
+        return text.decode(errors="replace")
+
+    def mismatch(self, other: "_ByteReader") -> Mismatch:
+        return Mismatch(
+            line=self.line,
+            column=self.offset - self.line_start + 1,
+            offset=self.offset,
+            expected=other.snippet(),
+            actual=self.snippet(),
+            expected_line=other.line,
+            expected_column=other.offset - other.line_start + 1,
+        )
+
+
+def _compare_bytes(actual: _ByteReader, expected: _ByteReader) -> Optional[Mismatch]:
+    actual.skip_whitespace()
+    expected.skip_whitespace()
+
+    while actual.fill() and expected.fill():
+        count = min(actual.available, expected.available)
+        a = actual.view[actual.pos : actual.pos + count]
+        b = expected.view[expected.pos : expected.pos + count]
+        if a == b:
+            actual.advance(count)
+            expected.advance(count)
+            continue
+
+        index = _first_difference(a, b)
+        actual.advance(index)
+        expected.advance(index)
+        if _skip_carriage_return(actual, expected) or _skip_carriage_return(
+            expected, actual
+        ):
+            continue
+        break
+
+    if actual.available == 0 and expected.available == 0:
+        if not actual.fill() and not expected.fill():
+            return None
+
+    mismatch = actual.mismatch(expected)
+    if actual.rest_is_whitespace() and expected.rest_is_whitespace():
+        return None
+    return mismatch
+
+
+def _first_difference(a: memoryview, b: memoryview) -> int:
+    low, high = 0, len(a)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def _skip_carriage_return(side: _ByteReader, other: _ByteReader) -> bool:
+    side.fill(2)
+    other.fill(1)
+    if side.buffer[side.pos : side.pos + 2] != b"\r\n":
+        return False
+    if other.buffer[other.pos : other.pos + 1] != NEWLINE:
+        return False
+    side.advance(1)
+    return True
+
+
+@dataclass
+class _Batch:
+    tokens: List[bytes]
+    data: bytes
+    offset: int
+    line: int
+    line_start: int
+
+    def position(self, index: int) -> tuple[int, int, int]:
+        target = index - self.tokens[:index].count(NEWLINE)
+        line, line_start = self.line, self.line_start
+        seen = 0
+        for match in TOKEN_OR_NEWLINE_RE.finditer(self.data):
+            if match.group() == NEWLINE:
+                line += 1
+                line_start = self.offset + match.end()
+                continue
+            if seen == target:
+                offset = self.offset + match.start()
+                return line, offset - line_start + 1, offset
+            seen += 1
+        return self.end_position()
+
+    def end_position(self) -> tuple[int, int, int]:
+        line = self.line + self.data.count(NEWLINE)
+        line_start = self.line_start
+        last_newline = self.data.rfind(NEWLINE)
+        if last_newline >= 0:
+            line_start = self.offset + last_newline + 1
+        offset = self.offset + len(self.data)
+        return line, offset - line_start + 1, offset
+
+
+class _TokenReader:
+    def __init__(self, stream: BinaryIO, line_breaks: bool):
+        self.stream = stream
+        self.line_breaks = line_breaks
+        self.seen_token = False
+        self.pending_newline = False
+
+    def batches(self) -> Iterator[_Batch]:
+        pending = b""
+        offset, line, line_start = 0, 1, 0
+        while True:
+            chunk = self.stream.read(CHUNK_SIZE)
+            data = pending + chunk
+            if chunk:
+                split = max(data.rfind(space) for space in WHITESPACE) + 1
+                data, pending = data[:split], data[split:]
+            if data:
+                yield _Batch(self._tokenize(data), data, offset, line, line_start)
+                last_newline = data.rfind(NEWLINE)
+                if last_newline >= 0:
+                    line += data.count(NEWLINE)
+                    line_start = offset + last_newline + 1
+                offset += len(data)
+            if not chunk:
+                yield _Batch([], b"", offset, line, line_start)
+                return
+
+    def _tokenize(self, data: bytes) -> List[bytes]:
+        if not self.line_breaks:
+            return data.split()
+
+        tokens = _split_lines(data)
+        leading = bool(tokens) and tokens[0] == NEWLINE
+        if leading:
+            del tokens[0]
+        trailing = bool(tokens) and tokens[-1] == NEWLINE
+        if trailing:
+            tokens.pop()
+
+        if not tokens:
+            self.pending_newline = self.pending_newline or leading or trailing
+            return tokens
+        if self.seen_token and (leading or self.pending_newline):
+            tokens.insert(0, NEWLINE)
+        self.seen_token = True
+        self.pending_newline = trailing
+        return tokens
+
+
+def _split_lines(data: bytes) -> List[bytes]:
+    marker = next((m for m in LINE_MARKERS if m not in data), None)
+    if marker is None:
+        return TOKEN_OR_NEWLINE_RE.findall(LINE_BREAKS_RE.sub(NEWLINE, data))
+
+    text = b" ".join(data.replace(NEWLINE, b" " + marker + b" ").split())
+    repeated = marker + b" " + marker
+    while repeated in text:
+        text = text.replace(repeated, marker)
+    return [NEWLINE if token == marker else token for token in text.split()]
+
+
+def _compare_tokens(
+    actual: _TokenReader,
+    expected: _TokenReader,
+    equal: Optional[Callable[[bytes, bytes], bool]],
+) -> Optional[Mismatch]:
+    actual_batches = actual.batches()
+    expected_batches = expected.batches()
+    a, b = next(actual_batches), next(expected_batches)
+    ai = bi = 0
+
+    while True:
+        while ai == len(a.tokens) and a.data:
+            a, ai = next(actual_batches), 0
+        while bi == len(b.tokens) and b.data:
+            b, bi = next(expected_batches), 0
+
+        count = min(len(a.tokens) - ai, len(b.tokens) - bi)
+        if count == 0:
+            if ai == len(a.tokens) and bi == len(b.tokens):
+                return None
+            return _token_mismatch(a, ai, b, bi)
+
+        a_tokens = a.tokens[ai : ai + count]
+        b_tokens = b.tokens[bi : bi + count]
+        if a_tokens != b_tokens:
+            for index, (x, y) in enumerate(zip(a_tokens, b_tokens)):
+                if x != y and (equal is None or not equal(x, y)):
+                    return _token_mismatch(a, ai + index, b, bi + index)
+        ai += count
+        bi += count
+
+
+def _token_mismatch(a: _Batch, ai: int, b: _Batch, bi: int) -> Mismatch:
+    line, column, offset = _token_position(a, ai)
+    expected_line, expected_column, _ = _token_position(b, bi)
+    return Mismatch(
+        line=line,
+        column=column,
+        offset=offset,
+        expected=_describe_token(b.tokens, bi),
+        actual=_describe_token(a.tokens, ai),
+        expected_line=expected_line,
+        expected_column=expected_column,
+    )
+
+
+def _token_position(batch: _Batch, index: int) -> tuple[int, int, int]:
+    if index < len(batch.tokens):
+        return batch.position(index)
+    return batch.end_position()
+
+
+def _describe_token(tokens: List[bytes], index: int) -> str:
+    if index >= len(tokens):
+        return END_OF_OUTPUT
+    if tokens[index] == NEWLINE:
+        return "<end of line>"
+    return tokens[index][:SNIPPET_SIZE].decode(errors="replace")
+
+
+def _float_equal(abs_eps: float, rel_eps: float) -> Callable[[bytes, bytes], bool]:
+    def equal(actual: bytes, expected: bytes) -> bool:
+        try:
+            x, y = float(actual), float(expected)
+        except ValueError:
+            return False
+        return math.isclose(x, y, rel_tol=rel_eps, abs_tol=abs_eps)
+
+    return equal
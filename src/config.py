@@ -1,13 +1,33 @@
 import os
+import tempfile
 import yaml
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional, Sequence
+
+from .command import Command, parse_template, split_words
+
+
+@dataclass
+class BuildSettings:
+    # Everything that decides what a compile produces, resolved for a profile
+    compiler: str
+    flags: List[str]
+    template: str
 
 
 class Config:
     def __init__(self, config_path: str = "config/config.yaml"):
         self.config_path = Path(config_path)
         self.config = self.load_config()
+        self._listeners: List[Callable[[str], None]] = []
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        self._listeners.append(listener)
+
+    def notify_listeners(self, section: str) -> None:
+        for listener in self._listeners:
+            listener(section)
 
     def load_config(self) -> Dict[str, Any]:
         if not self.config_path.exists():
@@ -23,18 +43,37 @@ class Config:
         with open(self.config_path, "w") as f:
             yaml.dump(self.config, f, default_flow_style=False)
 
-    def get_compile_command(self, source_file: str, executable: str) -> str:
-        flags = " ".join(self.config["compile"]["flags"])
-        return self.config["commands"]["compile"].format(
-            compiler=self.config["compile"]["command"],
-            flags=flags,
-            source=source_file,
-            executable=executable,
+    def get_compile_command(
+        self,
+        source_file: str,
+        executable: str,
+        flags: Optional[List[str]] = None,
+        build: Optional[BuildSettings] = None,
+    ) -> Command:
+        if build is None:
+            build = BuildSettings(
+                self.get_compiler(),
+                self.get_compiler_flags(),
+                self.get_compile_template(),
+            )
+        if flags is None:
+            flags = build.flags
+        return parse_template(build.template).render(
+            {
+                "compiler": split_words([build.compiler]),
+                "flags": split_words(flags),
+                "source": source_file,
+                "executable": executable,
+            }
         )
 
-    def get_run_command(self, executable: str, input_file: str) -> str:
-        return self.config["commands"]["run"].format(
-            executable=executable, input_file=input_file
+    def get_run_command(
+        self, executable: str, input_file: str, args: Sequence[str] = ()
+    ) -> Command:
+        return parse_template(self.config["commands"]["run"]).render(
+            {"executable": executable, "input_file": input_file},
+            append_to="executable",
+            extra_args=args,
         )
 
     def get_problem_file_name(self, problem_number: str) -> str:
@@ -46,6 +85,112 @@ class Config:
     def get_output_file_name(self, problem_number: str) -> str:
         return self.config["file_naming"]["output"].format(problem_number)
 
+    def get_generator_file_name(self, problem_number: str) -> str:
+        pattern = self.config["file_naming"].get("generator", "{}_gen.cpp")
+        return pattern.format(problem_number)
+
+    def get_brute_file_name(self, problem_number: str) -> str:
+        pattern = self.config["file_naming"].get("brute", "{}_brute.cpp")
+        return pattern.format(problem_number)
+
+    def get_interactor_file_name(self, problem_number: str) -> str:
+        pattern = self.config["file_naming"].get("interactor", "{}_interactor.cpp")
+        return pattern.format(problem_number)
+
+    def get_checker_file_name(self, problem_number: str) -> str:
+        pattern = self.config["file_naming"].get("checker", "{}_checker.cpp")
+        return pattern.format(problem_number)
+
+    def get_tests_dir_name(self, problem_number: str) -> str:
+        pattern = self.config["file_naming"].get("tests_dir", "tests/{}")
+        return pattern.format(problem_number)
+
+    def parse_file_name(self, kind: str, file_name: str) -> Optional[str]:
+        prefix, _, suffix = self.config["file_naming"][kind].partition("{}")
+        if len(file_name) <= len(prefix) + len(suffix):
+            return None
+        if not (file_name.startswith(prefix) and file_name.endswith(suffix)):
+            return None
+        return file_name[len(prefix) : len(file_name) - len(suffix)]
+
+    def get_contest_config_name(self) -> str:
+        return self.config["file_naming"].get("contest", "contest.yaml")
+
+    def get_limits(self) -> Dict[str, Any]:
+        limits = self.config.get("limits", {})
+        return {"time": limits.get("time", 2.0), "memory": limits.get("memory", 256)}
+
+    def get_compare_settings(self) -> Dict[str, Any]:
+        compare = self.config.get("compare", {})
+        return {
+            "mode": compare.get("mode", "exact"),
+            "abs_eps": compare.get("abs_eps", 1e-6),
+            "rel_eps": compare.get("rel_eps", 1e-6),
+        }
+
+    def get_output_settings(self) -> Dict[str, Any]:
+        output = self.config.get("output", {})
+        return {
+            "memory_limit": int(output.get("memory_limit_mb", 4) * 1024 * 1024),
+            "head_lines": output.get("head_lines", 20),
+            "tail_lines": output.get("tail_lines", 5),
+            "diff_context": output.get("diff_context", 3),
+        }
+
+    def get_warm_up_enabled(self) -> bool:
+        return bool(self.config.get("warm_up", {}).get("enabled", False))
+
+    def get_pack_compression(self) -> str:
+        return self.config.get("pack", {}).get("compression", "none")
+
+    def get_history_settings(self) -> Dict[str, Any]:
+        history = self.config.get("history", {})
+        path = history.get("path")
+        return {
+            "enabled": history.get("enabled", True),
+            "path": (
+                Path(path).expanduser()
+                if path
+                else self.get_cache_dir() / "history.sqlite3"
+            ),
+            "slowdown": float(history.get("slowdown", 0.2)),
+            "min_delta": history.get("min_delta_ms", 5) / 1000,
+        }
+
+    def get_scale_settings(self) -> Dict[str, Any]:
+        scale = self.config.get("scale", {})
+        return {
+            "min": int(scale.get("min", 1000)),
+            "max": int(scale.get("max", 1000000)),
+            "points": int(scale.get("points", 7)),
+            "target": int(scale.get("target", 200000)),
+            "repeats": int(scale.get("repeats", 1)),
+        }
+
+    def get_profiling_settings(self) -> Dict[str, Any]:
+        profiling = self.config.get("profiling", {})
+        return {
+            "flags": profiling.get("flags", ["-g", "-pg", "--coverage"]),
+            "gprof": profiling.get("gprof", "gprof"),
+            "gcov": profiling.get("gcov", "gcov"),
+            "top": profiling.get("top", 10),
+        }
+
+    def get_server_settings(self) -> Dict[str, Any]:
+        server = self.config.get("server", {})
+        # One place every user looks, so a running server is found without
+        # any setup; clients check who owns it before sending it anything
+        socket = server.get("socket") or Path(tempfile.gettempdir()) / "seepee.sock"
+        return {
+            "socket": Path(socket).expanduser(),
+            # 0 means one worker per CPU
+            "workers": int(server.get("workers", 0)) or os.cpu_count() or 1,
+            # The user whose server to trust; it is this user when unset
+            "owner": server.get("owner"),
+            # Other users the server accepts jobs from
+            "allow_users": server.get("allow_users") or [],
+        }
+
     def get_template_path(self) -> Path:
         return Path(self.config["paths"]["template"])
 
@@ -55,22 +200,67 @@ class Config:
     def get_templates_dir(self) -> Path:
         return Path(self.config["paths"]["templates_dir"])
 
+    def get_cache_dir(self) -> Path:
+        cache = self.config.get("cache", {})
+        if cache.get("dir"):
+            return Path(cache["dir"]).expanduser()
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        return Path(base) / "seepee"
+
+    def get_cache_max_bytes(self) -> int:
+        return int(self.config.get("cache", {}).get("max_size_mb", 512)) * 1024 * 1024
+
     def update_config_value(self, section: str, key: str, value: Any) -> None:
         if section not in self.config:
             self.config[section] = {}
         self.config[section][key] = value
         self.save_config()
 
+    def get_compiler(self) -> str:
+        return self.config["compile"]["command"]
+
+    def get_compile_template(self) -> str:
+        return self.config["commands"]["compile"]
+
     def get_compiler_flags(self) -> List[str]:
         return self.config["compile"]["flags"]
 
+    def get_build_settings(self, profile: Optional[str] = None) -> BuildSettings:
+        return BuildSettings(
+            self.get_compiler(),
+            self.get_build_flags(profile),
+            self.get_compile_template(),
+        )
+
+    def get_build_flags(self, profile: Optional[str] = None) -> List[str]:
+        if profile is None:
+            profile = self.get_default_profile()
+        flags = self.get_compiler_flags()
+        if profile is None:
+            return flags
+        return [*flags, *self.get_compile_profiles()[profile]]
+
+    def get_compile_profiles(self) -> Dict[str, List[str]]:
+        return self.config["compile"].get("profiles") or {}
+
+    def get_default_profile(self) -> Optional[str]:
+        return self.config["compile"].get("default_profile")
+
+    def get_pch_headers(self) -> List[str]:
+        pch = self.config.get("pch", {})
+        if not pch.get("enabled", True):
+            return []
+        return pch.get("headers", ["bits/stdc++.h"])
+
     def update_compiler_flags(self, flags: List[str]) -> None:
         self.config["compile"]["flags"] = flags
         self.save_config()
+        self.notify_listeners("compile")
 
     def update_compiler(self, compiler: str) -> None:
         self.config["compile"]["command"] = compiler
         self.save_config()
+        self.notify_listeners("compile")
 
     def update_template(self, template: str) -> None:
         self.config["paths"]["template"] = template
@@ -1,14 +1,97 @@
+import dataclasses
+import functools
+import hashlib
+import io
 import os
-import shutil
+import re
 import subprocess
-from typing import Optional
+import sys
+import tempfile
+import threading
+import yaml
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Sequence,
+    Union,
+)
 from pathlib import Path
-from .config import Config
+from .cache import CompileCache
+from .compare import CompareMode, CompareOptions, Mismatch, compare_streams
+from .config import BuildSettings, Config
+from .lazy import Lazy
+from .pch import PrecompiledHeaders
+from .scaffold import Scaffolder
+from .judge import REJECT_CODES, Verdict, judge
+from .output import CapturedOutput
+from .process import (
+    CompileResult,
+    Launcher,
+    Limits,
+    OutputCallback,
+    ProcessResult,
+    run_process,
+)
+from .testcases import TestCase, TestResult, natural_key
+from .testpack import PackedTest, TestPack
+
+if TYPE_CHECKING:
+    from .history import Comparison, RunHistory
+    from .remote import JudgeClient
+
+MAIN_SCRIPT = Path(__file__).resolve().parent.parent / "main.py"
+STDIN_PATH = "/dev/stdin"
+SHADOW_MEMORY_SANITIZERS = {"address", "hwaddress", "memory", "thread"}
+# Generators, checkers and interactors get this many times the solution's time
+HELPER_TIME_FACTOR = 5
+QUOTED_INCLUDE_RE = re.compile(rb'^\s*#\s*include\s*"([^"]+)"', re.MULTILINE)
 
 
 class ContestManager:
-    def __init__(self):
+    def __init__(self, use_server: bool = True):
         self.config = Config()
+        self.cache = CompileCache(
+            self.config.get_cache_dir(), self.config.get_cache_max_bytes()
+        )
+        self.pch = PrecompiledHeaders(self.config, self.config.get_cache_dir())
+        self.launcher = Launcher(
+            self.config.get_compiler(), self.config.get_cache_dir()
+        )
+        # Opened, and its module imported, only when a run is recorded
+        self.history: "Lazy[RunHistory]" = Lazy(self._open_history)
+        self.config.add_listener(self._on_config_changed)
+        self.use_server = use_server
+
+    @functools.cached_property
+    def remote(self) -> Optional["JudgeClient"]:
+        # Jobs go to a judge server whenever one is listening on the socket,
+        # and run here when there is none; the server's own workers always
+        # run them here
+        if not self.use_server:
+            return None
+        server = self.config.get_server_settings()
+        from .remote import JudgeClient
+
+        return JudgeClient(server["socket"], server["owner"])
+
+    def _open_history(self) -> "RunHistory":
+        from .history import RunHistory
+
+        return RunHistory(self.config.get_history_settings()["path"])
+
+    def _on_config_changed(self, section: str) -> None:
+        # The PCH key covers the compiler and flags, so a change leaves the old
+        # build unused and compile() builds the new one when it first needs it;
+        # callers rebuild ahead of time off their own thread with prepare_all
+        if section == "compile":
+            self.launcher = Launcher(
+                self.config.get_compiler(), self.config.get_cache_dir()
+            )
 
     def create_contest_dir(self, contest_number: str) -> Path:
         contest_dir = self.config.get_workspace_path() / contest_number
@@ -20,50 +103,627 @@ class ContestManager:
         contest_dir: Path,
         problem_numbers: list[str],
         template_name: Optional[str] = None,
-    ):
-        template_path = self.get_template_path(template_name)
+    ) -> int:
+        return self.create_contests([contest_dir], problem_numbers, template_name)
+
+    def create_contests(
+        self,
+        contest_dirs: list[Path],
+        problem_numbers: list[str],
+        template_name: Optional[str] = None,
+    ) -> int:
+        # The template is read and its placeholders found once for the batch
+        scaffolder = Scaffolder(self.config, self.get_template_path(template_name))
+        return scaffolder.create(contest_dirs, problem_numbers)
 
-        for prob in problem_numbers:
-            prob_file = contest_dir / self.config.get_problem_file_name(prob)
-            input_file = contest_dir / self.config.get_input_file_name(prob)
-            output_file = contest_dir / self.config.get_output_file_name(prob)
+    def compile(
+        self,
+        problem_path: Path,
+        cancel: Optional[threading.Event] = None,
+        profile: Optional[str] = None,
+    ) -> CompileResult:
+        # Each profile has its own flags, so its own cache entries and PCH
+        settings = self.config.get_build_settings(profile)
+        source = problem_path.read_bytes()
+        # The server only gets the source's bytes, so one that includes its
+        # own headers is built here where they can be found
+        if self.remote is not None and not local_includes(problem_path, source):
+            compiled = self._compile_remotely(problem_path, source, settings, cancel)
+            if compiled is not None:
+                return compiled
+        return self.compile_source(problem_path, source, settings, cancel)
+
+    def compile_source(
+        self,
+        problem_path: Path,
+        source: bytes,
+        settings: BuildSettings,
+        cancel: Optional[threading.Event] = None,
+    ) -> CompileResult:
+        flags = settings.flags
+        # Recorded with every run, so history can tell source versions apart
+        build = {"source_hash": hashlib.sha256(source).hexdigest(), "flags": flags}
+        headers = [path.read_bytes() for path in local_includes(problem_path, source)]
+        key = self.cache.make_key(
+            source, settings.compiler, flags, settings.template, headers
+        )
+        executable = self.cache.lookup(key)
+        if executable is not None:
+            return CompileResult(executable, "", 0.0, cached=True, **build)
+
+        pch_dir = self.pch.prepare(build=settings)
+        if pch_dir is not None:
+            flags = ["-I", str(pch_dir), *flags]
+
+        build_path = self.cache.temp_path(key)
+        compile_cmd = self.config.get_compile_command(
+            str(problem_path), str(build_path), flags=flags, build=settings
+        )
+
+        result = run_process(compile_cmd, cancel=cancel)
+        if not result.success:
+            build_path.unlink(missing_ok=True)
+            error = result.exit_description if result.cancelled else result.stderr
+            return CompileResult(
+                None, error, result.wall_time, cancelled=result.cancelled, **build
+            )
+
+        if not build_path.exists():
+            return CompileResult(
+                None,
+                f"Compiler did not produce an executable at {build_path}",
+                result.wall_time,
+                **build,
+            )
+        return CompileResult(
+            self.cache.store(key, build_path), "", result.wall_time, **build
+        )
 
-            if not prob_file.exists():
-                shutil.copy2(template_path, prob_file)
-            if not input_file.exists():
-                input_file.touch()
-            if not output_file.exists():
-                output_file.touch()
+    def _compile_remotely(
+        self,
+        problem_path: Path,
+        source: bytes,
+        settings: BuildSettings,
+        cancel: Optional[threading.Event],
+    ) -> Optional[CompileResult]:
+        key = self.cache.make_key(
+            source, settings.compiler, settings.flags, settings.template
+        )
+        build = {
+            "source_hash": hashlib.sha256(source).hexdigest(),
+            "flags": settings.flags,
+        }
+        # The executable comes back only when it is not already cached here
+        executable = self.cache.lookup(key)
+        reply = self.remote.compile(
+            problem_path.name, source, settings, executable is None, cancel
+        )
+        if reply is None:
+            return None
+        compiled, binary = reply
+        if not compiled.success:
+            return dataclasses.replace(compiled, **build)
+        # What runs here is always this cache's copy, never a path the server
+        # names, and only for the key this source and these settings give
+        if compiled.executable.name != key:
+            return None
+        if binary is not None:
+            build_path = self.cache.temp_path(key)
+            build_path.write_bytes(binary)
+            build_path.chmod(0o755)
+            executable = self.cache.store(key, build_path)
+        if executable is None:
+            return None
+        return dataclasses.replace(compiled, executable=executable, **build)
+
+    def compile_all(
+        self, problem_paths: list[Path], profile: Optional[str] = None
+    ) -> list[CompileResult]:
+        if not problem_paths:
+            return []
+
+        # The compiler is single-threaded per translation unit
+        workers = min(len(problem_paths), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(
+                pool.map(
+                    lambda path: self.compile(path, profile=profile), problem_paths
+                )
+            )
+
+    def warm_up(
+        self, contest_dir: Path, profile: Optional[str] = None
+    ) -> list[tuple[list[str], CompileResult]]:
+        # Problems scaffolded from the same template share one cache entry,
+        # so each distinct source is compiled only once
+        self.pch.prepare(profile)
+        groups: dict[bytes, list[str]] = {}
+        for problem in self.discover_problems(contest_dir):
+            path = contest_dir / self.config.get_problem_file_name(problem)
+            groups.setdefault(path.read_bytes(), []).append(problem)
+
+        problems = list(groups.values())
+        paths = [
+            contest_dir / self.config.get_problem_file_name(names[0])
+            for names in problems
+        ]
+        return list(zip(problems, self.compile_all(paths, profile)))
+
+    def start_warm_up(
+        self, contest_dir: Path, profile: Optional[str] = None
+    ) -> subprocess.Popen:
+        command = [sys.executable, str(MAIN_SCRIPT), "warm", str(contest_dir)]
+        if profile is not None:
+            command += ["--profile", profile]
+        # Detached, so it keeps going after the CLI exits or the TUI moves on
+        return subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+    def run_executable(
+        self,
+        executable: Path,
+        input_path: Optional[Path],
+        cwd: Optional[Path] = None,
+        limits: Optional[Limits] = None,
+        args: Sequence[str] = (),
+        on_output: Optional[OutputCallback] = None,
+        cancel: Optional[threading.Event] = None,
+        feed: Optional[Iterable[memoryview]] = None,
+    ) -> ProcessResult:
+        # Fed input arrives on the solution's stdin pipe
+        input_file = STDIN_PATH if feed is not None else str(input_path.resolve())
+        run_cmd = self.config.get_run_command(
+            os.path.relpath(executable, cwd or os.getcwd()), input_file, args
+        )
+        return run_process(
+            run_cmd,
+            cwd=cwd,
+            launcher=self.launcher.path(),
+            limits=limits,
+            on_output=on_output,
+            cancel=cancel,
+            memory_limit=self.config.get_output_settings()["memory_limit"],
+            feed=feed,
+        )
+
+    def preview(self, output: CapturedOutput) -> str:
+        settings = self.config.get_output_settings()
+        return output.preview(settings["head_lines"], settings["tail_lines"])
 
     def compile_and_run(
-        self, problem_path: Path, input_path: Path
-    ) -> tuple[str, str, bool]:
-        problem_name = problem_path.stem
-        executable = str(problem_path.parent / problem_name)
-
-        compile_cmd = self.config.get_compile_command(str(problem_path), executable)
-        run_cmd = self.config.get_run_command(executable, str(input_path))
-
-        try:
-            subprocess.run(compile_cmd, shell=True, check=True, capture_output=True)
-        except subprocess.CalledProcessError as e:
-            return "", e.stderr.decode(), False
-
-        try:
-            result = subprocess.run(
-                run_cmd, shell=True, check=True, capture_output=True, text=True
+        self,
+        problem_path: Path,
+        input_path: Path,
+        limits: Optional[Limits] = None,
+        on_output: Optional[OutputCallback] = None,
+        cancel: Optional[threading.Event] = None,
+        profile: Optional[str] = None,
+    ) -> tuple[CompileResult, Optional[ProcessResult]]:
+        compiled = self.compile(problem_path, cancel=cancel, profile=profile)
+        if not compiled.success:
+            return compiled, None
+        # Streamed output needs the process here, not behind the server
+        if self.remote is not None and on_output is None:
+            result = self.remote.run(compiled.executable, input_path, limits, cancel)
+            if result is not None:
+                return compiled, result
+        return compiled, self.run_executable(
+            compiled.executable,
+            input_path,
+            limits=limits,
+            on_output=on_output,
+            cancel=cancel,
+        )
+
+    def get_limits(
+        self,
+        contest_dir: Path,
+        problem: str,
+        time_limit: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        profile: Optional[str] = None,
+    ) -> Limits:
+        limits = self.config.get_limits()
+        contest_config = self.load_contest_config(contest_dir)
+        limits.update(contest_config.get("limits", {}))
+        limits.update(contest_config.get("problems", {}).get(problem, {}))
+
+        if time_limit is not None:
+            limits["time"] = time_limit
+        if memory_limit is not None:
+            limits["memory"] = memory_limit
+        return Limits(
+            time=float(limits["time"]),
+            memory=int(limits["memory"]),
+            limit_address_space=not uses_shadow_memory(
+                self.config.get_build_flags(profile)
+            ),
+        )
+
+    def get_compare_options(
+        self, contest_dir: Path, problem: str, mode: Optional[str] = None
+    ) -> CompareOptions:
+        settings = self.config.get_compare_settings()
+        contest_config = self.load_contest_config(contest_dir)
+        settings.update(contest_config.get("compare", {}))
+        problem_config = contest_config.get("problems", {}).get(problem, {})
+        settings.update(problem_config.get("compare", {}))
+
+        # A problem's checker is used unless a mode is asked for explicitly
+        checker = contest_dir / self.config.get_checker_file_name(problem)
+        if mode is not None:
+            settings["mode"] = mode
+        return CompareOptions(
+            mode=CompareMode(settings["mode"]),
+            abs_eps=float(settings["abs_eps"]),
+            rel_eps=float(settings["rel_eps"]),
+            checker=checker if mode is None and checker.exists() else None,
+        )
+
+    def load_contest_config(self, contest_dir: Path) -> Dict[str, Any]:
+        contest_config_path = contest_dir / self.config.get_contest_config_name()
+        if not contest_config_path.exists():
+            return {}
+        with open(contest_config_path) as f:
+            return yaml.safe_load(f) or {}
+
+    def discover_problems(self, contest_dir: Path) -> list[str]:
+        sources = {}
+        for path in contest_dir.iterdir():
+            name = self.config.parse_file_name("problem", path.name)
+            if name is not None and "." not in name and path.is_file():
+                sources[path.name] = name
+
+        helpers = set()
+        for name in sources.values():
+            helpers.add(self.config.get_generator_file_name(name))
+            helpers.add(self.config.get_brute_file_name(name))
+            helpers.add(self.config.get_interactor_file_name(name))
+            helpers.add(self.config.get_checker_file_name(name))
+        problems = [name for file, name in sources.items() if file not in helpers]
+        return sorted(problems, key=natural_key)
+
+    def discover_tests(self, contest_dir: Path, problem: str) -> list[TestCase]:
+        cases = []
+        for path in contest_dir.iterdir():
+            name = self.config.parse_file_name("input", path.name)
+            if name is None or not name.startswith(f"{problem}."):
+                continue
+            if self.config.parse_file_name("output", path.name) is not None:
+                continue
+            cases.append(self._make_test_case(contest_dir, path.parent, name))
+
+        tests_dir = contest_dir / self.config.get_tests_dir_name(problem)
+        if tests_dir.is_dir():
+            for path in tests_dir.iterdir():
+                name = self.config.parse_file_name("input", path.name)
+                if name is None:
+                    continue
+                if self.config.parse_file_name("output", path.name) is not None:
+                    continue
+                cases.append(self._make_test_case(contest_dir, tests_dir, name))
+
+            pack = TestPack(tests_dir)
+            for packed in pack.tests():
+                cases.append(self._make_packed_case(contest_dir, pack, packed))
+
+        cases.sort(key=lambda case: natural_key(case.name))
+
+        base = self._make_test_case(contest_dir, contest_dir, problem)
+        if base.input_path.exists() and (
+            not cases or base.input_path.stat().st_size > 0
+        ):
+            cases.insert(0, base)
+        return cases
+
+    def _make_test_case(
+        self, contest_dir: Path, directory: Path, name: str
+    ) -> TestCase:
+        input_path = directory / self.config.get_input_file_name(name)
+        return TestCase(
+            name=str(input_path.relative_to(contest_dir)),
+            input_path=input_path,
+            output_path=directory / self.config.get_output_file_name(name),
+        )
+
+    def _make_packed_case(
+        self, contest_dir: Path, pack: TestPack, packed: PackedTest
+    ) -> TestCase:
+        return TestCase(
+            name=f"{pack.directory.relative_to(contest_dir)}/pack:{packed.name}",
+            input_path=pack.data_path,
+            output_path=pack.data_path,
+            pack=pack,
+            packed=packed,
+        )
+
+    def run_test_case(
+        self,
+        executable: Path,
+        case: TestCase,
+        limits: Limits,
+        options: Optional[CompareOptions] = None,
+        cancel: Optional[threading.Event] = None,
+        checker: Optional[CompileResult] = None,
+    ) -> TestResult:
+        if self.remote is not None:
+            result = self.remote.test(
+                executable, case, limits, options, checker, cancel
+            )
+            if result is not None:
+                return result
+
+        feed = case.input_feed()
+        comment = ""
+        with tempfile.TemporaryDirectory(prefix="seepee-") as workdir:
+            workdir = Path(workdir)
+            result = self.run_executable(
+                executable,
+                case.input_path if feed is None else None,
+                cwd=workdir,
+                limits=limits,
+                cancel=cancel,
+                feed=feed,
+            )
+            # A checker only looks at answers that ran within the limits
+            verdict = judge(result, limits, matches=True)
+            if checker is not None and verdict == Verdict.AC and not result.cancelled:
+                verdict, comment = self.run_checker(
+                    checker, case, result, limits, workdir
+                )
+
+        settings = self.config.get_output_settings()
+        expected = case.expected_output(settings["memory_limit"])
+        mismatch = diff = None
+        if result.success and checker is None:
+            mismatch = self.compare_output(result.captured_stdout, expected, options)
+        if mismatch is not None:
+            from .diff import first_divergence
+
+            diff = first_divergence(
+                result.captured_stdout,
+                expected,
+                mismatch,
+                settings["diff_context"],
+            )
+        if checker is None:
+            matches = result.success and mismatch is None
+            verdict = judge(result, limits, matches)
+        return TestResult(
+            case,
+            result,
+            verdict,
+            expected=self.preview(expected),
+            output=self.preview(result.captured_stdout),
+            error=self.preview(result.captured_stderr),
+            mismatch=mismatch,
+            diff=diff,
+            comment=comment,
+        )
+
+    def compile_checker(
+        self,
+        options: Optional[CompareOptions],
+        cancel: Optional[threading.Event] = None,
+    ) -> Optional[CompileResult]:
+        if options is None or options.checker is None:
+            return None
+        # Cached like any solution, so it is only rebuilt when it changes
+        return self.compile(options.checker, cancel=cancel)
+
+    def run_checker(
+        self,
+        checker: CompileResult,
+        case: TestCase,
+        result: ProcessResult,
+        limits: Limits,
+        workdir: Path,
+    ) -> tuple[Verdict, str]:
+        if not checker.success:
+            errors = checker.error.strip().splitlines()
+            error = next((line for line in errors if "error" in line), "")
+            return Verdict.FAIL, f"checker did not compile {error}".strip()
+
+        output = result.captured_stdout
+        output_path = output.path
+        if output.in_memory:
+            output_path = workdir / "output.txt"
+            output.save(output_path)
+        # Checkers take testlib's arguments: input, output, answer
+        checked = self.run_executable(
+            checker.executable,
+            Path(os.devnull),
+            cwd=workdir,
+            limits=dataclasses.replace(limits, time=limits.time * HELPER_TIME_FACTOR),
+            args=[
+                str(case.input_file(workdir).resolve()),
+                str(output_path.resolve()),
+                str(case.answer_file(workdir).resolve()),
+            ],
+        )
+        lines = checked.stderr.strip().splitlines()
+        comment = lines[-1] if lines else ""
+        if checked.success and not checked.timed_out:
+            return Verdict.AC, comment
+        if checked.returncode in REJECT_CODES and not checked.timed_out:
+            return Verdict.WA, comment
+        return Verdict.FAIL, f"checker: {checked.exit_description}"
+
+    def run_tests(
+        self,
+        executable: Path,
+        cases: list[TestCase],
+        limits: Limits,
+        options: Optional[CompareOptions] = None,
+        cancel: Optional[threading.Event] = None,
+        on_result: Optional[Callable[[TestResult], None]] = None,
+    ) -> list[TestResult]:
+        if not cases:
+            return []
+        checker = self.compile_checker(options, cancel)
+
+        def run_case(case: TestCase) -> TestResult:
+            result = self.run_test_case(
+                executable, case, limits, options, cancel, checker
+            )
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        workers = min(len(cases), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(run_case, cases))
+
+    def run_test_batches(
+        self,
+        batches: list[tuple[Path, list[TestCase], Limits, CompareOptions]],
+    ) -> list[list[TestResult]]:
+        checkers = [
+            self.compile_checker(options) if cases else None
+            for _, cases, _, options in batches
+        ]
+        jobs = [
+            (executable, case, limits, options, None, checker)
+            for (executable, cases, limits, options), checker in zip(batches, checkers)
+            for case in cases
+        ]
+        if not jobs:
+            return [[] for _ in batches]
+
+        workers = min(len(jobs), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = iter(pool.map(lambda job: self.run_test_case(*job), jobs))
+            return [[next(results) for _ in cases] for _, cases, _, _ in batches]
+
+    def compare_output(
+        self,
+        actual_output: Union[str, CapturedOutput],
+        expected_output: Union[Path, CapturedOutput],
+        options: Optional[CompareOptions] = None,
+    ) -> Optional[Mismatch]:
+        if isinstance(actual_output, str):
+            actual_output = CapturedOutput(data=actual_output.encode())
+        if isinstance(expected_output, Path):
+            expected_output = CapturedOutput.from_path(expected_output)
+        with actual_output.open() as actual, expected_output.open() as expected:
+            return compare_streams(actual, expected, options)
+
+    def verify_output(
+        self,
+        actual_output: str,
+        expected_output: str,
+        options: Optional[CompareOptions] = None,
+    ) -> bool:
+        mismatch = compare_streams(
+            io.BytesIO(actual_output.encode()),
+            io.BytesIO(expected_output.encode()),
+            options,
+        )
+        return mismatch is None
+
+    def record_results(
+        self,
+        contest_dir: Path,
+        problem: str,
+        compiled: CompileResult,
+        results: list[TestResult],
+        profile: Optional[str] = None,
+    ) -> bool:
+        return self._record(
+            contest_dir,
+            problem,
+            compiled,
+            profile,
+            [(r.case.name, r.verdict.value, r.process) for r in results],
+        )
+
+    def record_run(
+        self,
+        contest_dir: Path,
+        problem: str,
+        compiled: CompileResult,
+        input_path: Path,
+        result: ProcessResult,
+        limits: Limits,
+        profile: Optional[str] = None,
+    ) -> bool:
+        # Without expected output only the limits and exit status are judged
+        verdict = judge(result, limits, matches=True)
+        return self._record(
+            contest_dir,
+            problem,
+            compiled,
+            profile,
+            [
+                (
+                    os.path.relpath(input_path, contest_dir),
+                    None if verdict == Verdict.AC else verdict.value,
+                    result,
+                )
+            ],
+        )
+
+    def _record(
+        self,
+        contest_dir: Path,
+        problem: str,
+        compiled: CompileResult,
+        profile: Optional[str],
+        runs: list[tuple[str, Optional[str], ProcessResult]],
+    ) -> bool:
+        if not self.config.get_history_settings()["enabled"]:
+            return False
+        from .history import RunRecord
+
+        records = [
+            RunRecord(
+                contest=str(contest_dir.resolve()),
+                problem=problem,
+                test=test,
+                source_hash=compiled.source_hash,
+                flags=" ".join(compiled.flags),
+                profile=profile,
+                verdict=verdict,
+                wall_time=process.wall_time,
+                cpu_time=process.cpu_time,
+                max_rss_kb=process.max_rss_kb,
             )
-            return result.stdout, result.stderr, True
-        except subprocess.CalledProcessError as e:
-            return "", e.stderr, False
-        finally:
-            if os.path.exists(executable):
-                os.remove(executable)
-
-    def verify_output(self, actual_output: str, expected_output: str) -> bool:
-        actual = actual_output.strip().splitlines()
-        expected = expected_output.strip().splitlines()
-        return actual == expected
+            for test, verdict, process in runs
+            if not process.cancelled
+        ]
+        return self.history.record(records)
+
+    def find_regression(
+        self, contest_dir: Path, problem: str
+    ) -> Optional["Comparison"]:
+        settings = self.config.get_history_settings()
+        if not settings["enabled"]:
+            return None
+        comparison = self.history.latest_comparison(
+            str(contest_dir.resolve()),
+            problem,
+            settings["slowdown"],
+            settings["min_delta"],
+        )
+        return comparison if comparison is not None and comparison.regressed else None
+
+    def add_test_case(
+        self, contest_dir: Path, problem: str, input_text: str, output_text: str
+    ) -> TestCase:
+        tests_dir = contest_dir / self.config.get_tests_dir_name(problem)
+        pack = TestPack(tests_dir)
+        packed = pack.append(
+            None,
+            _with_final_newline(input_text).encode(),
+            _with_final_newline(output_text).encode(),
+            self.config.get_pack_compression(),
+        )
+        return self._make_packed_case(contest_dir, pack, packed)
 
     def write_input(self, contest_dir: Path, problem: str, content: str) -> None:
         input_path = contest_dir / self.config.get_input_file_name(problem)
@@ -88,3 +748,35 @@ class ContestManager:
             if template_path.exists():
                 return template_path
         return self.config.get_template_path()
+
+
+def uses_shadow_memory(flags: list[str]) -> bool:
+    # These sanitizers reserve terabytes of address space up front and abort
+    # under RLIMIT_AS, so memory is judged by peak RSS alone
+    for flag in flags:
+        if flag.startswith("-fsanitize="):
+            if SHADOW_MEMORY_SANITIZERS & set(flag.split("=", 1)[1].split(",")):
+                return True
+    return False
+
+
+def local_includes(source_path: Path, source: bytes) -> list[Path]:
+    # A quoted include is the project's own header only when it exists next
+    # to the file including it; otherwise the compiler finds it on the system
+    # include path, as with the template's "bits/stdc++.h"
+    found: list[Path] = []
+    pending = [(source_path, source)]
+    while pending:
+        path, text = pending.pop()
+        for match in QUOTED_INCLUDE_RE.finditer(text):
+            header = path.parent / os.fsdecode(match.group(1))
+            if header.is_file() and header.resolve() not in found:
+                found.append(header.resolve())
+                pending.append((header, header.read_bytes()))
+    return found
+
+
+def _with_final_newline(text: str) -> str:
+    if text and not text.endswith("\n"):
+        return text + "\n"
+    return text
@@ -0,0 +1,151 @@
+import collections
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, BinaryIO, List, Optional
+
+from .compare import END_OF_OUTPUT, Mismatch
+from .output import CapturedOutput
+
+if TYPE_CHECKING:
+    # Only rendering needs Rich, so finding a difference does not load it
+    from rich.text import Text
+
+DEFAULT_CONTEXT = 3
+LINE_LIMIT = 1 << 12
+WINDOW_CHARS = 80
+WINDOW_LEAD = 24
+
+TOKEN_RE = re.compile(rb"\S+")
+
+
+@dataclass
+class DiffSide:
+    first_line: int
+    lines: List[bytes]
+    focus: int
+    column: int
+
+    @property
+    def focus_line(self) -> Optional[bytes]:
+        if self.focus < len(self.lines):
+            return self.lines[self.focus]
+        return None
+
+
+@dataclass
+class Diff:
+    expected: DiffSide
+    actual: DiffSide
+
+
+def first_divergence(
+    actual: CapturedOutput,
+    expected: CapturedOutput,
+    mismatch: Mismatch,
+    context: int = DEFAULT_CONTEXT,
+) -> Diff:
+    with actual.open() as stream:
+        actual_side = _read_window(stream, mismatch.line, mismatch.column, context)
+    with expected.open() as stream:
+        expected_side = _read_window(
+            stream, mismatch.expected_line, mismatch.expected_column, context
+        )
+    return Diff(expected_side, actual_side)
+
+
+def _read_window(stream: BinaryIO, line: int, column: int, context: int) -> DiffSide:
+    # Only the lines up to the divergence plus the context after it are read,
+    # and overly long lines are cut, so this stays cheap on huge outputs
+    before = collections.deque(maxlen=context)
+    after = []
+    number = 0
+    while number < line + context:
+        text = _read_line(stream)
+        if text is None:
+            break
+        number += 1
+        if number < line:
+            before.append(text)
+        else:
+            after.append(text)
+    first_line = line - len(before)
+    return DiffSide(first_line, [*before, *after], len(before), column)
+
+
+def _read_line(stream: BinaryIO) -> Optional[bytes]:
+    line = stream.readline(LINE_LIMIT)
+    if not line:
+        return None
+    if not line.endswith(b"\n"):
+        # Skip the rest of a line that is longer than the limit
+        while (rest := stream.readline(LINE_LIMIT)) and not rest.endswith(b"\n"):
+            pass
+    return line.rstrip(b"\r\n")
+
+
+def render_side(side: DiffSide, style: str) -> "Text":
+    from rich.text import Text
+
+    text = Text()
+    width = len(str(side.first_line + max(len(side.lines), side.focus + 1)))
+    for index, line in enumerate(side.lines):
+        number = side.first_line + index
+        if index == side.focus:
+            text.append(f"{number:>{width}} │ ", style="bold")
+            text.append_text(_render_focus(line, side.column, style))
+        else:
+            text.append(f"{number:>{width}} │ ", style="dim")
+            text.append(_clip(line), style="dim")
+        text.append("\n")
+    if side.focus_line is None:
+        text.append(" " * width + " │ " + END_OF_OUTPUT, style=f"bold {style}")
+    text.rstrip()
+    return text
+
+
+def _render_focus(line: bytes, column: int, style: str) -> "Text":
+    from rich.text import Text
+
+    index = min(max(column - 1, 0), len(line))
+    start, end = _token_span(line, index)
+
+    window_start = max(0, start - WINDOW_LEAD)
+    window_end = max(window_start + WINDOW_CHARS, end)
+    text = Text(style=style)
+    if window_start > 0:
+        text.append("...", style="dim")
+    text.append(_decode(line[window_start:start]))
+    if end > start:
+        text.append(_decode(line[start:end]), style=f"bold reverse {style}")
+    else:
+        text.append("⏎", style=f"bold reverse {style}")
+    text.append(_decode(line[end:window_end]))
+    if window_end < len(line):
+        text.append("...", style="dim")
+    return text
+
+
+def _token_span(line: bytes, index: int) -> tuple[int, int]:
+    # Prefer the token at the difference, then the token after it (extra
+    # output on this side), then the one before it (this side ended early)
+    spans = [match.span() for match in TOKEN_RE.finditer(line)]
+    for start, end in spans:
+        if start <= index < end:
+            return start, end
+    for start, end in spans:
+        if start > index:
+            return start, end
+    for start, end in reversed(spans):
+        if end <= index:
+            return start, end
+    return index, index
+
+
+def _clip(line: bytes) -> str:
+    if len(line) > WINDOW_CHARS:
+        return _decode(line[:WINDOW_CHARS]) + "..."
+    return _decode(line)
+
+
+def _decode(data: bytes) -> str:
+    return data.decode(errors="replace")
@@ -0,0 +1,243 @@
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+LOCK_TIMEOUT = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    contest TEXT NOT NULL,
+    problem TEXT NOT NULL,
+    test TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    flags TEXT NOT NULL,
+    profile TEXT,
+    verdict TEXT,
+    wall_time REAL NOT NULL,
+    cpu_time REAL NOT NULL,
+    max_rss_kb INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_problem ON runs (contest, problem, id);
+"""
+
+COLUMNS = (
+    "recorded_at",
+    "contest",
+    "problem",
+    "test",
+    "source_hash",
+    "flags",
+    "profile",
+    "verdict",
+    "wall_time",
+    "cpu_time",
+    "max_rss_kb",
+)
+
+
+@dataclass
+class RunRecord:
+    contest: str
+    problem: str
+    test: str
+    source_hash: str
+    flags: str
+    profile: Optional[str]
+    # None for plain runs, which have no expected output to judge against
+    verdict: Optional[str]
+    wall_time: float
+    cpu_time: float
+    max_rss_kb: int
+    recorded_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class Version:
+    source_hash: str
+    flags: str
+    profile: Optional[str]
+    first_run: float
+    last_run: float = 0.0
+    last_id: int = 0
+    runs: int = 0
+    peak_kb: int = 0
+    # Best CPU time and latest verdict of each test
+    best_times: Dict[str, float] = field(default_factory=dict)
+    verdicts: Dict[str, Optional[str]] = field(default_factory=dict)
+
+    @property
+    def judged(self) -> int:
+        return sum(verdict is not None for verdict in self.verdicts.values())
+
+    @property
+    def passed(self) -> int:
+        return sum(verdict == "AC" for verdict in self.verdicts.values())
+
+    @property
+    def slowest(self) -> float:
+        return max(self.best_times.values(), default=0.0)
+
+
+@dataclass
+class Regression:
+    test: str
+    before: float
+    after: float
+
+    @property
+    def ratio(self) -> float:
+        return self.after / self.before if self.before else float("inf")
+
+
+@dataclass
+class Comparison:
+    version: Version
+    baseline: Version
+    tests: List[str]
+    before: float
+    after: float
+    regressed: bool
+    regressions: List[Regression]
+
+    @property
+    def ratio(self) -> float:
+        return self.after / self.before if self.before else float("inf")
+
+
+class RunHistory:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def record(self, records: List[RunRecord]) -> bool:
+        if not records:
+            return True
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        rows = [tuple(getattr(r, column) for column in COLUMNS) for r in records]
+        try:
+            with self._connect() as db:
+                db.executemany(
+                    f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                    rows,
+                )
+        except sqlite3.Error:
+            # History is best effort: a locked or unwritable database never
+            # fails the run it would have recorded
+            return False
+        return True
+
+    def problems(self, contest: str) -> List[str]:
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT DISTINCT problem FROM runs WHERE contest = ?", (contest,)
+            ).fetchall()
+        return [problem for (problem,) in rows]
+
+    def versions(self, contest: str, problem: str) -> List[Version]:
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT id, recorded_at, test, source_hash, flags, profile, verdict, "
+                "cpu_time, max_rss_kb FROM runs "
+                "WHERE contest = ? AND problem = ? ORDER BY id",
+                (contest, problem),
+            )
+            versions: Dict[tuple, Version] = {}
+            for (
+                run_id,
+                recorded_at,
+                test,
+                source_hash,
+                flags,
+                profile,
+                verdict,
+                cpu_time,
+                max_rss_kb,
+            ) in rows:
+                version = versions.setdefault(
+                    (source_hash, flags),
+                    Version(source_hash, flags, profile, first_run=recorded_at),
+                )
+                version.last_run = recorded_at
+                version.last_id = run_id
+                version.runs += 1
+                version.peak_kb = max(version.peak_kb, max_rss_kb)
+                best = version.best_times.get(test)
+                if best is None or cpu_time < best:
+                    version.best_times[test] = cpu_time
+                version.verdicts[test] = verdict
+        # A source that is reverted to becomes the latest version again
+        return sorted(versions.values(), key=lambda version: version.last_id)
+
+    def latest_comparison(
+        self, contest: str, problem: str, slowdown: float, min_delta: float
+    ) -> Optional[Comparison]:
+        # Checked after every test, so like record it is best effort: an
+        # unreadable database only means no regression is reported
+        try:
+            versions = self.versions(contest, problem)
+        except sqlite3.Error:
+            return None
+        if not versions:
+            return None
+        baseline = previous_version(versions, versions[-1])
+        if baseline is None:
+            return None
+        return compare_versions(versions[-1], baseline, slowdown, min_delta)
+
+    def clear(self, contest: Optional[str] = None) -> int:
+        with self._connect() as db:
+            if contest is None:
+                return db.execute("DELETE FROM runs").rowcount
+            return db.execute("DELETE FROM runs WHERE contest = ?", (contest,)).rowcount
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per call keeps this safe to use from worker threads
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=LOCK_TIMEOUT)) as db:
+            db.executescript(SCHEMA)
+            with db:
+                yield db
+
+
+def previous_version(versions: List[Version], version: Version) -> Optional[Version]:
+    # Only builds with the same flags are comparable: a debug or sanitizer
+    # build of the same source is expected to be slower
+    index = versions.index(version)
+    for candidate in reversed(versions[:index]):
+        if candidate.flags == version.flags:
+            return candidate
+    return None
+
+
+def compare_versions(
+    version: Version, baseline: Version, slowdown: float, min_delta: float
+) -> Optional[Comparison]:
+    # Best-of times are compared because scheduling noise only ever adds time
+    tests = [test for test in version.best_times if test in baseline.best_times]
+    if not tests:
+        return None
+
+    def slower(before: float, after: float) -> bool:
+        return after - before >= min_delta and after > before * (1 + slowdown)
+
+    regressions = [
+        Regression(test, baseline.best_times[test], version.best_times[test])
+        for test in tests
+        if slower(baseline.best_times[test], version.best_times[test])
+    ]
+    before = sum(baseline.best_times[test] for test in tests)
+    after = sum(version.best_times[test] for test in tests)
+    return Comparison(
+        version,
+        baseline,
+        tests,
+        before,
+        after,
+        regressed=slower(before, after) or bool(regressions),
+        regressions=sorted(regressions, key=lambda r: r.ratio, reverse=True),
+    )
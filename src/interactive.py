@@ -0,0 +1,239 @@
+import dataclasses
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+from rich.table import Table
+from rich.text import Text
+
+from .command import Command
+from .contest import HELPER_TIME_FACTOR, STDIN_PATH, ContestManager
+from .judge import REJECT_CODES, Verdict, describe_verdict, judge
+from .process import (
+    CompileResult,
+    InteractionResult,
+    Limits,
+    Message,
+    MessageCallback,
+    ProcessResult,
+    format_memory,
+    format_time,
+    run_interactive,
+)
+from .testcases import TestCase
+
+# The interactor's answer file argument, which it may write its own notes to
+TOUT_FILE = "tout.txt"
+# How each side's lines are marked in a transcript
+SENDER_MARKS = {"solution": (">", "cyan"), "interactor": ("<", "green")}
+
+
+@dataclass
+class InteractiveResult:
+    case: TestCase
+    interaction: InteractionResult
+    verdict: Verdict
+
+    @property
+    def solution(self) -> ProcessResult:
+        return self.interaction.solution
+
+    @property
+    def interactor(self) -> ProcessResult:
+        return self.interaction.interactor
+
+    @property
+    def passed(self) -> bool:
+        return self.verdict == Verdict.AC
+
+    @property
+    def status(self) -> str:
+        if self.verdict == Verdict.FAIL:
+            return (
+                f"{describe_verdict(self.verdict)} ({self.interactor.exit_description})"
+            )
+        return describe_verdict(self.verdict, self.solution)
+
+    @property
+    def comment(self) -> str:
+        # testlib reports its verdict as the last line on stderr
+        lines = self.interactor.stderr.strip().splitlines()
+        return lines[-1] if lines else ""
+
+
+class InteractiveRunner:
+    def __init__(
+        self,
+        manager: ContestManager,
+        solution_path: Path,
+        interactor_path: Path,
+        profile: Optional[str] = None,
+    ):
+        self.manager = manager
+        self.profile = profile
+        self.sources = {"solution": solution_path, "interactor": interactor_path}
+        self.executables: dict[str, Path] = {}
+
+    def compile(self) -> dict[str, CompileResult]:
+        compiled = self.manager.compile_all(list(self.sources.values()), self.profile)
+        results = dict(zip(self.sources, compiled))
+        self.executables = {
+            name: result.executable
+            for name, result in results.items()
+            if result.success
+        }
+        return results
+
+    def run_all(
+        self,
+        cases: List[TestCase],
+        limits: Limits,
+        cancel: Optional[threading.Event] = None,
+        on_result: Optional[Callable[[InteractiveResult], None]] = None,
+        on_message: Optional[MessageCallback] = None,
+    ) -> List[InteractiveResult]:
+        # Each case already runs two processes against each other, and a live
+        # transcript only makes sense one case at a time
+        results = []
+        for case in cases:
+            if cancel is not None and cancel.is_set():
+                break
+            result = self.run_case(case, limits, cancel, on_message)
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+        return results
+
+    def run_case(
+        self,
+        case: TestCase,
+        limits: Limits,
+        cancel: Optional[threading.Event] = None,
+        on_message: Optional[MessageCallback] = None,
+    ) -> InteractiveResult:
+        with tempfile.TemporaryDirectory(prefix="seepee-interact-") as workdir:
+            workdir = Path(workdir)
+            input_path = case.input_file(workdir)
+            answer_path = case.answer_file(workdir)
+            # Interactors take testlib's arguments: input, output, answer
+            args = [str(input_path.resolve()), str(workdir / TOUT_FILE)]
+            if answer_path.exists():
+                args.append(str(answer_path.resolve()))
+            interaction = run_interactive(
+                self._command("solution", workdir),
+                self._command("interactor", workdir, args),
+                cwd=workdir,
+                limits=limits,
+                interactor_limits=dataclasses.replace(
+                    limits, time=limits.time * HELPER_TIME_FACTOR
+                ),
+                cancel=cancel,
+                on_message=on_message,
+                memory_limit=self.manager.config.get_output_settings()["memory_limit"],
+                launcher=self.manager.launcher.path(),
+            )
+        return InteractiveResult(
+            case, interaction, judge_interaction(interaction, limits)
+        )
+
+    def _command(self, name: str, cwd: Path, args: Sequence[str] = ()) -> Command:
+        return self.manager.config.get_run_command(
+            os.path.relpath(self.executables[name], cwd), STDIN_PATH, args
+        )
+
+
+def judge_interaction(interaction: InteractionResult, limits: Limits) -> Verdict:
+    solution, interactor = interaction.solution, interaction.interactor
+    verdict = judge(solution, limits, matches=True)
+    # Whichever side stopped first is to blame: a solution killed for its
+    # limits leaves the interactor reading a closed pipe, which it reports as
+    # a wrong answer, while one the interactor rejected may spin on until it
+    # runs out of time
+    rejected_first = (
+        interactor.returncode in REJECT_CODES
+        and interactor.wall_time < solution.wall_time
+    )
+    if verdict in (Verdict.TLE, Verdict.MLE) and not rejected_first:
+        return verdict
+    if interactor.returncode in REJECT_CODES:
+        return Verdict.WA
+    if interactor.returncode != 0 or interactor.timed_out:
+        return Verdict.FAIL
+    return verdict
+
+
+def transcript_text(
+    messages: List[Message], head: int = 20, tail: int = 5, truncated: bool = False
+) -> Text:
+    lines = transcript_lines(messages)
+    if len(lines) > head + tail:
+        hidden = len(lines) - head - tail
+        lines = [*lines[:head], (None, f"... {hidden} more lines ..."), *lines[-tail:]]
+
+    text = Text()
+    for sender, line in lines:
+        if sender is None:
+            text.append(f"  {line}\n", style="dim")
+        else:
+            mark, style = SENDER_MARKS[sender]
+            text.append(f"{mark} {line}\n", style=style)
+    if truncated:
+        text.append("  (transcript truncated)\n", style="dim")
+    return text
+
+
+def transcript_lines(messages: List[Message]) -> List[tuple[str, str]]:
+    splitter = LineSplitter()
+    lines = [line for message in messages for line in splitter.feed(message)]
+    return lines + splitter.flush()
+
+
+class LineSplitter:
+    # Chunks arrive as the pipes deliver them; lines are rebuilt per sender,
+    # in the order each line was completed
+    def __init__(self):
+        self.pending: dict[str, bytes] = {}
+
+    def feed(self, message: Message) -> List[tuple[str, str]]:
+        data = self.pending.pop(message.sender, b"") + message.data
+        *complete, rest = data.split(b"\n")
+        if rest:
+            self.pending[message.sender] = rest
+        return [(message.sender, _decode(line).rstrip("\r")) for line in complete]
+
+    def flush(self) -> List[tuple[str, str]]:
+        lines = [(sender, _decode(rest)) for sender, rest in self.pending.items()]
+        self.pending.clear()
+        return lines
+
+
+def _decode(line: bytes) -> str:
+    return line.decode("utf-8", errors="replace")
+
+
+def results_table(results: List[InteractiveResult]) -> Table:
+    table = Table(title="Interaction Results")
+    table.add_column("Case", style="cyan")
+    table.add_column("Result")
+    table.add_column("Interactor")
+    table.add_column("Lines", justify="right")
+    table.add_column("Time", style="yellow")
+    table.add_column("CPU", style="yellow")
+    table.add_column("Memory", style="yellow")
+    for result in results:
+        table.add_row(
+            result.case.name,
+            Text(
+                f"{'✓' if result.passed else '✗'} {result.status}",
+                style="green" if result.passed else "red",
+            ),
+            Text(result.comment),
+            str(len(transcript_lines(result.interaction.messages))),
+            format_time(result.solution.wall_time),
+            format_time(result.solution.cpu_time),
+            format_memory(result.solution.max_rss_kb),
+        )
+    return table
@@ -0,0 +1,53 @@
+from enum import Enum
+from typing import Optional
+
+from .process import Limits, ProcessResult
+
+OUT_OF_MEMORY_MARKERS = ("std::bad_alloc", "Cannot allocate memory")
+# The runtime prints these just before aborting, so the tail is enough
+OUT_OF_MEMORY_SCAN_BYTES = 4096
+# testlib's exit codes for a wrong answer and a presentation error; any other
+# non-zero code means the checker or interactor itself failed
+REJECT_CODES = (1, 2)
+
+
+class Verdict(str, Enum):
+    AC = "AC"
+    WA = "WA"
+    TLE = "TLE"
+    MLE = "MLE"
+    RE = "RE"
+    # The checker or interactor failed, so the solution could not be judged
+    FAIL = "FAIL"
+
+
+VERDICT_NAMES = {
+    Verdict.AC: "Accepted",
+    Verdict.WA: "Wrong Answer",
+    Verdict.TLE: "Time Limit Exceeded",
+    Verdict.MLE: "Memory Limit Exceeded",
+    Verdict.RE: "Runtime Error",
+    Verdict.FAIL: "Judge Failed",
+}
+
+
+def judge(process: ProcessResult, limits: Limits, matches: bool) -> Verdict:
+    if process.timed_out or process.cpu_time > limits.time:
+        return Verdict.TLE
+    if process.exit_signal is not None and process.exit_signal.name == "SIGXCPU":
+        return Verdict.TLE
+    if process.max_rss_kb > limits.memory * 1024:
+        return Verdict.MLE
+    if not process.success:
+        stderr = process.captured_stderr.tail_bytes(OUT_OF_MEMORY_SCAN_BYTES)
+        if any(marker.encode() in stderr for marker in OUT_OF_MEMORY_MARKERS):
+            return Verdict.MLE
+        return Verdict.RE
+    return Verdict.AC if matches else Verdict.WA
+
+
+def describe_verdict(verdict: Verdict, process: Optional[ProcessResult] = None) -> str:
+    description = f"{verdict.value} {VERDICT_NAMES[verdict]}"
+    if verdict == Verdict.RE and process is not None:
+        description += f" ({process.exit_description})"
+    return description
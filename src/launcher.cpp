@@ -0,0 +1,104 @@
+// Runs argv[5..] as a child process and writes its exit status, rusage and
+// whether it was killed for exceeding the wall-clock limit to the file
+// descriptor given in argv[1]. Forking from this small process keeps the
+// parent's resident set out of the child's peak RSS.
+//
+// usage: launcher REPORT_FD CPU_SECONDS ADDRESS_SPACE_BYTES WALL_MS COMMAND...
+// A limit of 0 means unlimited. SIGTERM or SIGINT kills the command, and the
+// report is still written.
+#include <cerrno>
+#include <csignal>
+#include <cstdio>
+#include <cstdlib>
+#include <sys/resource.h>
+#include <sys/time.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+static volatile sig_atomic_t timed_out = 0;
+static volatile sig_atomic_t terminated = 0;
+static volatile pid_t child_pid = 0;
+
+static void on_alarm(int) {
+    timed_out = 1;
+    if (child_pid > 0) {
+        kill(-child_pid, SIGKILL);
+    }
+}
+
+static void on_terminate(int) {
+    terminated = 1;
+    if (child_pid > 0) {
+        kill(-child_pid, SIGKILL);
+    }
+}
+
+static void set_limit(int resource, rlim_t soft, rlim_t hard) {
+    struct rlimit limit;
+    limit.rlim_cur = soft;
+    limit.rlim_max = hard;
+    setrlimit(resource, &limit);
+}
+
+int main(int argc, char **argv) {
+    if (argc < 6) {
+        return 127;
+    }
+
+    int report_fd = atoi(argv[1]);
+    long cpu_seconds = atol(argv[2]);
+    long long address_space = atoll(argv[3]);
+    long wall_ms = atol(argv[4]);
+
+    signal(SIGTERM, on_terminate);
+    signal(SIGINT, on_terminate);
+    pid_t pid = fork();
+    if (pid < 0) {
+        return 127;
+    }
+    if (pid == 0) {
+        close(report_fd);
+        setpgid(0, 0);
+        if (cpu_seconds > 0) {
+            set_limit(RLIMIT_CPU, (rlim_t)cpu_seconds, (rlim_t)cpu_seconds + 1);
+        }
+        if (address_space > 0) {
+            set_limit(RLIMIT_AS, (rlim_t)address_space, (rlim_t)address_space);
+        }
+        execvp(argv[5], argv + 5);
+        perror(argv[5]);
+        _exit(127);
+    }
+
+    child_pid = pid;
+    setpgid(pid, pid);
+    if (terminated) {
+        kill(-pid, SIGKILL);
+    }
+    if (wall_ms > 0) {
+        signal(SIGALRM, on_alarm);
+        struct itimerval timer = {};
+        timer.it_value.tv_sec = wall_ms / 1000;
+        timer.it_value.tv_usec = (wall_ms % 1000) * 1000;
+        setitimer(ITIMER_REAL, &timer, nullptr);
+    }
+
+    int status = 0;
+    struct rusage usage;
+    while (wait4(pid, &status, 0, &usage) < 0) {
+        if (errno != EINTR) {
+            return 127;
+        }
+    }
+
+    dprintf(report_fd, "%d %ld.%06ld %ld.%06ld %ld %d\n", status,
+            (long)usage.ru_utime.tv_sec, (long)usage.ru_utime.tv_usec,
+            (long)usage.ru_stime.tv_sec, (long)usage.ru_stime.tv_usec,
+            (long)usage.ru_maxrss, (int)timed_out);
+    close(report_fd);
+
+    if (WIFSIGNALED(status)) {
+        return 128 + WTERMSIG(status);
+    }
+    return WEXITSTATUS(status);
+}
@@ -0,0 +1,168 @@
+import io
+import os
+import shutil
+import weakref
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Union
+
+DEFAULT_MEMORY_LIMIT = 4 * 1024 * 1024
+DEFAULT_HEAD_LINES = 20
+DEFAULT_TAIL_LINES = 5
+PREVIEW_WINDOW = 1 << 16
+PREVIEW_LINE_CHARS = 200
+COUNT_CHUNK_SIZE = 1 << 20
+
+
+class CapturedOutput:
+    def __init__(
+        self,
+        data: Union[bytes, memoryview, None] = None,
+        path: Optional[Path] = None,
+        owned: bool = False,
+    ):
+        self.data = data
+        self.path = path
+        if path is not None and owned:
+            weakref.finalize(self, _unlink, path)
+
+    @classmethod
+    def from_file(
+        cls, file: BinaryIO, path: Path, memory_limit: int = DEFAULT_MEMORY_LIMIT
+    ) -> "CapturedOutput":
+        # Small outputs are kept in memory; large ones stay in the spill file,
+        # which is removed once the result is garbage collected
+        size = file.seek(0, io.SEEK_END)
+        if size <= memory_limit:
+            file.seek(0)
+            data = file.read()
+            _unlink(path)
+            return cls(data=data)
+        return cls(path=path, owned=True)
+
+    @classmethod
+    def from_path(cls, path: Path) -> "CapturedOutput":
+        if not path.exists():
+            return cls(data=b"")
+        return cls(path=path)
+
+    @property
+    def in_memory(self) -> bool:
+        return self.data is not None
+
+    @property
+    def size(self) -> int:
+        if self.data is not None:
+            return len(self.data)
+        return self.path.stat().st_size
+
+    def open(self) -> BinaryIO:
+        if isinstance(self.data, memoryview):
+            return io.BufferedReader(ViewReader(self.data))
+        if self.data is not None:
+            return io.BytesIO(self.data)
+        return open(self.path, "rb")
+
+    def text(self) -> str:
+        if self.data is not None:
+            return str(self.data, "utf-8", errors="replace")
+        return self.path.read_bytes().decode(errors="replace")
+
+    def tail_bytes(self, size: int) -> bytes:
+        if self.data is not None:
+            return bytes(self.data[-size:])
+        with self.open() as f:
+            f.seek(max(self.size - size, 0))
+            return f.read()
+
+    def save(self, destination: Path) -> None:
+        if self.data is not None:
+            destination.write_bytes(self.data)
+        else:
+            shutil.copyfile(self.path, destination)
+
+    def line_count(self) -> int:
+        count = 0
+        last = b"\n"
+        with self.open() as f:
+            while chunk := f.read(COUNT_CHUNK_SIZE):
+                count += chunk.count(b"\n")
+                last = chunk[-1:]
+        return count + (last != b"\n")
+
+    def preview(
+        self,
+        head_lines: int = DEFAULT_HEAD_LINES,
+        tail_lines: int = DEFAULT_TAIL_LINES,
+    ) -> str:
+        size = self.size
+        with self.open() as f:
+            head = f.read(PREVIEW_WINDOW)
+            lines = _split_lines(head)
+            if size <= PREVIEW_WINDOW:
+                if len(lines) <= head_lines + tail_lines:
+                    return head.decode(errors="replace")
+                total = len(lines)
+                tail = lines[len(lines) - tail_lines :]
+            else:
+                f.seek(size - PREVIEW_WINDOW)
+                # The first line of the window is usually cut short
+                tail = _split_lines(f.read())[1:]
+                total = self.line_count()
+                tail = tail[max(len(tail) - tail_lines, 0) :]
+                if total <= head_lines + tail_lines:
+                    # A few very long lines: the head window shows what fits
+                    head_lines, tail = total, []
+
+        shown = [_clip(line) for line in lines[:head_lines]]
+        omitted = total - len(shown) - len(tail)
+        if omitted > 0:
+            shown.append(f"... {omitted} more lines ...")
+        shown.extend(_clip(line) for line in tail)
+        return "\n".join(shown) + "\n"
+
+
+class ViewReader(io.RawIOBase):
+    def __init__(self, view: memoryview):
+        self.view = view
+        self.pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = max(min(len(buffer), len(self.view) - self.pos), 0)
+        buffer[:count] = self.view[self.pos : self.pos + count]
+        self.pos += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.pos, io.SEEK_END: len(self.view)}
+        self.pos = max(0, base[whence] + offset)
+        return self.pos
+
+    def tell(self) -> int:
+        return self.pos
+
+
+def _split_lines(data: bytes) -> List[bytes]:
+    lines = data.split(b"\n")
+    if lines and lines[-1] == b"":
+        lines.pop()
+    return lines
+
+
+def _clip(line: bytes) -> str:
+    text = line[: PREVIEW_LINE_CHARS * 4].decode(errors="replace")
+    if len(text) > PREVIEW_LINE_CHARS:
+        return text[:PREVIEW_LINE_CHARS] + "..."
+    return text
+
+
+def _unlink(path: Path) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from .command import split_words
+from .config import BuildSettings, Config
+from .process import run_process
+
+LINKER_FLAG_PREFIXES = ("-l", "-L", "-Wl,")
+
+
+class PrecompiledHeaders:
+    FAILED_MARKER = ".failed"
+    # Enough for each compile profile to keep its own build
+    KEEP_BUILDS = 8
+
+    def __init__(self, config: Config, cache_dir: Path):
+        self.config = config
+        self.pch_dir = Path(cache_dir) / "pch"
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def header_flags(build: BuildSettings) -> List[str]:
+        return [
+            flag for flag in build.flags if not flag.startswith(LINKER_FLAG_PREFIXES)
+        ]
+
+    def key(self, build: BuildSettings) -> str:
+        digest = hashlib.sha256()
+        for part in (
+            build.compiler,
+            "\0".join(self.header_flags(build)),
+            build.template,
+            "\0".join(self.config.get_pch_headers()),
+        ):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()[:16]
+
+    def prepare(
+        self, profile: Optional[str] = None, build: Optional[BuildSettings] = None
+    ) -> Optional[Path]:
+        headers = self.config.get_pch_headers()
+        if not headers:
+            return None
+
+        if build is None:
+            build = self.config.get_build_settings(profile)
+        build_dir = self.pch_dir / self.key(build)
+        with self._lock:
+            if (build_dir / self.FAILED_MARKER).exists():
+                return None
+            if all(self._gch_path(build_dir, h).exists() for h in headers):
+                os.utime(build_dir)
+                return build_dir
+
+            for header in headers:
+                if not self._build_header(build_dir, header, build):
+                    return None
+            self._prune()
+        return build_dir
+
+    def prepare_all(self) -> None:
+        # Every configured profile, so switching to one after a compiler or
+        # flags change does not pay for its header build
+        profiles = [None, *self.config.get_compile_profiles()]
+        builds = [self.config.get_build_settings(p) for p in profiles]
+        for build in {self.key(b): b for b in builds}.values():
+            self.prepare(build=build)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.pch_dir, ignore_errors=True)
+
+    def builds(self) -> List[Path]:
+        if not self.pch_dir.exists():
+            return []
+        return [d for d in self.pch_dir.iterdir() if d.is_dir()]
+
+    def _build_header(self, build_dir: Path, header: str, build: BuildSettings) -> bool:
+        gch_path = self._gch_path(build_dir, header)
+        if gch_path.exists():
+            return True
+
+        flags = self.header_flags(build)
+        header_path = self._resolve_header(header, flags, build.compiler)
+        if header_path is None:
+            self._mark_failed(build_dir, f"Could not locate header {header}")
+            return False
+
+        gch_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = gch_path.with_name(f"{gch_path.name}.{os.getpid()}.tmp")
+        build_cmd = self.config.get_compile_command(
+            header_path,
+            str(tmp_path),
+            flags=flags + ["-x", "c++-header"],
+            build=build,
+        )
+        result = run_process(build_cmd)
+        if not result.success or not tmp_path.exists():
+            tmp_path.unlink(missing_ok=True)
+            self._mark_failed(build_dir, result.stderr)
+            return False
+
+        os.replace(tmp_path, gch_path)
+        return True
+
+    def _resolve_header(
+        self, header: str, flags: List[str], compiler: str
+    ) -> Optional[str]:
+        probe_cmd = [*split_words([compiler]), *flags, "-x", "c++"]
+        try:
+            result = subprocess.run(
+                [*probe_cmd, "-fsyntax-only", "-H", "-"],
+                input=f"#include <{header}>\n",
+                capture_output=True,
+                text=True,
+            )
+        except OSError:
+            return None
+        if result.returncode != 0:
+            return None
+        for line in result.stderr.splitlines():
+            if line.startswith(". "):
+                return line[2:].strip()
+        return None
+
+    def _mark_failed(self, build_dir: Path, reason: str) -> None:
+        build_dir.mkdir(parents=True, exist_ok=True)
+        (build_dir / self.FAILED_MARKER).write_text(reason)
+
+    def _prune(self) -> None:
+        builds = sorted(self.builds(), key=lambda d: d.stat().st_mtime, reverse=True)
+        for stale in builds[self.KEEP_BUILDS :]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+    @staticmethod
+    def _gch_path(build_dir: Path, header: str) -> Path:
+        return build_dir / f"{header}.gch"
@@ -0,0 +1,771 @@
+import codecs
+import contextlib
+import hashlib
+import math
+import os
+import select
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Callable, Iterable, List, Optional, Union
+
+from .command import Command, split_words
+from .output import DEFAULT_MEMORY_LIMIT, CapturedOutput
+
+ADDRESS_SPACE_HEADROOM_MB = 64
+POLL_INTERVAL = 0.01
+STREAM_CHUNK_SIZE = 1 << 16
+
+OutputCallback = Callable[[str, str], None]
+
+
+@dataclass
+class Limits:
+    time: float
+    memory: int
+    limit_address_space: bool = True
+
+    @property
+    def wall_time(self) -> float:
+        return self.time * 2 + 1
+
+    @property
+    def address_space(self) -> int:
+        if not self.limit_address_space:
+            return 0
+        return (self.memory + ADDRESS_SPACE_HEADROOM_MB) * 1024 * 1024
+
+
+@dataclass
+class ProcessResult:
+    captured_stdout: CapturedOutput
+    captured_stderr: CapturedOutput
+    returncode: int
+    wall_time: float
+    user_time: float = 0.0
+    sys_time: float = 0.0
+    max_rss_kb: int = 0
+    timed_out: bool = False
+    cancelled: bool = False
+
+    @property
+    def stdout(self) -> str:
+        return self.captured_stdout.text()
+
+    @property
+    def stderr(self) -> str:
+        return self.captured_stderr.text()
+
+    @property
+    def success(self) -> bool:
+        return self.returncode == 0
+
+    @property
+    def cpu_time(self) -> float:
+        return self.user_time + self.sys_time
+
+    @property
+    def exit_signal(self) -> Optional[signal.Signals]:
+        if self.returncode < 0:
+            number = -self.returncode
+        elif self.returncode > 128:
+            # A shell reports a child killed by signal N as exit status 128 + N
+            number = self.returncode - 128
+        else:
+            return None
+        try:
+            return signal.Signals(number)
+        except ValueError:
+            return None
+
+    @property
+    def exit_description(self) -> str:
+        if self.cancelled:
+            return "Cancelled"
+        if self.exit_signal is not None:
+            return f"Killed by signal {self.exit_signal.name}"
+        return f"Exited with code {self.returncode}"
+
+
+@dataclass
+class CompileResult:
+    executable: Optional[Path]
+    error: str
+    compile_time: float
+    cached: bool = False
+    cancelled: bool = False
+    source_hash: str = ""
+    flags: List[str] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        return self.executable is not None
+
+
+@dataclass
+class Message:
+    time: float
+    sender: str
+    data: bytes
+
+
+@dataclass
+class InteractionResult:
+    solution: ProcessResult
+    interactor: ProcessResult
+    messages: List[Message] = field(default_factory=list)
+    # Set when the transcript outgrew its memory limit and was cut short
+    truncated: bool = False
+
+
+MessageCallback = Callable[[Message], None]
+
+
+class Launcher:
+    SOURCE = Path(__file__).with_name("launcher.cpp")
+
+    def __init__(self, compiler: str, cache_dir: Path):
+        self.compiler = compiler
+        self.launcher_dir = Path(cache_dir) / "launcher"
+        self._lock = threading.Lock()
+        self._failed = False
+
+    def path(self) -> Optional[Path]:
+        if not hasattr(os, "wait4") or self._failed:
+            return None
+
+        source = self.SOURCE.read_bytes()
+        digest = hashlib.sha256(self.compiler.encode() + b"\0" + source)
+        path = self.launcher_dir / digest.hexdigest()[:16]
+        with self._lock:
+            if path.exists():
+                return path
+
+            self.launcher_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            try:
+                result = subprocess.run(
+                    [*split_words([self.compiler]), "-O2", "-x", "c++"]
+                    + [str(self.SOURCE), "-o", str(tmp_path)],
+                    capture_output=True,
+                )
+            except OSError:
+                result = None
+            if result is None or result.returncode != 0:
+                tmp_path.unlink(missing_ok=True)
+                self._failed = True
+                return None
+            os.replace(tmp_path, path)
+        return path
+
+
+def run_process(
+    command: Union[str, Command],
+    cwd: Optional[Path] = None,
+    launcher: Optional[Path] = None,
+    limits: Optional[Limits] = None,
+    on_output: Optional[OutputCallback] = None,
+    cancel: Optional[threading.Event] = None,
+    memory_limit: int = DEFAULT_MEMORY_LIMIT,
+    feed: Optional[Iterable[memoryview]] = None,
+) -> ProcessResult:
+    if isinstance(command, str):
+        command = Command(shell=command)
+
+    with contextlib.ExitStack() as stack:
+        stdout = stack.enter_context(_spill_file())
+        stderr = stack.enter_context(_spill_file())
+        capture = _Capture(stdout, stderr, on_output, feed)
+        start = time.perf_counter()
+        try:
+            stdin = None
+            if feed is not None:
+                # The command's own "< file" is the feed's /dev/stdin
+                stdin = subprocess.PIPE
+            elif command.stdin is not None:
+                stdin = stack.enter_context(open(Path(cwd or ".", command.stdin), "rb"))
+            if launcher is not None:
+                report = _run_launched(
+                    command, stdin, cwd, launcher, limits, capture, cancel
+                )
+            else:
+                report = _run_direct(command, stdin, cwd, limits, capture, cancel)
+        except OSError as e:
+            # Mirror the shell, which reports a command it cannot start as 127
+            name = e.filename or command
+            stderr.write(f"{name}: {e.strerror}\n".encode())
+            report = _ExitReport(127)
+        capture.join()
+        wall_time = time.perf_counter() - start
+
+        result = ProcessResult(
+            captured_stdout=CapturedOutput.from_file(
+                stdout, Path(stdout.name), memory_limit
+            ),
+            captured_stderr=CapturedOutput.from_file(
+                stderr, Path(stderr.name), memory_limit
+            ),
+            returncode=report.returncode,
+            wall_time=wall_time,
+            timed_out=report.timed_out,
+            cancelled=report.cancelled,
+        )
+
+    if report.usage is not None:
+        result.user_time, result.sys_time, result.max_rss_kb = report.usage
+    return result
+
+
+def _spill_file() -> IO:
+    return tempfile.NamedTemporaryFile(prefix="seepee-output-", delete=False)
+
+
+class _Capture:
+    def __init__(
+        self,
+        stdout: IO,
+        stderr: IO,
+        on_output: Optional[OutputCallback],
+        feed: Optional[Iterable[memoryview]] = None,
+    ):
+        self.files = {"stdout": stdout, "stderr": stderr}
+        self.on_output = on_output
+        self.feed = feed
+        self.threads: list[threading.Thread] = []
+
+    def streams(self) -> dict:
+        if self.on_output is None:
+            return self.files
+        return {name: subprocess.PIPE for name in self.files}
+
+    def start(self, proc: subprocess.Popen) -> None:
+        if self.feed is not None:
+            self._start_thread(self._write, proc.stdin)
+        if self.on_output is None:
+            return
+        for name, sink in self.files.items():
+            self._start_thread(self._pump, name, getattr(proc, name), sink)
+
+    def _start_thread(self, target: Callable, *args) -> None:
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def join(self) -> None:
+        for thread in self.threads:
+            thread.join()
+
+    def _write(self, pipe: IO) -> None:
+        # Chunks go straight from the caller's buffers (such as mmap slices)
+        # into the pipe without being copied into Python objects
+        fd = pipe.fileno()
+        try:
+            for chunk in self.feed:
+                view = memoryview(chunk)
+                while view:
+                    view = view[os.write(fd, view) :]
+        except BrokenPipeError:
+            pass
+        finally:
+            pipe.close()
+
+    def _pump(self, name: str, pipe: IO, sink: IO) -> None:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        with pipe:
+            while chunk := pipe.read1(STREAM_CHUNK_SIZE):
+                sink.write(chunk)
+                text = decoder.decode(chunk)
+                if text:
+                    self.on_output(name, text)
+        text = decoder.decode(b"", final=True)
+        if text:
+            self.on_output(name, text)
+
+
+@dataclass
+class _ExitReport:
+    returncode: int
+    usage: Optional[tuple[float, float, int]] = None
+    timed_out: bool = False
+    cancelled: bool = False
+
+
+def _max_rss_kb(max_rss: int) -> int:
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+
+def _apply_limits(limits: Limits) -> None:
+    import resource
+
+    cpu_seconds = math.ceil(limits.time)
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    address_space = limits.address_space
+    if address_space > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (address_space, address_space))
+
+
+def _run_direct(
+    command: Command,
+    stdin: Optional[IO],
+    cwd: Optional[Path],
+    limits: Optional[Limits],
+    capture: _Capture,
+    cancel: Optional[threading.Event],
+) -> _ExitReport:
+    preexec_fn = None
+    if limits is not None and hasattr(os, "wait4"):
+        preexec_fn = lambda: _apply_limits(limits)
+
+    proc = subprocess.Popen(
+        command.shell if command.uses_shell else command.argv,
+        shell=command.uses_shell,
+        stdin=stdin,
+        cwd=cwd,
+        preexec_fn=preexec_fn,
+        start_new_session=limits is not None or cancel is not None,
+        **capture.streams(),
+    )
+    capture.start(proc)
+    deadline = None if limits is None else time.monotonic() + limits.wall_time
+
+    if not hasattr(os, "wait4"):
+        timed_out = cancelled = False
+        while True:
+            try:
+                proc.wait(timeout=POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            if deadline is not None and time.monotonic() >= deadline:
+                timed_out = True
+            elif cancel is not None and cancel.is_set():
+                cancelled = True
+            else:
+                continue
+            proc.kill()
+            proc.wait()
+            break
+        return _ExitReport(proc.returncode, timed_out=timed_out, cancelled=cancelled)
+
+    polling = deadline is not None or cancel is not None
+    timed_out = cancelled = False
+    while True:
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG if polling else 0)
+        if pid != 0:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            os.killpg(proc.pid, signal.SIGKILL)
+            timed_out = True
+            deadline = None
+        elif cancel is not None and cancel.is_set():
+            os.killpg(proc.pid, signal.SIGKILL)
+            cancelled = True
+            cancel = None
+        else:
+            time.sleep(POLL_INTERVAL)
+
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return _ExitReport(
+        proc.returncode,
+        (usage.ru_utime, usage.ru_stime, _max_rss_kb(usage.ru_maxrss)),
+        timed_out,
+        cancelled,
+    )
+
+
+def _run_launched(
+    command: Command,
+    stdin: Optional[IO],
+    cwd: Optional[Path],
+    launcher: Path,
+    limits: Optional[Limits],
+    capture: _Capture,
+    cancel: Optional[threading.Event],
+) -> _ExitReport:
+    read_fd, write_fd = os.pipe()
+    try:
+        proc = subprocess.Popen(
+            _launcher_argv(launcher, write_fd, command, limits),
+            stdin=stdin,
+            cwd=cwd,
+            pass_fds=(write_fd,),
+            **capture.streams(),
+        )
+    except OSError:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)
+    capture.start(proc)
+
+    cancelled = _wait(proc, cancel)
+    return _read_launcher_report(read_fd, proc.returncode, cancelled=cancelled)
+
+
+def _launcher_argv(
+    launcher: Path,
+    report_fd: int,
+    command: Command,
+    limits: Optional[Limits],
+    enforce_wall_time: bool = True,
+) -> List[str]:
+    cpu_seconds, address_space, wall_ms = 0, 0, 0
+    if limits is not None:
+        cpu_seconds = math.ceil(limits.time)
+        address_space = limits.address_space
+        if enforce_wall_time:
+            wall_ms = int(limits.wall_time * 1000)
+
+    argv = command.argv
+    if command.uses_shell:
+        argv = ["/bin/sh", "-c", command.shell]
+    return [
+        str(launcher),
+        str(report_fd),
+        str(cpu_seconds),
+        str(address_space),
+        str(wall_ms),
+        *argv,
+    ]
+
+
+def _read_launcher_report(
+    read_fd: int, returncode: int, timed_out: bool = False, cancelled: bool = False
+) -> _ExitReport:
+    with os.fdopen(read_fd) as report_file:
+        report = report_file.read().split()
+    if len(report) != 5:
+        return _ExitReport(returncode, timed_out=timed_out, cancelled=cancelled)
+
+    status, user_time, sys_time, max_rss, launcher_timed_out = report
+    return _ExitReport(
+        os.waitstatus_to_exitcode(int(status)),
+        (float(user_time), float(sys_time), _max_rss_kb(int(max_rss))),
+        timed_out or launcher_timed_out == "1",
+        cancelled,
+    )
+
+
+def _wait(proc: subprocess.Popen, cancel: Optional[threading.Event]) -> bool:
+    if cancel is None:
+        proc.wait()
+        return False
+
+    while True:
+        try:
+            proc.wait(timeout=POLL_INTERVAL)
+            return False
+        except subprocess.TimeoutExpired:
+            pass
+        if cancel.is_set() and proc.poll() is None:
+            # The launcher forwards SIGTERM as a SIGKILL to the solution's
+            # process group and still writes its report
+            proc.terminate()
+            proc.wait()
+            return True
+
+
+def run_interactive(
+    solution: Command,
+    interactor: Command,
+    cwd: Optional[Path] = None,
+    limits: Optional[Limits] = None,
+    interactor_limits: Optional[Limits] = None,
+    cancel: Optional[threading.Event] = None,
+    on_message: Optional[MessageCallback] = None,
+    memory_limit: int = DEFAULT_MEMORY_LIMIT,
+    launcher: Optional[Path] = None,
+) -> InteractionResult:
+    with contextlib.ExitStack() as stack:
+        peers = {
+            name: _Peer(
+                command,
+                peer_limits,
+                stack.enter_context(_spill_file()),
+                stack.enter_context(_spill_file()),
+            )
+            for name, command, peer_limits in (
+                ("solution", solution, limits),
+                ("interactor", interactor, interactor_limits),
+            )
+        }
+        start = time.perf_counter()
+        relay = _Relay(peers, on_message, memory_limit, start)
+        for peer in peers.values():
+            peer.spawn(cwd, start, launcher)
+        if all(peer.proc is not None for peer in peers.values()):
+            relay.run(cancel)
+        for peer in peers.values():
+            peer.finish()
+
+        results = {
+            name: peer.result(memory_limit, start) for name, peer in peers.items()
+        }
+    return InteractionResult(
+        results["solution"], results["interactor"], relay.messages, relay.truncated
+    )
+
+
+class _Peer:
+    def __init__(
+        self, command: Command, limits: Optional[Limits], stdout: IO, stderr: IO
+    ):
+        self.command = command
+        self.limits = limits
+        self.stdout = stdout
+        self.stderr = stderr
+        self.proc: Optional[subprocess.Popen] = None
+        self.deadline: Optional[float] = None
+        self.report: Optional[_ExitReport] = None
+        self.report_fd: Optional[int] = None
+        self.finished_at = 0.0
+        self.timed_out = self.cancelled = False
+
+    def spawn(
+        self, cwd: Optional[Path], start: float, launcher: Optional[Path]
+    ) -> None:
+        # The command's own "< file" is replaced by the pipe from the other side
+        if self.limits is not None:
+            self.deadline = start + self.limits.wall_time
+        popen_args = dict(
+            args=self.command.shell if self.command.uses_shell else self.command.argv,
+            shell=self.command.uses_shell,
+            start_new_session=True,
+        )
+        write_fd = None
+        if launcher is not None:
+            # The wall clock is enforced here, where the relay can see it
+            self.report_fd, write_fd = os.pipe()
+            popen_args = dict(
+                args=_launcher_argv(
+                    launcher, write_fd, self.command, self.limits, False
+                ),
+                pass_fds=(write_fd,),
+            )
+        elif self.limits is not None:
+            popen_args["preexec_fn"] = lambda: _apply_limits(self.limits)
+        try:
+            self.proc = subprocess.Popen(
+                **popen_args,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=self.stderr,
+                cwd=cwd,
+            )
+        except OSError as e:
+            name = e.filename or self.command
+            self.stderr.write(f"{name}: {e.strerror}\n".encode())
+            self.report = _ExitReport(127)
+            return
+        finally:
+            if write_fd is not None:
+                os.close(write_fd)
+        for pipe in (self.proc.stdin, self.proc.stdout):
+            os.set_blocking(pipe.fileno(), False)
+
+    @property
+    def running(self) -> bool:
+        return self.proc is not None and self.report is None
+
+    def kill(self) -> None:
+        if not self.running:
+            return
+        with contextlib.suppress(ProcessLookupError):
+            if self.report_fd is not None:
+                # The launcher kills the command's process group and reports
+                self.proc.terminate()
+            else:
+                os.killpg(self.proc.pid, signal.SIGKILL)
+
+    def poll(self, now: float) -> None:
+        if not self.running:
+            return
+        if self.deadline is not None and now >= self.deadline:
+            self.kill()
+            # It stopped here, however long the kernel takes to reap it
+            self.finished_at = now
+            self.timed_out = True
+            self.deadline = None
+        pid, status, usage = os.wait4(self.proc.pid, os.WNOHANG)
+        if pid != 0:
+            self._exited(status, usage, now)
+
+    def finish(self) -> None:
+        if self.running:
+            # The other side could not be started, or the relay was stopped
+            self.kill()
+            _, status, usage = os.wait4(self.proc.pid, 0)
+            self._exited(status, usage, time.perf_counter())
+        if self.proc is not None:
+            self.proc.stdin.close()
+            self.proc.stdout.close()
+
+    def _exited(self, status: int, usage, now: float) -> None:
+        self.proc.returncode = os.waitstatus_to_exitcode(status)
+        self.finished_at = self.finished_at or now
+        if self.report_fd is not None:
+            self.report = _read_launcher_report(
+                self.report_fd, self.proc.returncode, self.timed_out, self.cancelled
+            )
+            return
+        self.report = _ExitReport(
+            self.proc.returncode,
+            (usage.ru_utime, usage.ru_stime, _max_rss_kb(usage.ru_maxrss)),
+            self.timed_out,
+            self.cancelled,
+        )
+
+    def result(self, memory_limit: int, start: float) -> ProcessResult:
+        result = ProcessResult(
+            captured_stdout=CapturedOutput.from_file(
+                self.stdout, Path(self.stdout.name), memory_limit
+            ),
+            captured_stderr=CapturedOutput.from_file(
+                self.stderr, Path(self.stderr.name), memory_limit
+            ),
+            returncode=self.report.returncode,
+            wall_time=max(self.finished_at - start, 0.0),
+            timed_out=self.report.timed_out,
+            cancelled=self.report.cancelled,
+        )
+        if self.report.usage is not None:
+            result.user_time, result.sys_time, result.max_rss_kb = self.report.usage
+        return result
+
+
+@dataclass
+class _Direction:
+    sender: str
+    source: _Peer
+    sink: _Peer
+    source_fd: int
+    sink_fd: int
+    pending: bytearray = field(default_factory=bytearray)
+    reading: bool = True
+    writing: bool = True
+
+    @classmethod
+    def between(cls, sender: str, source: _Peer, sink: _Peer) -> "_Direction":
+        return cls(
+            sender, source, sink, source.proc.stdout.fileno(), sink.proc.stdin.fileno()
+        )
+
+    def close_sink(self) -> None:
+        self.pending.clear()
+        self.writing = False
+        self.sink.proc.stdin.close()
+
+
+class _Relay:
+    # A side that stops reading must not make SeePee buffer without bound;
+    # its peer is simply not read from until the backlog drains
+    BACKLOG_LIMIT = 1 << 20
+
+    def __init__(
+        self,
+        peers: dict[str, _Peer],
+        on_message: Optional[MessageCallback],
+        memory_limit: int,
+        start: float,
+    ):
+        self.peers = peers
+        self.on_message = on_message
+        self.memory_limit = memory_limit
+        self.start = start
+        self.messages: List[Message] = []
+        self.recorded = 0
+        self.truncated = False
+
+    def run(self, cancel: Optional[threading.Event]) -> None:
+        solution, interactor = self.peers["solution"], self.peers["interactor"]
+        directions = [
+            _Direction.between("solution", solution, interactor),
+            _Direction.between("interactor", interactor, solution),
+        ]
+
+        while True:
+            now = time.perf_counter()
+            if cancel is not None and cancel.is_set():
+                for peer in self.peers.values():
+                    peer.cancelled = True
+                    peer.kill()
+                cancel = None
+            for peer in self.peers.values():
+                peer.poll(now)
+            running = any(peer.running for peer in self.peers.values())
+
+            readers = {
+                d.source_fd: d
+                for d in directions
+                if d.reading and len(d.pending) < self.BACKLOG_LIMIT
+            }
+            writers = {d.sink_fd: d for d in directions if d.writing and d.pending}
+            if not readers and not writers:
+                if not running:
+                    break
+                time.sleep(POLL_INTERVAL)
+                continue
+            ready_read, ready_write, _ = select.select(
+                list(readers), list(writers), [], POLL_INTERVAL
+            )
+            if not ready_read and not ready_write and not running:
+                # Both exited and nothing more is in flight
+                break
+
+            for fd in ready_read:
+                self._read(readers[fd])
+            for fd in ready_write:
+                self._write(writers[fd])
+
+    def _read(self, direction: _Direction) -> None:
+        try:
+            chunk = os.read(direction.source_fd, STREAM_CHUNK_SIZE)
+        except BlockingIOError:
+            return
+        if not chunk:
+            direction.reading = False
+            if not direction.pending and direction.writing:
+                # End of input reaches the receiver only after the data before it
+                direction.close_sink()
+            return
+        direction.source.stdout.write(chunk)
+        self._record(direction.sender, chunk)
+        if direction.writing:
+            direction.pending += chunk
+
+    def _write(self, direction: _Direction) -> None:
+        try:
+            written = os.write(direction.sink_fd, direction.pending)
+        except BlockingIOError:
+            return
+        except BrokenPipeError:
+            # The receiver is gone; whatever it did not read is dropped
+            direction.close_sink()
+            return
+        del direction.pending[:written]
+        if not direction.pending and not direction.reading:
+            direction.close_sink()
+
+    def _record(self, sender: str, data: bytes) -> None:
+        message = Message(time.perf_counter() - self.start, sender, data)
+        if self.on_message is not None:
+            self.on_message(message)
+        if self.recorded + len(data) > self.memory_limit:
+            self.truncated = True
+            return
+        self.recorded += len(data)
+        self.messages.append(message)
+
+
+def format_time(seconds: float) -> str:
+    return f"{seconds * 1000:.0f} ms"
+
+
+def format_memory(kilobytes: int) -> str:
+    return f"{kilobytes / 1024:.1f} MB"
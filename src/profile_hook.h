@@ -0,0 +1,40 @@
+// Force-included into profiling builds with -include. gprof and gcov write
+// their data when the program exits, so a solution stopped by the CPU time
+// limit (SIGXCPU) or cancelled (SIGTERM) would otherwise leave no profile.
+// The handler writes the profile of the run so far itself and leaves with
+// _exit, which unlike exit runs no destructors or atexit handlers in the
+// middle of whatever the signal interrupted. The 128 + signal status still
+// reads as killed by that signal. The profiler defines SEEPEE_PROFILE_GPROF
+// and SEEPEE_PROFILE_GCOV for the instrumentation the build has.
+#include <csignal>
+#include <unistd.h>
+
+#ifdef SEEPEE_PROFILE_GPROF
+extern "C" void _mcleanup(void);
+#endif
+#ifdef SEEPEE_PROFILE_GCOV
+extern "C" void __gcov_dump(void);
+#endif
+
+namespace seepee_profile_hook {
+
+inline void on_stop(int signal_number) {
+#ifdef SEEPEE_PROFILE_GCOV
+    __gcov_dump();
+#endif
+#ifdef SEEPEE_PROFILE_GPROF
+    _mcleanup();
+#endif
+    _exit(128 + signal_number);
+}
+
+struct Installer {
+    Installer() {
+        std::signal(SIGXCPU, on_stop);
+        std::signal(SIGTERM, on_stop);
+    }
+};
+
+static Installer installer;
+
+}  // namespace seepee_profile_hook
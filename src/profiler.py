@@ -0,0 +1,296 @@
+import json
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from rich.table import Table
+
+from .contest import ContestManager
+from .judge import Verdict, judge
+from .process import Limits, ProcessResult, format_time, run_process
+from .testcases import TestCase
+
+HOOK_HEADER = Path(__file__).with_name("profile_hook.h")
+EXECUTABLE_NAME = "profile"
+GMON_FILE = "gmon.out"
+
+# One row of gprof's flat profile; the call columns are blank for functions
+# that were sampled but not compiled with -pg
+FLAT_PROFILE_RE = re.compile(
+    r"^\s*(\d+\.\d+)\s+(\d+\.\d+)\s+(\d+\.\d+)\s+"
+    r"(?:(\d+)\s+(\d+\.\d+)\s+(\d+\.\d+)\s+)?(\S.*)$"
+)
+# Startup code from SeePee's hook and static initializers is not the
+# solution's work, and samples in uninstrumented library code are often
+# attributed to the C runtime's frame_dummy
+IGNORED_FUNCTIONS = (
+    "seepee_profile_hook::",
+    "__static_initialization_and_destruction_",
+    "_GLOBAL__sub_I_",
+    "frame_dummy",
+)
+
+GPROF_FLAGS = {"-pg", "-p"}
+GCOV_FLAGS = {"--coverage", "-fprofile-arcs"}
+
+
+@dataclass
+class FunctionProfile:
+    name: str
+    percent: float
+    self_time: float
+    calls: Optional[int]
+
+
+@dataclass
+class LineProfile:
+    line: int
+    count: int
+    share: float
+    function: str
+    source: str
+
+
+@dataclass
+class ProfileReport:
+    case: TestCase
+    compile_time: float = 0.0
+    compile_error: str = ""
+    process: Optional[ProcessResult] = None
+    verdict: Optional[Verdict] = None
+    functions: List[FunctionProfile] = field(default_factory=list)
+    lines: List[LineProfile] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+
+
+class Profiler:
+    def __init__(
+        self,
+        manager: ContestManager,
+        problem_path: Path,
+        case: TestCase,
+        limits: Limits,
+        profile: Optional[str] = None,
+    ):
+        self.manager = manager
+        self.problem_path = problem_path
+        self.case = case
+        self.limits = limits
+        self.profile = profile
+        self.settings = manager.config.get_profiling_settings()
+
+    @classmethod
+    def for_problem(
+        cls,
+        manager: ContestManager,
+        contest_dir: Path,
+        problem: str,
+        limits: Limits,
+        profile: Optional[str] = None,
+    ) -> Optional["Profiler"]:
+        # The largest input is the one most likely to show where time goes
+        cases = [
+            case
+            for case in manager.discover_tests(contest_dir, problem)
+            if case.input_size > 0
+        ]
+        if not cases:
+            return None
+        problem_path = contest_dir / manager.config.get_problem_file_name(problem)
+        case = max(cases, key=lambda case: case.input_size)
+        return cls(manager, problem_path, case, limits, profile)
+
+    def run(self, cancel: Optional[threading.Event] = None) -> ProfileReport:
+        report = ProfileReport(self.case)
+        # The instrumented build is never cached: its data files land next to
+        # the executable and the profile is only valid for this one run
+        with tempfile.TemporaryDirectory(prefix="seepee-profile-") as workdir:
+            build_dir = Path(workdir)
+            executable = build_dir / EXECUTABLE_NAME
+            flags = [
+                *self.manager.config.get_build_flags(self.profile),
+                *self.settings["flags"],
+            ]
+            flags += [*hook_defines(flags), "-include", str(HOOK_HEADER)]
+            compile_cmd = self.manager.config.get_compile_command(
+                str(self.problem_path), str(executable), flags=flags
+            )
+            start = time.perf_counter()
+            compiled = run_process(compile_cmd, cancel=cancel)
+            report.compile_time = time.perf_counter() - start
+            if not compiled.success or not executable.exists():
+                report.compile_error = (
+                    compiled.exit_description if compiled.cancelled else compiled.stderr
+                )
+                return report
+
+            feed = self.case.input_feed()
+            report.process = self.manager.run_executable(
+                executable,
+                self.case.input_path if feed is None else None,
+                cwd=build_dir,
+                limits=self.limits,
+                cancel=cancel,
+                feed=feed,
+            )
+            report.verdict = judge(report.process, self.limits, matches=True)
+            if report.process.cancelled:
+                return report
+
+            report.functions = self._read_gprof(build_dir, executable, report.notes)
+            report.lines = self._read_gcov(build_dir, report.notes)
+        return report
+
+    def _read_gprof(
+        self, build_dir: Path, executable: Path, notes: List[str]
+    ) -> List[FunctionProfile]:
+        gmon = build_dir / GMON_FILE
+        if not gmon.exists():
+            notes.append("No gprof data: the solution did not exit normally")
+            return []
+        output = self._run_tool(
+            [self.settings["gprof"], "-b", "-p", str(executable), str(gmon)],
+            build_dir,
+            notes,
+        )
+        if output is None:
+            return []
+
+        functions = []
+        for line in output.splitlines():
+            match = FLAT_PROFILE_RE.match(line)
+            if match is None:
+                continue
+            percent, _, self_time, calls, _, _, name = match.groups()
+            if name.startswith(IGNORED_FUNCTIONS):
+                continue
+            functions.append(
+                FunctionProfile(
+                    name.strip(),
+                    float(percent),
+                    float(self_time),
+                    int(calls) if calls is not None else None,
+                )
+            )
+        if not functions:
+            notes.append("gprof recorded no time or calls in the solution's functions")
+        elif not any(f.self_time for f in functions):
+            notes.append(
+                "The run was too short for gprof's 10 ms samples, "
+                "so functions are ranked by calls"
+            )
+            functions.sort(key=lambda f: f.calls or 0, reverse=True)
+        return functions
+
+    def _read_gcov(self, build_dir: Path, notes: List[str]) -> List[LineProfile]:
+        data_files = sorted(str(path) for path in build_dir.glob("*.gcda"))
+        if not data_files:
+            notes.append("No gcov data: the solution did not exit normally")
+            return []
+        output = self._run_tool(
+            [self.settings["gcov"], "--json-format", "--stdout", *data_files],
+            build_dir,
+            notes,
+        )
+        if output is None:
+            return []
+
+        source = self.problem_path.resolve()
+        counts: dict[int, tuple[int, str]] = {}
+        # One JSON document per data file
+        for document in output.splitlines():
+            if not document.startswith("{"):
+                continue
+            report = json.loads(document)
+            cwd = Path(report.get("current_working_directory", "."))
+            for entry in report["files"]:
+                if (cwd / entry["file"]).resolve() != source:
+                    continue
+                names = {
+                    f["name"]: f.get("demangled_name", f["name"])
+                    for f in entry["functions"]
+                }
+                for line in entry["lines"]:
+                    count, _ = counts.get(line["line_number"], (0, ""))
+                    counts[line["line_number"]] = (
+                        count + line["count"],
+                        names.get(line.get("function_name"), ""),
+                    )
+
+        total = sum(count for count, _ in counts.values())
+        source_lines = self.problem_path.read_text(errors="replace").splitlines()
+        lines = [
+            LineProfile(
+                number,
+                count,
+                count / total if total else 0.0,
+                function,
+                source_lines[number - 1].strip() if number <= len(source_lines) else "",
+            )
+            for number, (count, function) in counts.items()
+            if count > 0
+        ]
+        return sorted(lines, key=lambda line: line.count, reverse=True)
+
+    def _run_tool(
+        self, command: List[str], cwd: Path, notes: List[str]
+    ) -> Optional[str]:
+        try:
+            result = subprocess.run(command, cwd=cwd, capture_output=True, text=True)
+        except OSError as e:
+            notes.append(f"{command[0]}: {e.strerror}")
+            return None
+        if result.returncode != 0:
+            notes.append(f"{command[0]} failed: {result.stderr.strip()}")
+            return None
+        return result.stdout
+
+
+def function_table(functions: List[FunctionProfile], limit: int) -> Table:
+    table = Table(title="Hottest Functions")
+    table.add_column("Function", style="cyan")
+    table.add_column("Time", style="yellow", justify="right")
+    table.add_column("Self", style="yellow", justify="right")
+    table.add_column("Calls", justify="right")
+    for function in functions[:limit]:
+        table.add_row(
+            function.name,
+            f"{function.percent:.1f}%",
+            format_time(function.self_time),
+            "-" if function.calls is None else str(function.calls),
+        )
+    return table
+
+
+def line_table(lines: List[LineProfile], limit: int) -> Table:
+    table = Table(title="Hottest Lines")
+    table.add_column("Line", style="cyan", justify="right")
+    table.add_column("Executions", style="yellow", justify="right")
+    table.add_column("Share", style="yellow", justify="right")
+    table.add_column("Function")
+    table.add_column("Source", style="green")
+    for line in lines[:limit]:
+        table.add_row(
+            str(line.line),
+            f"{line.count:,}",
+            f"{line.share:.1%}",
+            line.function,
+            line.source,
+        )
+    return table
+
+
+def hook_defines(flags: List[str]) -> List[str]:
+    # The hook writes out only the profile data the build produces; naming a
+    # writer the build lacks would not link
+    defines = []
+    if GPROF_FLAGS & set(flags):
+        defines.append("-DSEEPEE_PROFILE_GPROF")
+    if GCOV_FLAGS & set(flags):
+        defines.append("-DSEEPEE_PROFILE_GCOV")
+    return defines
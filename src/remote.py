@@ -0,0 +1,362 @@
+import base64
+import dataclasses
+import json
+import os
+import pwd
+import select
+import socket
+import stat
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .compare import CompareMode, CompareOptions, Mismatch
+from .config import BuildSettings
+from .diff import Diff, DiffSide
+from .judge import Verdict
+from .output import CapturedOutput
+from .process import POLL_INTERVAL, CompileResult, Limits, ProcessResult
+from .testcases import TestCase, TestResult
+
+CONNECT_TIMEOUT = 1.0
+MESSAGE_LIMIT = 1 << 30
+# A run's output beyond this is sent as its head and tail
+OUTPUT_LIMIT = 16 << 20
+# Jobs carry their inputs, so larger tests are run locally instead
+INPUT_LIMIT = 64 << 20
+
+Message = Dict[str, Any]
+
+
+class JudgeClient:
+    def __init__(self, socket_path: Path, owner: Optional[str] = None):
+        self.socket_path = Path(socket_path)
+        # Jobs only go to a server run by this user: yourself unless named,
+        # and nobody when the named user does not exist
+        try:
+            self.owner_uid = os.getuid() if owner is None else user_id(owner)
+        except ValueError:
+            self.owner_uid = None
+
+    @property
+    def available(self) -> bool:
+        try:
+            info = self.socket_path.stat()
+        except OSError:
+            return False
+        return stat.S_ISSOCK(info.st_mode) and info.st_uid == self.owner_uid
+
+    def request(
+        self, message: Message, cancel: Optional[threading.Event] = None
+    ) -> Optional[Message]:
+        # None means the daemon could not do the job, and the caller runs it
+        # locally instead; a cancelled wait also ends up there, where an
+        # already set cancel event stops the local run at once
+        if not self.available:
+            return None
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+                conn.settimeout(CONNECT_TIMEOUT)
+                conn.connect(str(self.socket_path))
+                # The socket file can be replaced after the check above; the
+                # process listening on it is what has to belong to the owner
+                if peer_uid(conn) != self.owner_uid:
+                    return None
+                conn.settimeout(None)
+                send_message(conn, message)
+                if cancel is not None:
+                    while not select.select([conn], [], [], POLL_INTERVAL)[0]:
+                        if cancel.is_set():
+                            return None
+                reply = receive_message(conn)
+        except (OSError, ValueError):
+            return None
+        if reply is None or not reply.get("ok"):
+            return None
+        return reply["result"]
+
+    def compile(
+        self,
+        name: str,
+        source: bytes,
+        build: BuildSettings,
+        with_binary: bool,
+        cancel: Optional[threading.Event] = None,
+    ) -> Optional[tuple[CompileResult, Optional[bytes]]]:
+        # The executable in the result is only the cache key it was stored
+        # under; its bytes come along when asked for
+        result = self.request(
+            {
+                "kind": "compile",
+                "name": name,
+                "source": encode_bytes(source),
+                "build": dataclasses.asdict(build),
+                "binary": with_binary,
+            },
+            cancel,
+        )
+        return None if result is None else decode_compile(result)
+
+    def run(
+        self,
+        executable: Path,
+        input_path: Path,
+        limits: Optional[Limits],
+        cancel: Optional[threading.Event] = None,
+    ) -> Optional[ProcessResult]:
+        if input_path.stat().st_size > INPUT_LIMIT:
+            return None
+        result = self.request(
+            {
+                "kind": "run",
+                "executable": executable.name,
+                "input": encode_bytes(input_path.read_bytes()),
+                "limits": encode_limits(limits),
+            },
+            cancel,
+        )
+        return None if result is None else decode_process(result)
+
+    def test(
+        self,
+        executable: Path,
+        case: TestCase,
+        limits: Limits,
+        options: Optional[CompareOptions],
+        checker: Optional[CompileResult],
+        cancel: Optional[threading.Event] = None,
+    ) -> Optional[TestResult]:
+        if case.input_size > INPUT_LIMIT:
+            return None
+        result = self.request(
+            {
+                "kind": "test",
+                "executable": executable.name,
+                "case": encode_case(case),
+                "limits": encode_limits(limits),
+                "options": encode_options(options),
+                "checker": None if checker is None else encode_compile(checker),
+            },
+            cancel,
+        )
+        return None if result is None else decode_test_result(result, case)
+
+    def status(self) -> Optional[Message]:
+        return self.request({"kind": "status"})
+
+
+# One JSON document per line in each direction
+
+
+def send_message(conn: socket.socket, message: Message) -> None:
+    conn.sendall(json.dumps(message).encode() + b"\n")
+
+
+def receive_message(conn: socket.socket) -> Optional[Message]:
+    with conn.makefile("rb") as stream:
+        line = stream.readline(MESSAGE_LIMIT)
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def encode_bytes(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def decode_bytes(text: str) -> bytes:
+    return base64.b64decode(text)
+
+
+def encode_limits(limits: Optional[Limits]) -> Optional[Message]:
+    return None if limits is None else dataclasses.asdict(limits)
+
+
+def decode_limits(message: Optional[Message]) -> Optional[Limits]:
+    return None if message is None else Limits(**message)
+
+
+def encode_compile(result: CompileResult, with_binary: bool = False) -> Message:
+    # Executables are named by their cache key, which is all that is sent
+    message = dataclasses.asdict(result)
+    message["executable"] = (
+        None if result.executable is None else result.executable.name
+    )
+    message["binary"] = (
+        encode_bytes(result.executable.read_bytes())
+        if with_binary and result.executable is not None
+        else None
+    )
+    return message
+
+
+def decode_compile(message: Message) -> tuple[CompileResult, Optional[bytes]]:
+    message = dict(message)
+    executable = message.pop("executable")
+    binary = message.pop("binary", None)
+    result = CompileResult(
+        **message, executable=None if executable is None else Path(executable)
+    )
+    return result, None if binary is None else decode_bytes(binary)
+
+
+def encode_options(options: Optional[CompareOptions]) -> Optional[Message]:
+    if options is None:
+        return None
+    return {
+        "mode": options.mode.value,
+        "abs_eps": options.abs_eps,
+        "rel_eps": options.rel_eps,
+    }
+
+
+def decode_options(message: Optional[Message]) -> Optional[CompareOptions]:
+    if message is None:
+        return None
+    # The checker travels as its own compiled executable, not as a path
+    return CompareOptions(
+        mode=CompareMode(message["mode"]),
+        abs_eps=message["abs_eps"],
+        rel_eps=message["rel_eps"],
+    )
+
+
+def encode_case(case: TestCase) -> Message:
+    with case.expected_output(MESSAGE_LIMIT).open() as expected:
+        output = expected.read()
+    if case.packed is None:
+        data = case.input_path.read_bytes()
+    else:
+        data = b"".join(case.input_feed())
+    return {
+        "name": case.name,
+        "input": encode_bytes(data),
+        "output": encode_bytes(output),
+    }
+
+
+def decode_case(message: Message, directory: Path) -> TestCase:
+    # Written out for the server's own run, which only reads its copies
+    input_path = directory / "input.txt"
+    output_path = directory / "answer.txt"
+    input_path.write_bytes(decode_bytes(message["input"]))
+    output_path.write_bytes(decode_bytes(message["output"]))
+    return TestCase(message["name"], input_path, output_path)
+
+
+def encode_process(result: ProcessResult, with_output: bool = True) -> Message:
+    message = {
+        field.name: getattr(result, field.name)
+        for field in dataclasses.fields(result)
+        if not field.name.startswith("captured_")
+    }
+    # Outputs travel only when the caller shows them; test results carry
+    # their own previews
+    for name in ("captured_stdout", "captured_stderr"):
+        output = getattr(result, name)
+        message[name] = encode_bytes(_clip_output(output)) if with_output else None
+    return message
+
+
+def _clip_output(output: CapturedOutput) -> bytes:
+    with output.open() as stream:
+        if output.size <= OUTPUT_LIMIT:
+            return stream.read()
+        head = stream.read(OUTPUT_LIMIT // 2)
+    hidden = output.size - OUTPUT_LIMIT
+    return (
+        head
+        + f"\n... {hidden} bytes not sent by the judge server ...\n".encode()
+        + output.tail_bytes(OUTPUT_LIMIT // 2)
+    )
+
+
+def decode_process(message: Message) -> ProcessResult:
+    outputs = {
+        name: CapturedOutput(
+            data=b"" if message[name] is None else decode_bytes(message[name])
+        )
+        for name in ("captured_stdout", "captured_stderr")
+    }
+    return ProcessResult(**{**message, **outputs})
+
+
+def encode_test_result(result: TestResult) -> Message:
+    return {
+        "process": encode_process(result.process, with_output=False),
+        "verdict": result.verdict.value,
+        "expected": result.expected,
+        "output": result.output,
+        "error": result.error,
+        "mismatch": (
+            None if result.mismatch is None else dataclasses.asdict(result.mismatch)
+        ),
+        "diff": (
+            None
+            if result.diff is None
+            else {
+                side: {
+                    **dataclasses.asdict(getattr(result.diff, side)),
+                    "lines": [
+                        encode_bytes(line) for line in getattr(result.diff, side).lines
+                    ],
+                }
+                for side in ("expected", "actual")
+            }
+        ),
+        "comment": result.comment,
+    }
+
+
+def decode_test_result(message: Message, case: TestCase) -> TestResult:
+    diff = message["diff"]
+    if diff is not None:
+        diff = Diff(
+            **{
+                side: DiffSide(
+                    **{
+                        **diff[side],
+                        "lines": [decode_bytes(line) for line in diff[side]["lines"]],
+                    }
+                )
+                for side in ("expected", "actual")
+            }
+        )
+    mismatch = message["mismatch"]
+    return TestResult(
+        case,
+        decode_process(message["process"]),
+        Verdict(message["verdict"]),
+        expected=message["expected"],
+        output=message["output"],
+        error=message["error"],
+        mismatch=None if mismatch is None else Mismatch(**mismatch),
+        diff=diff,
+        comment=message["comment"],
+    )
+
+
+def peer_uid(conn: socket.socket) -> int:
+    # Linux reports the pid, uid and gid of the process at the other end
+    credentials = conn.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    _, uid, _ = struct.unpack("3i", credentials)
+    return uid
+
+
+def user_id(user: str) -> int:
+    if user.isdigit():
+        return int(user)
+    try:
+        return pwd.getpwnam(user).pw_uid
+    except KeyError:
+        raise ValueError(f"Unknown user {user!r}") from None
+
+
+def user_name(uid: int) -> str:
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
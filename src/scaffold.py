@@ -0,0 +1,151 @@
+import fcntl
+import functools
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import Config
+
+# Only known names count, so C++ such as `v = {{1, 2}}` is left alone
+PLACEHOLDER_RE = re.compile(rb"\{\{\s*(contest|problem|timestamp)\s*\}\}")
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# ioctl that makes a file share another's blocks (Btrfs, XFS, bcachefs)
+FICLONE = 0x40049409
+
+
+class Template:
+    def __init__(self, data: bytes):
+        self.data = data
+        # Literal chunks at even indices, placeholder names at odd ones
+        self.parts = PLACEHOLDER_RE.split(data)
+
+    @property
+    def static(self) -> bool:
+        return len(self.parts) == 1
+
+    def render(self, values: Dict[str, str]) -> bytes:
+        return b"".join(
+            values[part.decode()].encode() if index % 2 else part
+            for index, part in enumerate(self.parts)
+        )
+
+
+def load_template(path: Path) -> Template:
+    stat = path.stat()
+    return _parse_template(str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_template(path: str, mtime_ns: int, size: int) -> Template:
+    # Keyed by mtime and size too, so an edited template is parsed again
+    return Template(Path(path).read_bytes())
+
+
+class Scaffolder:
+    def __init__(self, config: Config, template_path: Path):
+        self.template_path = template_path
+        self.template = load_template(template_path)
+        naming = config.config["file_naming"]
+        self.patterns = [naming["problem"], naming["input"], naming["output"]]
+        # One timestamp for the whole batch
+        self.timestamp = time.strftime(TIMESTAMP_FORMAT)
+
+    def create(self, contest_dirs: List[Path], problems: List[str]) -> int:
+        for contest_dir in contest_dirs:
+            contest_dir.mkdir(parents=True, exist_ok=True)
+
+        # A template without placeholders is the same file everywhere, so it
+        # is copied from one open descriptor instead of rendered
+        source = None
+        if self.template.static:
+            source = os.open(self.template_path, os.O_RDONLY)
+        try:
+            return sum(
+                self._create_problem(contest_dir, problem, source)
+                for contest_dir in contest_dirs
+                for problem in problems
+            )
+        finally:
+            if source is not None:
+                os.close(source)
+
+    def _create_problem(
+        self, contest_dir: Path, problem: str, source: Optional[int]
+    ) -> int:
+        solution, *io_files = (
+            contest_dir / pattern.format(problem) for pattern in self.patterns
+        )
+        created = 0
+        target = _create_new(solution)
+        if target is not None:
+            try:
+                if source is not None:
+                    copy_file(source, target, len(self.template.data))
+                else:
+                    values = {
+                        "contest": contest_dir.name,
+                        "problem": problem,
+                        "timestamp": self.timestamp,
+                    }
+                    _write_all(target, self.template.render(values))
+            finally:
+                os.close(target)
+            created += 1
+        for path in io_files:
+            target = _create_new(path)
+            if target is not None:
+                os.close(target)
+                created += 1
+        return created
+
+
+def _create_new(path: Path) -> Optional[int]:
+    # Files that already exist keep their contents
+    try:
+        return os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    except FileExistsError:
+        return None
+
+
+def copy_file(source: int, target: int, size: int) -> None:
+    # A reflink shares the template's blocks outright, copy_file_range copies
+    # inside the kernel, and reading and writing is the last resort
+    try:
+        fcntl.ioctl(target, FICLONE, source)
+        return
+    except OSError:
+        pass
+    offset = 0
+    try:
+        while offset < size:
+            copied = os.copy_file_range(source, target, size - offset, offset)
+            if copied == 0:
+                break
+            offset += copied
+        return
+    except (AttributeError, OSError):
+        # Not available before Linux 4.5, or across some filesystems
+        pass
+    os.lseek(target, offset, os.SEEK_SET)
+    _write_all(target, os.pread(source, size - offset, offset))
+
+
+def _write_all(target: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(target, view) :]
+
+
+def contest_series(first: str, count: int) -> List[str]:
+    # abc300 with a count of 3 is abc300, abc301 and abc302; leading zeros
+    # keep their width
+    if count == 1:
+        return [first]
+    match = re.fullmatch(r"(.*?)(\d+)", first)
+    if match is None:
+        raise ValueError(f"Contest '{first}' does not end in a number to count from")
+    prefix, number = match.groups()
+    start = int(number)
+    return [f"{prefix}{start + offset:0{len(number)}d}" for offset in range(count)]
@@ -0,0 +1,202 @@
+import dataclasses
+import math
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from .contest import HELPER_TIME_FACTOR, ContestManager
+from .judge import Verdict, judge
+from .process import CompileResult, Limits, ProcessResult
+
+# Runs faster than this are mostly process startup, which hides the growth
+MIN_FIT_TIME = 0.01
+
+
+def _log(n: float) -> float:
+    # Shifted by one so the smallest size, n = 1, does not zero a model out
+    return math.log(n + 1)
+
+
+MODELS: List[tuple[str, Callable[[float], float]]] = [
+    ("O(log n)", _log),
+    ("O(√n)", lambda n: math.sqrt(n)),
+    ("O(n)", lambda n: n),
+    ("O(n log n)", lambda n: n * _log(n)),
+    ("O(n log² n)", lambda n: n * _log(n) ** 2),
+    ("O(n√n)", lambda n: n * math.sqrt(n)),
+    ("O(n²)", lambda n: n**2),
+    ("O(n² log n)", lambda n: n**2 * _log(n)),
+    ("O(n³)", lambda n: n**3),
+]
+
+
+@dataclass
+class ScalePoint:
+    size: int
+    input_bytes: int
+    process: ProcessResult
+    verdict: Verdict
+
+    @property
+    def cpu_time(self) -> float:
+        return self.process.cpu_time
+
+
+@dataclass
+class ComplexityFit:
+    model: str
+    slope: float
+    coefficient: float
+    function: Callable[[float], float]
+
+    def project(self, size: int) -> float:
+        return self.coefficient * self.function(size)
+
+
+@dataclass
+class ScaleReport:
+    points: List[ScalePoint] = field(default_factory=list)
+    # Set when the generator failed, instead of a solution point
+    generator_failure: Optional[ProcessResult] = None
+    failed_size: Optional[int] = None
+
+    def fit(self) -> Optional[ComplexityFit]:
+        return fit_complexity(
+            [point for point in self.points if point.verdict == Verdict.AC]
+        )
+
+
+class ScaleTester:
+    def __init__(
+        self,
+        manager: ContestManager,
+        solution_path: Path,
+        generator_path: Path,
+        profile: Optional[str] = None,
+    ):
+        self.manager = manager
+        self.profile = profile
+        self.sources = {"solution": solution_path, "generator": generator_path}
+        self.executables: dict[str, Path] = {}
+
+    def compile(self) -> dict[str, CompileResult]:
+        compiled = self.manager.compile_all(list(self.sources.values()), self.profile)
+        results = dict(zip(self.sources, compiled))
+        self.executables = {
+            name: result.executable
+            for name, result in results.items()
+            if result.success
+        }
+        return results
+
+    def run(
+        self,
+        sizes: List[int],
+        limits: Limits,
+        repeats: int = 1,
+        seed: int = 1,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> ScaleReport:
+        # Sizes run one at a time: parallel runs would compete for the CPU
+        # and skew exactly the timings being measured
+        report = ScaleReport()
+        for size in sizes:
+            point = None
+            for repeat in range(repeats):
+                measured = self._measure(size, seed + repeat, limits, report)
+                if measured is None:
+                    return report
+                if point is None or measured.cpu_time < point.cpu_time:
+                    point = measured
+                if measured.verdict != Verdict.AC:
+                    point = measured
+                    break
+            report.points.append(point)
+            if on_progress is not None:
+                on_progress(len(report.points))
+            if point.verdict != Verdict.AC:
+                # Larger inputs will only fail the same way, more slowly
+                break
+        return report
+
+    def _measure(
+        self, size: int, seed: int, limits: Limits, report: ScaleReport
+    ) -> Optional[ScalePoint]:
+        with tempfile.TemporaryDirectory(prefix="seepee-scale-") as workdir:
+            workdir = Path(workdir)
+            generated = self.manager.run_executable(
+                self.executables["generator"],
+                Path(os.devnull),
+                cwd=workdir,
+                limits=dataclasses.replace(
+                    limits, time=limits.time * HELPER_TIME_FACTOR
+                ),
+                args=[str(seed), str(size)],
+            )
+            if not generated.success or generated.timed_out:
+                report.generator_failure = generated
+                report.failed_size = size
+                return None
+
+            input_path = workdir / "input.txt"
+            generated.captured_stdout.save(input_path)
+            solution = self.manager.run_executable(
+                self.executables["solution"], input_path, cwd=workdir, limits=limits
+            )
+        return ScalePoint(
+            size,
+            generated.captured_stdout.size,
+            solution,
+            judge(solution, limits, matches=True),
+        )
+
+
+def geometric_sizes(smallest: int, largest: int, count: int) -> List[int]:
+    if count < 2 or largest <= smallest:
+        return [smallest]
+    ratio = (largest / smallest) ** (1 / (count - 1))
+    sizes = [round(smallest * ratio**step) for step in range(count)]
+    return sorted(set(sizes))
+
+
+def fit_complexity(points: List[ScalePoint]) -> Optional[ComplexityFit]:
+    measurable = [point for point in points if point.cpu_time >= MIN_FIT_TIME]
+    if len(measurable) < 2:
+        return None
+    sizes = [point.size for point in measurable]
+    times = [point.cpu_time for point in measurable]
+
+    log_sizes = [math.log(size) for size in sizes]
+    log_times = [math.log(t) for t in times]
+    slope = _least_squares_slope(log_sizes, log_times)
+
+    # The model whose shape explains the times best leaves the least spread
+    # in log(time / f(n)); its mean gives the constant factor
+    best = None
+    for name, function in MODELS:
+        ratios = [lt - math.log(function(n)) for n, lt in zip(sizes, log_times)]
+        mean = sum(ratios) / len(ratios)
+        spread = sum((r - mean) ** 2 for r in ratios)
+        if best is None or spread < best[0]:
+            best = (spread, name, function, math.exp(mean))
+    _, name, function, coefficient = best
+    return ComplexityFit(name, slope, coefficient, function)
+
+
+def _least_squares_slope(xs: List[float], ys: List[float]) -> float:
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    return covariance / variance if variance else 0.0
+
+
+def format_size(size: int) -> str:
+    # 200000 reads as 2·10^5, the way constraints are written in statements
+    exponent = len(str(size)) - 1
+    if size >= 1000 and size % 10**exponent == 0:
+        mantissa = size // 10**exponent
+        return f"10^{exponent}" if mantissa == 1 else f"{mantissa}·10^{exponent}"
+    return f"{size:,}"
@@ -1,7 +1,12 @@
+import threading
+from functools import partial
+from typing import Callable, Optional
+
 from textual.screen import Screen
 from textual.binding import Binding
 from textual.widgets import Button, Input, Select
 from textual.events import Key
+from textual.worker import Worker, WorkerState
 
 
 class BaseScreen(Screen):
@@ -61,3 +66,47 @@ class BaseScreen(Screen):
         if event.key == "escape" and isinstance(self, BaseScreen):
             if len(self.app.screen_stack) <= 1:
                 self.app.exit()
+
+
+class JobScreen(BaseScreen):
+
+    BINDINGS = [Binding("ctrl+g", "cancel", "Cancel", show=True, priority=True)]
+
+    job_button = ""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cancel_event: Optional[threading.Event] = None
+
+    @property
+    def busy(self) -> bool:
+        return self.cancel_event is not None
+
+    def start_job(self, job: Callable[[threading.Event], None]) -> None:
+        self.cancel_event = threading.Event()
+        self.query_one(f"#{self.job_button}", Button).disabled = True
+        self.run_worker(
+            partial(job, self.cancel_event),
+            name=self.job_button,
+            thread=True,
+            exit_on_error=False,
+        )
+
+    def action_cancel(self) -> None:
+        if self.cancel_event is not None and not self.cancel_event.is_set():
+            self.cancel_event.set()
+            self.notify("Cancelling...", severity="warning")
+
+    def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
+        if event.worker.name != self.job_button:
+            return
+        if event.state not in (
+            WorkerState.SUCCESS,
+            WorkerState.ERROR,
+            WorkerState.CANCELLED,
+        ):
+            return
+        if event.state == WorkerState.ERROR:
+            self.notify_error(str(event.worker.error))
+        self.cancel_event = None
+        self.query_one(f"#{self.job_button}", Button).disabled = False
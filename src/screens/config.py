@@ -57,10 +57,28 @@ class ConfigScreen(BaseScreen):
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "save":
 
+            config = self.app.manager.config
             compiler = self.query_one("#compiler").value
-            flags = self.query_one("#flags").value
-            self.app.manager.config.update_compiler(compiler)
-            self.app.manager.config.update_compiler_flags(flags.split())
+            flags = self.query_one("#flags").value.split()
+            compile_changed = (compiler, flags) != (
+                config.get_compiler(),
+                config.get_compiler_flags(),
+            )
+            if compiler != config.get_compiler():
+                config.update_compiler(compiler)
+            if flags != config.get_compiler_flags():
+                config.update_compiler_flags(flags)
+            if compile_changed:
+                # Header builds take seconds; run them on the app, which
+                # outlives this screen, instead of on the event loop
+                self.app.run_worker(
+                    self.app.manager.pch.prepare_all,
+                    name="pch",
+                    group="pch",
+                    exclusive=True,
+                    thread=True,
+                    exit_on_error=False,
+                )
 
             template = self.query_one("#template").value
             templates_dir = self.query_one("#templates_dir").value
@@ -1,7 +1,7 @@
 from pathlib import Path
 from textual.app import ComposeResult
-from textual.containers import Container
-from textual.widgets import Button, Header, Footer, Input, Label, Select
+from textual.containers import Container, Horizontal
+from textual.widgets import Button, Header, Footer, Input, Label, Select, Switch
 from textual.binding import Binding
 
 from .base import BaseScreen
@@ -30,6 +30,11 @@ class CreateContestScreen(BaseScreen):
                 value=default_template,
                 id="template",
             )
+            with Horizontal():
+                yield Switch(
+                    value=self.app.manager.config.get_warm_up_enabled(), id="warm"
+                )
+                yield Label("Warm up: precompile the template in the background")
             yield Button("Create", variant="primary", id="create")
         yield Footer()
 
@@ -51,5 +56,7 @@ class CreateContestScreen(BaseScreen):
 
             contest_dir = self.app.manager.create_contest_dir(contest)
             self.app.manager.create_problem_files(contest_dir, problems_list, template)
+            if self.query_one("#warm", Switch).value:
+                self.app.manager.start_warm_up(contest_dir)
             self.notify_success(f"Contest {contest} created successfully!")
             self.app.pop_screen()
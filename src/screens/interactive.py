@@ -0,0 +1,135 @@
+import threading
+from pathlib import Path
+from typing import List
+from textual.app import ComposeResult
+from textual.containers import Container
+from textual.widgets import Button, Header, Footer, Input, Label, Log, Static
+from rich.syntax import Syntax
+
+from ..interactive import (
+    SENDER_MARKS,
+    InteractiveResult,
+    InteractiveRunner,
+    LineSplitter,
+    results_table,
+)
+from ..process import Limits, Message
+from ..testcases import TestCase
+from .base import JobScreen
+
+# The log keeps only the latest lines of a long or chatty interaction
+TRANSCRIPT_MAX_LINES = 2000
+
+
+class InteractiveScreen(JobScreen):
+
+    job_button = "interact"
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        with Container():
+            yield Label("Contest Number:")
+            yield Input(
+                placeholder="Enter contest number",
+                id="contest",
+                classes="short-input",
+            )
+            yield Label("Problem:")
+            yield Input(placeholder="A", id="problem", classes="short-input")
+            yield Button("Interact", variant="primary", id="interact")
+            yield Label("Transcript (> solution, < interactor):")
+            yield Log(id="transcript", max_lines=TRANSCRIPT_MAX_LINES)
+            yield Static(id="results", markup=False)
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "interact" and not self.busy:
+            contest = self.query_one("#contest").value
+            problem = self.query_one("#problem").value
+
+            if not contest or not problem:
+                self.notify_error("Contest number and problem are required!")
+                return
+
+            contest_dir = Path(contest)
+            if not contest_dir.exists():
+                self.notify_error(f"Contest directory '{contest}' not found!")
+                return
+
+            config = self.app.manager.config
+            problem_path = contest_dir / config.get_problem_file_name(problem)
+            interactor_path = contest_dir / config.get_interactor_file_name(problem)
+            if not problem_path.exists():
+                self.notify_error(f"Problem {problem} not found!")
+                return
+            if not interactor_path.exists():
+                self.notify_error(f"Interactor {interactor_path.name} not found!")
+                return
+
+            cases = self.app.manager.discover_tests(contest_dir, problem)
+            if not cases:
+                self.notify_error("No test cases found! Add test cases first.")
+                return
+
+            runner = InteractiveRunner(self.app.manager, problem_path, interactor_path)
+            limits = self.app.manager.get_limits(contest_dir, problem)
+            transcript = self.query_one("#transcript", Log)
+            transcript.clear()
+            self.query_one("#results").update("Compiling...")
+            self.start_job(
+                lambda cancel: self.run_interaction(
+                    runner, cases, limits, transcript, cancel
+                )
+            )
+
+    def run_interaction(
+        self,
+        runner: InteractiveRunner,
+        cases: List[TestCase],
+        limits: Limits,
+        transcript: Log,
+        cancel: threading.Event,
+    ) -> None:
+        app = self.app
+        for compiled in runner.compile().values():
+            if not compiled.success:
+                app.call_from_thread(self.show_compile_error, compiled.error)
+                return
+
+        splitter = LineSplitter()
+        results: List[InteractiveResult] = []
+
+        def on_message(message: Message) -> None:
+            lines = [
+                f"{SENDER_MARKS[sender][0]} {line}"
+                for sender, line in splitter.feed(message)
+            ]
+            if lines:
+                app.call_from_thread(transcript.write_lines, lines)
+
+        def on_result(result: InteractiveResult) -> None:
+            results.append(result)
+            lines = [f"{SENDER_MARKS[s][0]} {line}" for s, line in splitter.flush()]
+            lines.append(f"--- {result.case.name}: {result.status} ---")
+            app.call_from_thread(transcript.write_lines, lines)
+            app.call_from_thread(self.show_results, list(results))
+
+        runner.run_all(cases, limits, cancel, on_result, on_message)
+        app.call_from_thread(self.finish, results, cancel.is_set())
+
+    def show_compile_error(self, error: str) -> None:
+        self.notify_error("Compilation Error!")
+        self.query_one("#results").update(Syntax(error, "text", theme="monokai"))
+
+    def show_results(self, results: List[InteractiveResult]) -> None:
+        self.query_one("#results").update(results_table(results))
+
+    def finish(self, results: List[InteractiveResult], cancelled: bool) -> None:
+        if cancelled:
+            self.notify("Cancelled", severity="warning")
+            return
+        failed = sum(not result.passed for result in results)
+        if failed:
+            self.notify_error(f"{failed} of {len(results)} test cases failed!")
+        else:
+            self.notify_success(f"All {len(results)} test cases passed!")
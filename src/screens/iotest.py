@@ -62,11 +62,10 @@ class IOTestScreen(BaseScreen):
                 self.notify_error(f"Problem {problem} not found!")
                 return
 
-            self.app.manager.write_input(contest_dir, problem, input_content)
-            if output_content:
-                self.app.manager.write_output(contest_dir, problem, output_content)
-
-            self.notify_success("Test case saved successfully!")
+            case = self.app.manager.add_test_case(
+                contest_dir, problem, input_content, output_content
+            )
+            self.notify_success(f"Test case saved as {case.name}!")
 
             if event.button.id == "save_and_test" and output_content:
                 self.app.push_screen("test", {"contest": contest, "problem": problem})
@@ -21,6 +21,8 @@ class MainMenu(BaseScreen):
             yield Button("Run Problem", variant="primary", id="run")
             yield Button("Test Problem", variant="primary", id="test")
             yield Button("Add Test Cases", variant="primary", id="iotest")
+            yield Button("Profile Problem", variant="primary", id="profile")
+            yield Button("Interactive Problem", variant="primary", id="interact")
             yield Button("Configure", variant="primary", id="config")
             yield Button("Quit", variant="error", id="quit")
         yield Footer()
@@ -0,0 +1,105 @@
+import threading
+from pathlib import Path
+from textual.app import ComposeResult
+from textual.containers import Container
+from textual.widgets import Button, Header, Footer, Input, Label, Static
+from rich.console import Group
+from rich.syntax import Syntax
+from rich.text import Text
+
+from ..judge import Verdict, describe_verdict
+from ..process import format_time
+from ..profiler import ProfileReport, Profiler, function_table, line_table
+from .base import JobScreen
+
+
+class ProfileScreen(JobScreen):
+
+    job_button = "profile"
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        with Container():
+            yield Label("Contest Number:")
+            yield Input(
+                placeholder="Enter contest number",
+                id="contest",
+                classes="short-input",
+            )
+            yield Label("Problem:")
+            yield Input(placeholder="A", id="problem", classes="short-input")
+            yield Button("Profile", variant="primary", id="profile")
+            yield Label("Profile:")
+            yield Static(id="report", markup=False)
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "profile" and not self.busy:
+            contest = self.query_one("#contest").value
+            problem = self.query_one("#problem").value
+
+            if not contest or not problem:
+                self.notify_error("Contest number and problem are required!")
+                return
+
+            contest_dir = Path(contest)
+            if not contest_dir.exists():
+                self.notify_error(f"Contest directory '{contest}' not found!")
+                return
+
+            problem_path = contest_dir / self.app.manager.config.get_problem_file_name(
+                problem
+            )
+            if not problem_path.exists():
+                self.notify_error(f"Problem {problem} not found!")
+                return
+
+            limits = self.app.manager.get_limits(contest_dir, problem)
+            profiler = Profiler.for_problem(
+                self.app.manager, contest_dir, problem, limits
+            )
+            if profiler is None:
+                self.notify_error(
+                    "No non-empty test input found! Add test cases first."
+                )
+                return
+
+            report_widget = self.query_one("#report")
+            report_widget.update(f"Profiling on {profiler.case.name}...")
+            self.start_job(lambda cancel: self.run_profiler(profiler, cancel))
+
+    def run_profiler(self, profiler: Profiler, cancel: threading.Event) -> None:
+        report = profiler.run(cancel)
+        self.app.call_from_thread(self.show_report, report, profiler.settings["top"])
+
+    def show_report(self, report: ProfileReport, top: int) -> None:
+        report_widget = self.query_one("#report")
+        if report.compile_error:
+            self.notify_error("Compilation Error!")
+            report_widget.update(Syntax(report.compile_error, "text", theme="monokai"))
+            return
+        if report.process.cancelled:
+            self.notify("Cancelled", severity="warning")
+            report_widget.update("")
+            return
+
+        parts = [
+            Text(
+                f"{report.case.name} | "
+                f"Instrumented compile: {format_time(report.compile_time)} | "
+                f"Wall: {format_time(report.process.wall_time)} | "
+                f"CPU: {format_time(report.process.cpu_time)}",
+                style="cyan",
+            )
+        ]
+        if report.verdict != Verdict.AC:
+            parts.append(
+                Text(describe_verdict(report.verdict, report.process), style="red")
+            )
+        parts.extend(Text(note, style="yellow") for note in report.notes)
+        if report.functions:
+            parts.append(function_table(report.functions, top))
+        if report.lines:
+            parts.append(line_table(report.lines, top))
+        report_widget.update(Group(*parts))
+        self.notify_success("Profile ready!")
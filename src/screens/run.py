@@ -1,14 +1,22 @@
+import threading
 from pathlib import Path
+from typing import Optional
 from textual.app import ComposeResult
 from textual.containers import Container, Vertical, Horizontal
-from textual.widgets import Button, Header, Footer, Input, Label, TextArea, Static
+from textual.widgets import Button, Header, Footer, Input, Label, Log, TextArea, Static
 from textual.binding import Binding
-from rich.syntax import Syntax
 
-from .base import BaseScreen
+from ..judge import Verdict, describe_verdict, judge
+from ..process import CompileResult, Limits, ProcessResult, format_memory, format_time
+from .base import JobScreen
 
+# The log keeps only the latest lines of a long-running or chatty solution
+OUTPUT_MAX_LINES = 2000
 
-class RunProblemScreen(BaseScreen):
+
+class RunProblemScreen(JobScreen):
+
+    job_button = "run"
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -25,11 +33,12 @@ class RunProblemScreen(BaseScreen):
             yield TextArea(id="input", language="text")
             yield Button("Run", variant="primary", id="run")
             yield Label("Output:")
-            yield Static(id="output", markup=False)
+            yield Log(id="output", max_lines=OUTPUT_MAX_LINES)
+            yield Static(id="stats", markup=False)
         yield Footer()
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
-        if event.button.id == "run":
+        if event.button.id == "run" and not self.busy:
             contest = self.query_one("#contest").value
             problem = self.query_one("#problem").value
             input_content = self.query_one("#input").text
@@ -57,14 +66,89 @@ class RunProblemScreen(BaseScreen):
                 with open(input_path, "w") as f:
                     f.write(input_content)
 
-            output, error, success = self.app.manager.compile_and_run(
-                problem_path, input_path
+            limits = self.app.manager.get_limits(contest_dir, problem)
+            output_widget = self.query_one("#output", Log)
+            stats_widget = self.query_one("#stats")
+            output_widget.clear()
+            stats_widget.update("Compiling...")
+            self.start_job(
+                lambda cancel: self.run_problem(
+                    contest_dir,
+                    problem,
+                    problem_path,
+                    input_path,
+                    limits,
+                    output_widget,
+                    stats_widget,
+                    cancel,
+                )
+            )
+
+    def run_problem(
+        self,
+        contest_dir: Path,
+        problem: str,
+        problem_path: Path,
+        input_path: Path,
+        limits: Limits,
+        output_widget: Log,
+        stats_widget: Static,
+        cancel: threading.Event,
+    ) -> None:
+        app = self.app
+        compiled = app.manager.compile(problem_path, cancel=cancel)
+        result = None
+        if compiled.success:
+            app.call_from_thread(stats_widget.update, "Running...")
+            result = app.manager.run_executable(
+                compiled.executable,
+                input_path,
+                limits=limits,
+                on_output=lambda stream, text: app.call_from_thread(
+                    output_widget.write, text
+                ),
+                cancel=cancel,
             )
-            output_widget = self.query_one("#output")
+            app.manager.record_run(
+                contest_dir, problem, compiled, input_path, result, limits
+            )
+        app.call_from_thread(self.show_result, compiled, result, limits)
+
+    def show_result(
+        self, compiled: CompileResult, result: Optional[ProcessResult], limits: Limits
+    ) -> None:
+        output_widget = self.query_one("#output", Log)
+        stats_widget = self.query_one("#stats")
 
-            if success:
-                self.notify_success("Compilation successful!")
-                output_widget.update(Syntax(output, "text", theme="monokai"))
+        if result is None:
+            if compiled.cancelled:
+                self.notify("Cancelled", severity="warning")
             else:
-                self.notify_error("Compilation/Runtime Error!")
-                output_widget.update(Syntax(error, "text", theme="monokai"))
+                self.notify_error("Compilation Error!")
+            output_widget.write(compiled.error)
+        elif result.cancelled:
+            self.notify("Cancelled", severity="warning")
+        elif result.success:
+            self.notify_success("Compilation successful!")
+        else:
+            self.notify_error("Compilation/Runtime Error!")
+            output_widget.write(f"\n{result.exit_description}")
+
+        compile_time = (
+            "cached" if compiled.cached else format_time(compiled.compile_time)
+        )
+        if result is None:
+            stats_widget.update(f"Compile: {compile_time}")
+            return
+
+        verdict = judge(result, limits, matches=True)
+        if verdict in (Verdict.TLE, Verdict.MLE):
+            self.notify_error(describe_verdict(verdict))
+        stats_widget.update(
+            f"Compile: {compile_time} | "
+            f"Wall: {format_time(result.wall_time)} | "
+            f"CPU: {format_time(result.cpu_time)} "
+            f"(user {format_time(result.user_time)}, "
+            f"sys {format_time(result.sys_time)}) | "
+            f"Memory: {format_memory(result.max_rss_kb)}"
+        )
@@ -1,15 +1,42 @@
+import threading
+from functools import partial
 from pathlib import Path
+from typing import Optional
+import yaml
 from textual.app import ComposeResult
 from textual.containers import Container, Vertical, Horizontal
-from textual.widgets import Button, Header, Footer, Input, Label, TextArea, Static
+from textual.widgets import (
+    Button,
+    Header,
+    Footer,
+    Input,
+    Label,
+    TextArea,
+    Static,
+    Switch,
+)
 from textual.binding import Binding
+from textual.worker import Worker
 from rich.syntax import Syntax
 from rich.table import Table
+from rich.text import Text
 
-from .base import BaseScreen
+from ..compare import CompareOptions
+from ..diff import render_side
+from ..process import CompileResult, Limits, format_memory, format_time
+from ..testcases import TestCase, TestResult
+from ..watch import Watcher
+from .base import JobScreen
 
 
-class TestProblemScreen(BaseScreen):
+class TestProblemScreen(JobScreen):
+
+    job_button = "test"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.watch_stop: Optional[threading.Event] = None
+        self.rerun_pending = False
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -24,61 +51,222 @@ class TestProblemScreen(BaseScreen):
             yield Input(placeholder="A", id="problem", classes="short-input")
 
             yield Button("Run Test", variant="primary", id="test")
+            with Horizontal():
+                yield Switch(id="watch")
+                yield Label("Watch: rerun on every save")
             yield Label("Test Results:")
             yield Static(id="results", markup=True)
         yield Footer()
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
-        if event.button.id == "test":
-            contest = self.query_one("#contest").value
-            problem = self.query_one("#problem").value
+        if event.button.id == "test" and not self.busy:
+            self.start_tests()
+
+    def on_switch_changed(self, event: Switch.Changed) -> None:
+        if event.switch.id != "watch":
+            return
+        if event.value:
+            self.start_watching()
+        elif self.watch_stop is not None:
+            self.watch_stop.set()
+            self.watch_stop = None
+
+    def get_problem(self) -> Optional[tuple[Path, str]]:
+        contest = self.query_one("#contest").value
+        problem = self.query_one("#problem").value
+
+        if not contest or not problem:
+            self.notify_error("Contest number and problem are required!")
+            return None
 
-            if not contest or not problem:
-                self.notify_error("Contest number and problem are required!")
-                return
+        contest_dir = Path(contest)
+        if not contest_dir.exists():
+            self.notify_error(f"Contest directory '{contest}' not found!")
+            return None
+        return contest_dir, problem
 
-            contest_dir = Path(contest)
-            if not contest_dir.exists():
-                self.notify_error(f"Contest directory '{contest}' not found!")
-                return
+    def start_tests(self) -> None:
+        selected = self.get_problem()
+        if selected is None:
+            return
+        contest_dir, problem = selected
 
-            problem_path = contest_dir / self.app.manager.config.get_problem_file_name(
-                problem
+        problem_path = contest_dir / self.app.manager.config.get_problem_file_name(
+            problem
+        )
+        cases = self.app.manager.discover_tests(contest_dir, problem)
+        if not cases or not any(case.output_path.exists() for case in cases):
+            self.notify_error("Expected output file not found! Add test cases first.")
+            return
+
+        try:
+            limits = self.app.manager.get_limits(contest_dir, problem)
+            options = self.app.manager.get_compare_options(contest_dir, problem)
+        except (ValueError, TypeError, yaml.YAMLError) as error:
+            # A bad limit or compare mode in contest.yaml, reported like the
+            # CLI does instead of ending the app
+            self.notify_error(f"Invalid contest configuration: {error}")
+            return
+        results_widget = self.query_one("#results")
+        results_widget.update("Compiling...")
+        self.start_job(
+            lambda cancel: self.run_tests(
+                contest_dir,
+                problem,
+                problem_path,
+                cases,
+                limits,
+                options,
+                results_widget,
+                cancel,
             )
-            input_path = contest_dir / self.app.manager.config.get_input_file_name(
-                problem
+        )
+
+    def start_watching(self) -> None:
+        selected = self.get_problem()
+        if selected is None:
+            self.query_one("#watch", Switch).value = False
+            return
+        contest_dir, problem = selected
+
+        watcher = Watcher.for_problem(self.app.manager.config, contest_dir, problem)
+        self.watch_stop = threading.Event()
+        self.run_worker(
+            partial(self.watch_files, watcher, self.watch_stop),
+            name="watch",
+            thread=True,
+            exit_on_error=False,
+        )
+        self.notify(f"Watching problem {problem} ({watcher.backend_name})")
+        if not self.busy:
+            self.start_tests()
+
+    def watch_files(self, watcher: Watcher, stop: threading.Event) -> None:
+        app = self.app
+        try:
+            while watcher.wait(stop):
+                app.call_from_thread(self.rerun_tests)
+        finally:
+            watcher.close()
+
+    def rerun_tests(self) -> None:
+        if self.busy:
+            # Results for the previous version are stale, start over
+            self.rerun_pending = True
+            self.cancel_event.set()
+        else:
+            self.start_tests()
+
+    def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
+        super().on_worker_state_changed(event)
+        if event.worker.name == self.job_button and self.rerun_pending:
+            if not self.busy:
+                self.rerun_pending = False
+                self.start_tests()
+
+    def run_tests(
+        self,
+        contest_dir: Path,
+        problem: str,
+        problem_path: Path,
+        cases: list[TestCase],
+        limits: Limits,
+        options: CompareOptions,
+        results_widget: Static,
+        cancel: threading.Event,
+    ) -> None:
+        app = self.app
+        compiled = app.manager.compile(problem_path, cancel=cancel)
+        if not compiled.success:
+            app.call_from_thread(self.show_compile_error, compiled)
+            return
+
+        compile_time = (
+            "cached" if compiled.cached else format_time(compiled.compile_time)
+        )
+        caption = (
+            f"Compile time: {compile_time} | "
+            f"Limits: {format_time(limits.time)}, {limits.memory} MB"
+        )
+        finished: list[TestResult] = []
+
+        def on_result(result: TestResult) -> None:
+            finished.append(result)
+            table = self.build_table(
+                sorted(finished, key=lambda r: cases.index(r.case)),
+                f"{caption} | {len(finished)}/{len(cases)} done",
             )
-            output_path = contest_dir / self.app.manager.config.get_output_file_name(
-                problem
+            app.call_from_thread(results_widget.update, table)
+
+        app.call_from_thread(
+            results_widget.update, self.build_table([], f"{caption} | Running...")
+        )
+        results = app.manager.run_tests(
+            compiled.executable, cases, limits, options, cancel, on_result
+        )
+        app.manager.record_results(contest_dir, problem, compiled, results)
+        app.call_from_thread(results_widget.update, self.build_table(results, caption))
+        app.call_from_thread(self.show_summary, results)
+        comparison = app.manager.find_regression(contest_dir, problem)
+        if comparison is not None:
+            app.call_from_thread(
+                self.notify,
+                f"{comparison.ratio - 1:.0%} slower than the previous version "
+                f"of {problem}",
+                severity="warning",
             )
 
-            if not output_path.exists():
-                self.notify_error(
-                    "Expected output file not found! Add test cases first."
-                )
-                return
+    def show_compile_error(self, compiled: CompileResult) -> None:
+        if compiled.cancelled:
+            self.notify("Cancelled", severity="warning")
+        else:
+            self.notify_error("Compilation Error!")
+        self.query_one("#results").update(
+            Syntax(compiled.error, "text", theme="monokai")
+        )
 
-            with open(output_path) as f:
-                expected_output = f.read()
+    def show_summary(self, results: list[TestResult]) -> None:
+        if any(result.process.cancelled for result in results):
+            self.notify("Cancelled", severity="warning")
+            return
 
-            output, error, success = self.app.manager.compile_and_run(
-                problem_path, input_path
+        passed = sum(result.passed for result in results)
+        if passed == len(results):
+            self.notify_success(f"✓ All {len(results)} test cases passed!")
+        else:
+            self.notify_error(
+                f"✗ {len(results) - passed} of {len(results)} test cases failed!"
+            )
+
+    def build_table(self, results: list[TestResult], caption: str) -> Table:
+        table = Table(caption=caption)
+        table.add_column("Case", style="cyan")
+        table.add_column("Result")
+        table.add_column("Expected", style="green")
+        table.add_column("Got")
+        table.add_column("Time", style="yellow")
+        table.add_column("CPU", style="yellow")
+        table.add_column("Memory", style="yellow")
+        for result in results:
+            status = Text(
+                f"{'✓' if result.passed else '✗'} {result.status}",
+                style="green" if result.passed else "red",
+            )
+            expected = Text(result.expected)
+            got = Text(
+                result.output if result.success else result.error,
+                style="blue" if result.passed else "red",
+            )
+            if result.diff is not None:
+                expected = render_side(result.diff.expected, "green")
+                got = render_side(result.diff.actual, "red")
+            table.add_row(
+                result.case.name,
+                status,
+                expected,
+                got,
+                format_time(result.process.wall_time),
+                format_time(result.process.cpu_time),
+                format_memory(result.process.max_rss_kb),
             )
-            results_widget = self.query_one("#results")
-
-            if not success:
-                self.notify_error("Compilation/Runtime Error!")
-                results_widget.update(Syntax(error, "text", theme="monokai"))
-                return
-
-            matches = self.app.manager.verify_output(output, expected_output)
-            if matches:
-                self.notify_success("✓ Output matches expected output!")
-            else:
-                self.notify_error("✗ Output does not match expected output!")
-
-            table = Table()
-            table.add_column("Expected", style="green")
-            table.add_column("Got", style="blue" if matches else "red")
-            table.add_row(expected_output, output)
-            results_widget.update(table)
+        return table
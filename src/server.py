@@ -0,0 +1,304 @@
+import collections
+import multiprocessing
+import os
+import re
+import select
+import signal
+import socket
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Deque, Dict, Optional, Sequence
+
+from .cache import CompileCache
+from .config import BuildSettings
+from .process import POLL_INTERVAL
+from .remote import (
+    JudgeClient,
+    Message,
+    decode_bytes,
+    decode_case,
+    decode_compile,
+    decode_limits,
+    decode_options,
+    encode_compile,
+    encode_process,
+    encode_test_result,
+    peer_uid,
+    receive_message,
+    send_message,
+    user_id,
+    user_name,
+)
+
+JOB_KINDS = ("compile", "run", "test")
+KEY_RE = re.compile(r"[0-9a-f]{64}")
+
+# Each worker process keeps one manager for its whole life, so the config,
+# compile cache, PCH and launcher are set up once per worker, not per job
+_manager = None
+
+
+def _init_worker() -> None:
+    global _manager
+    from .contest import ContestManager
+
+    # Ctrl+C stops the server, which shuts the workers down in turn
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _manager = ContestManager(use_server=False)
+
+
+def _run_job(kind: str, request: Message) -> Message:
+    # Jobs carry their sources and inputs, so the server never opens a path a
+    # client names; each runs in a directory of its own
+    with tempfile.TemporaryDirectory(prefix="seepee-serve-") as workdir:
+        workdir = Path(workdir)
+        if kind == "compile":
+            # Built with the client's compiler, flags and template, so a
+            # profile or flag the server's config lacks still builds the same
+            source = decode_bytes(request["source"])
+            # Only the file name is kept, which compiler messages refer to
+            name = Path(request["name"]).name
+            source_path = workdir / (name if name not in ("", "..") else "source.cpp")
+            source_path.write_bytes(source)
+            compiled = _manager.compile_source(
+                source_path, source, BuildSettings(**request["build"])
+            )
+            return encode_compile(compiled, with_binary=request["binary"])
+
+        executable = _built_executable(request["executable"])
+        limits = decode_limits(request["limits"])
+        if kind == "run":
+            input_path = workdir / "input.txt"
+            input_path.write_bytes(decode_bytes(request["input"]))
+            result = _manager.run_executable(
+                executable, input_path, cwd=workdir, limits=limits
+            )
+            return encode_process(result)
+
+        checker = request["checker"]
+        if checker is not None:
+            checker, _ = decode_compile(checker)
+            if checker.executable is not None:
+                checker.executable = _built_executable(checker.executable.name)
+        result = _manager.run_test_case(
+            executable,
+            decode_case(request["case"], workdir),
+            limits,
+            decode_options(request["options"]),
+            checker=checker,
+        )
+        return encode_test_result(result)
+
+
+def _built_executable(key: str) -> Path:
+    # Named by cache key, so the server only runs what it compiled itself
+    if KEY_RE.fullmatch(key):
+        executable = _manager.cache.artifact_path(key)
+        if executable.exists():
+            return executable
+    raise ValueError(f"{key} was not built by this judge server")
+
+
+@dataclass
+class Job:
+    kind: str
+    request: Message
+    user: str
+    # Set for compiles, which identical requests share while in flight
+    key: Optional[tuple[str, bool]] = None
+    waiters: int = 1
+    done: threading.Event = field(default_factory=threading.Event)
+    reply: Optional[Message] = None
+
+
+class JudgeServer:
+    def __init__(
+        self, socket_path: Path, workers: int, allow_users: Sequence[str] = ()
+    ):
+        self.socket_path = Path(socket_path)
+        self.workers = workers
+        # Every job runs as the user who started the server, so only they
+        # and the users they name may submit one
+        self.allow_users = allow_users
+        self.allowed_uids = {os.getuid()}
+        self.queues: "collections.OrderedDict[str, Deque[Job]]" = (
+            collections.OrderedDict()
+        )
+        self.compiling: Dict[tuple[str, bool], Job] = {}
+        self.running = 0
+        self.completed = 0
+        self.deduplicated = 0
+        self.stopping = False
+        self.lock = threading.Condition()
+
+    def serve_forever(self, on_ready: Optional[Callable[[], None]] = None) -> None:
+        listener = self._listen()
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        dispatcher = threading.Thread(target=self._dispatch, args=(pool,), daemon=True)
+        dispatcher.start()
+        if on_ready is not None:
+            on_ready()
+        try:
+            while True:
+                conn, _ = listener.accept()
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            with self.lock:
+                self.stopping = True
+                self.lock.notify_all()
+            listener.close()
+            self.socket_path.unlink(missing_ok=True)
+            pool.shutdown(cancel_futures=True)
+
+    def status(self) -> Message:
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "running": self.running,
+                "queued": {user: len(queue) for user, queue in self.queues.items()},
+                "completed": self.completed,
+                "deduplicated": self.deduplicated,
+            }
+
+    def _listen(self) -> socket.socket:
+        try:
+            self.allowed_uids |= {user_id(user) for user in self.allow_users}
+        except ValueError as error:
+            raise RuntimeError(str(error)) from None
+        if JudgeClient(self.socket_path).status() is not None:
+            raise RuntimeError(
+                f"A judge server is already listening on {self.socket_path}"
+            )
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        # Left behind by a server that did not shut down cleanly
+        self.socket_path.unlink(missing_ok=True)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Created owner-only, so nobody can connect before it is listening
+        umask = os.umask(0o177)
+        try:
+            listener.bind(str(self.socket_path))
+        finally:
+            os.umask(umask)
+        if len(self.allowed_uids) > 1:
+            # Other users can reach it, and _handle turns away any not allowed
+            os.chmod(self.socket_path, 0o666)
+        listener.listen()
+        return listener
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn:
+            try:
+                uid = peer_uid(conn)
+                if uid not in self.allowed_uids:
+                    raise ValueError(f"User {user_name(uid)} may not use this server")
+                request = receive_message(conn)
+                if request is None:
+                    return
+                kind = request.get("kind")
+                if kind == "status":
+                    reply = {"ok": True, "result": self.status()}
+                elif kind in JOB_KINDS:
+                    job = self._submit(kind, request, user_name(uid))
+                    reply = self._wait(conn, job)
+                else:
+                    reply = {"ok": False, "error": f"Unknown job kind {kind!r}"}
+            except (OSError, ValueError, KeyError, TypeError) as error:
+                reply = {"ok": False, "error": str(error)}
+            if reply is not None:
+                try:
+                    send_message(conn, reply)
+                except OSError:
+                    pass
+
+    def _submit(self, kind: str, request: Message, user: str) -> Job:
+        key = None
+        if kind == "compile":
+            # The compile cache's key covers the source, compiler, flags and
+            # template, so only builds that produce the same executable are
+            # shared; the ones returning its bytes are kept apart
+            build = BuildSettings(**request["build"])
+            source = decode_bytes(request["source"])
+            cache_key = CompileCache.make_key(
+                source, build.compiler, build.flags, build.template
+            )
+            key = (cache_key, bool(request["binary"]))
+        with self.lock:
+            job = self.compiling.get(key) if key is not None else None
+            if job is not None:
+                job.waiters += 1
+                self.deduplicated += 1
+                return job
+            job = Job(kind, request, user, key)
+            if key is not None:
+                self.compiling[key] = job
+            self.queues.setdefault(user, collections.deque()).append(job)
+            self.lock.notify_all()
+            return job
+
+    def _wait(self, conn: socket.socket, job: Job) -> Optional[Message]:
+        while not job.done.wait(POLL_INTERVAL):
+            # The client writes its one request and then only reads, so a
+            # readable socket means it hung up: cancelled, or gave up waiting
+            if select.select([conn], [], [], 0)[0]:
+                with self.lock:
+                    job.waiters -= 1
+                return None
+        return job.reply
+
+    def _dispatch(self, pool: ProcessPoolExecutor) -> None:
+        while True:
+            with self.lock:
+                job = None
+                while not self.stopping:
+                    if self.running < self.workers:
+                        job = self._next_job()
+                        if job is not None:
+                            break
+                    self.lock.wait()
+                if job is None:
+                    return
+                self.running += 1
+            future = pool.submit(_run_job, job.kind, job.request)
+            future.add_done_callback(lambda future, job=job: self._finish(job, future))
+
+    def _next_job(self) -> Optional[Job]:
+        # Users take turns: one user's hundred test cases queue behind
+        # everybody else's next job rather than in front of it
+        while self.queues:
+            user, queue = next(iter(self.queues.items()))
+            job = queue.popleft()
+            if queue:
+                self.queues.move_to_end(user)
+            else:
+                del self.queues[user]
+            if job.waiters > 0:
+                return job
+            self._forget(job)
+        return None
+
+    def _finish(self, job: Job, future: Future) -> None:
+        try:
+            if future.cancelled():
+                raise RuntimeError("The judge server is shutting down")
+            reply = {"ok": True, "result": future.result()}
+        except Exception as error:
+            reply = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+        with self.lock:
+            self.running -= 1
+            self.completed += 1
+            self._forget(job)
+            job.reply = reply
+            job.done.set()
+            self.lock.notify_all()
+
+    def _forget(self, job: Job) -> None:
+        if job.key is not None and self.compiling.get(job.key) is job:
+            del self.compiling[job.key]
+
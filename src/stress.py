@@ -0,0 +1,162 @@
+import dataclasses
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from .compare import CompareOptions, Mismatch, compare_streams
+from .contest import HELPER_TIME_FACTOR, ContestManager
+from .judge import Verdict, judge
+from .output import CapturedOutput
+from .process import CompileResult, Limits, ProcessResult
+
+EMPTY = CapturedOutput(data=b"")
+
+
+@dataclass
+class StressFailure:
+    seed: int
+    stage: str
+    input: CapturedOutput
+    expected: CapturedOutput
+    process: ProcessResult
+    verdict: Optional[Verdict] = None
+    mismatch: Optional[Mismatch] = None
+
+
+@dataclass
+class StressReport:
+    iterations: int
+    failure: Optional[StressFailure] = None
+
+
+class StressTester:
+    def __init__(
+        self,
+        manager: ContestManager,
+        solution_path: Path,
+        brute_path: Path,
+        generator_path: Path,
+        profile: Optional[str] = None,
+    ):
+        self.manager = manager
+        self.profile = profile
+        self.sources = {
+            "solution": solution_path,
+            "brute": brute_path,
+            "generator": generator_path,
+        }
+        self.executables: dict[str, Path] = {}
+
+    def compile(self) -> dict[str, CompileResult]:
+        compiled = self.manager.compile_all(list(self.sources.values()), self.profile)
+        results = dict(zip(self.sources, compiled))
+        self.executables = {
+            name: result.executable
+            for name, result in results.items()
+            if result.success
+        }
+        return results
+
+    def run(
+        self,
+        iterations: int,
+        limits: Limits,
+        options: Optional[CompareOptions] = None,
+        first_seed: int = 1,
+        workers: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> StressReport:
+        stop = threading.Event()
+        lock = threading.Lock()
+        completed = 0
+
+        def iteration(seed: int) -> Optional[StressFailure]:
+            nonlocal completed
+            if stop.is_set():
+                return None
+            failure = self._run_iteration(seed, limits, options)
+            if failure is not None:
+                stop.set()
+            with lock:
+                completed += 1
+                if on_progress is not None:
+                    on_progress(completed)
+            return failure
+
+        seeds = range(first_seed, first_seed + iterations)
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            failures = [f for f in pool.map(iteration, seeds) if f is not None]
+
+        if not failures:
+            return StressReport(completed)
+        return StressReport(completed, min(failures, key=lambda f: f.seed))
+
+    def _run_iteration(
+        self, seed: int, limits: Limits, options: Optional[CompareOptions]
+    ) -> Optional[StressFailure]:
+        helper_limits = dataclasses.replace(
+            limits, time=limits.time * HELPER_TIME_FACTOR
+        )
+        with tempfile.TemporaryDirectory(prefix="seepee-stress-") as workdir:
+            workdir = Path(workdir)
+            generated = self.manager.run_executable(
+                self.executables["generator"],
+                Path(os.devnull),
+                cwd=workdir,
+                limits=helper_limits,
+                args=[str(seed)],
+            )
+            if not generated.success or generated.timed_out:
+                return StressFailure(seed, "generator", EMPTY, EMPTY, generated)
+
+            input_path = workdir / "input.txt"
+            generated.captured_stdout.save(input_path)
+
+            brute = self.manager.run_executable(
+                self.executables["brute"],
+                input_path,
+                cwd=workdir,
+                limits=helper_limits,
+            )
+            if not brute.success or brute.timed_out:
+                return StressFailure(
+                    seed, "brute", generated.captured_stdout, EMPTY, brute
+                )
+
+            solution = self.manager.run_executable(
+                self.executables["solution"], input_path, cwd=workdir, limits=limits
+            )
+
+        mismatch = None
+        if solution.success:
+            with solution.captured_stdout.open() as actual:
+                with brute.captured_stdout.open() as expected:
+                    mismatch = compare_streams(actual, expected, options)
+        verdict = judge(solution, limits, solution.success and mismatch is None)
+        if verdict == Verdict.AC:
+            return None
+        return StressFailure(
+            seed,
+            "solution",
+            generated.captured_stdout,
+            brute.captured_stdout,
+            solution,
+            verdict,
+            mismatch,
+        )
+
+    def save_failure(
+        self, contest_dir: Path, problem: str, failure: StressFailure
+    ) -> Path:
+        tests_dir = contest_dir / self.manager.config.get_tests_dir_name(problem)
+        tests_dir.mkdir(parents=True, exist_ok=True)
+        name = f"stress-{failure.seed}"
+        input_path = tests_dir / self.manager.config.get_input_file_name(name)
+        output_path = tests_dir / self.manager.config.get_output_file_name(name)
+        failure.input.save(input_path)
+        failure.expected.save(output_path)
+        return input_path
@@ -0,0 +1,95 @@
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .compare import Mismatch
+from .diff import Diff
+from .judge import Verdict, describe_verdict
+from .output import DEFAULT_MEMORY_LIMIT, CapturedOutput
+from .process import ProcessResult
+from .testpack import PackedTest, TestPack
+
+
+@dataclass
+class TestCase:
+    name: str
+    # A packed test points both paths at its pack's data file
+    input_path: Path
+    output_path: Path
+    pack: Optional[TestPack] = None
+    packed: Optional[PackedTest] = None
+
+    @property
+    def input_size(self) -> int:
+        if self.packed is not None:
+            return self.packed.input.size
+        if not self.input_path.exists():
+            return 0
+        return self.input_path.stat().st_size
+
+    def input_feed(self) -> Optional[Iterator[memoryview]]:
+        if self.packed is None:
+            return None
+        return self.pack.chunks(self.packed.input)
+
+    def input_file(self, directory: Path) -> Path:
+        # Packed inputs are written out for programs that take a file name
+        if self.packed is None:
+            return self.input_path
+        path = directory / "input.txt"
+        with open(path, "wb") as f:
+            for chunk in self.input_feed():
+                f.write(chunk)
+        return path
+
+    def answer_file(self, directory: Path) -> Path:
+        if self.packed is None:
+            return self.output_path
+        path = directory / "answer.txt"
+        self.expected_output().save(path)
+        return path
+
+    def expected_output(
+        self, memory_limit: int = DEFAULT_MEMORY_LIMIT
+    ) -> CapturedOutput:
+        if self.packed is not None:
+            return self.pack.capture(self.packed.output, memory_limit)
+        return CapturedOutput.from_path(self.output_path)
+
+
+@dataclass
+class TestResult:
+    case: TestCase
+    process: ProcessResult
+    verdict: Verdict
+    expected: str
+    output: str
+    error: str
+    mismatch: Optional[Mismatch] = None
+    diff: Optional[Diff] = None
+    # What the checker printed about a rejected answer
+    comment: str = ""
+
+    @property
+    def passed(self) -> bool:
+        return self.verdict == Verdict.AC
+
+    @property
+    def success(self) -> bool:
+        return self.process.success
+
+    @property
+    def status(self) -> str:
+        if self.process.cancelled:
+            return self.process.exit_description
+        status = describe_verdict(self.verdict, self.process)
+        if self.verdict == Verdict.WA and self.mismatch is not None:
+            status += f" (line {self.mismatch.line}, column {self.mismatch.column})"
+        elif not self.passed and self.comment:
+            status += f" ({self.comment})"
+        return status
+
+
+def natural_key(name: str) -> list:
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
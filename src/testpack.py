@@ -0,0 +1,215 @@
+import bz2
+import contextlib
+import fcntl
+import json
+import lzma
+import mmap
+import os
+import tempfile
+import threading
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .output import DEFAULT_MEMORY_LIMIT, CapturedOutput
+
+DATA_NAME = "pack.dat"
+INDEX_NAME = "pack.idx"
+LOCK_NAME = "pack.lock"
+INDEX_VERSION = 1
+FEED_CHUNK_SIZE = 1 << 16
+
+DECOMPRESSORS: Dict[str, Callable[[], object]] = {
+    "zlib": zlib.decompressobj,
+    "bz2": bz2.BZ2Decompressor,
+    "lzma": lzma.LZMADecompressor,
+}
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "none": bytes,
+    "zlib": zlib.compress,
+    "bz2": bz2.compress,
+    "lzma": lzma.compress,
+}
+
+
+@dataclass
+class PackedBlob:
+    offset: int
+    length: int
+    size: int
+    codec: str = "none"
+
+
+@dataclass
+class PackedTest:
+    name: str
+    input: PackedBlob
+    output: PackedBlob
+
+
+class TestPack:
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.data_path = self.directory / DATA_NAME
+        self.index_path = self.directory / INDEX_NAME
+        self.lock_path = self.directory / LOCK_NAME
+        self._lock = threading.Lock()
+        self._map: Optional[mmap.mmap] = None
+        self._map_size = 0
+
+    def __del__(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._unmap()
+
+    def exists(self) -> bool:
+        return self.index_path.exists()
+
+    def tests(self) -> List[PackedTest]:
+        if not self.exists():
+            return []
+        index = json.loads(self.index_path.read_text())
+        return [
+            PackedTest(
+                entry["name"],
+                PackedBlob(**entry["input"]),
+                PackedBlob(**entry["output"]),
+            )
+            for entry in index["tests"]
+        ]
+
+    def append(
+        self,
+        name: Optional[str],
+        input_data: bytes,
+        output_data: bytes,
+        codec: str = "none",
+    ) -> PackedTest:
+        # A name of None takes the next free number, chosen under the lock so
+        # two appends at once do not pick the same one
+        if codec not in COMPRESSORS:
+            raise ValueError(f"Unknown compression '{codec}'")
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            tests = self.tests()
+            if name is None:
+                name = self._next_free_name(tests)
+            elif any(test.name == name for test in tests):
+                raise ValueError(f"Test '{name}' is already in {self.data_path}")
+
+            with open(self.data_path, "ab") as data:
+                blobs = []
+                for payload in (input_data, output_data):
+                    packed = COMPRESSORS[codec](payload)
+                    blobs.append(
+                        PackedBlob(data.tell(), len(packed), len(payload), codec)
+                    )
+                    data.write(packed)
+
+            # The index is replaced atomically, so a reader never sees an entry
+            # before its data has been written
+            test = PackedTest(name, *blobs)
+            tests.append(test)
+            tmp_path = self.index_path.with_name(f"{INDEX_NAME}.{os.getpid()}.tmp")
+            tmp_path.write_text(
+                json.dumps(
+                    {
+                        "version": INDEX_VERSION,
+                        "tests": [
+                            {
+                                "name": t.name,
+                                "input": asdict(t.input),
+                                "output": asdict(t.output),
+                            }
+                            for t in tests
+                        ],
+                    }
+                )
+            )
+            os.replace(tmp_path, self.index_path)
+        return test
+
+    def next_name(self) -> str:
+        return self._next_free_name(self.tests())
+
+    @staticmethod
+    def _next_free_name(tests: List[PackedTest]) -> str:
+        names = {test.name for test in tests}
+        number = len(names) + 1
+        while str(number) in names:
+            number += 1
+        return str(number)
+
+    def view(self, blob: PackedBlob) -> memoryview:
+        if blob.length == 0:
+            return memoryview(b"")
+        return self._mapped(blob.offset + blob.length)[
+            blob.offset : blob.offset + blob.length
+        ]
+
+    def chunks(self, blob: PackedBlob) -> Iterator[memoryview]:
+        view = self.view(blob)
+        if blob.codec == "none":
+            for start in range(0, len(view), FEED_CHUNK_SIZE):
+                yield view[start : start + FEED_CHUNK_SIZE]
+            return
+
+        decompressor = DECOMPRESSORS[blob.codec]()
+        for start in range(0, len(view), FEED_CHUNK_SIZE):
+            chunk = decompressor.decompress(view[start : start + FEED_CHUNK_SIZE])
+            if chunk:
+                yield memoryview(chunk)
+        flush = getattr(decompressor, "flush", None)
+        if flush is not None and (rest := flush()):
+            yield memoryview(rest)
+
+    def capture(
+        self, blob: PackedBlob, memory_limit: int = DEFAULT_MEMORY_LIMIT
+    ) -> CapturedOutput:
+        if blob.codec == "none":
+            return CapturedOutput(data=self.view(blob))
+        # Compressed data is inflated once so that it can be compared and
+        # previewed like a solution's output
+        with tempfile.NamedTemporaryFile(
+            prefix="seepee-output-", delete=False
+        ) as spill:
+            for chunk in self.chunks(blob):
+                spill.write(chunk)
+            return CapturedOutput.from_file(spill, Path(spill.name), memory_limit)
+
+    def _mapped(self, end: int) -> mmap.mmap:
+        # Appends grow the data file, so the map is refreshed when an entry
+        # lies past its end
+        with self._lock:
+            if self._map is None or self._map_size < end:
+                self._unmap()
+                with open(self.data_path, "rb") as data:
+                    size = os.fstat(data.fileno()).st_size
+                    self._map = mmap.mmap(data.fileno(), size, access=mmap.ACCESS_READ)
+                self._map_size = size
+            return self._map
+
+    def _unmap(self) -> None:
+        if self._map is None:
+            return
+        try:
+            self._map.close()
+        except BufferError:
+            # Views of it are still in use; it is unmapped once they are gone
+            pass
+        self._map = None
+        self._map_size = 0
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        # Appends come from any number of processes, such as iotest in two
+        # terminals or the TUI next to the CLI, so the data file and index
+        # are only written while holding the lock file
+        with self._lock:
+            with open(self.lock_path, "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                yield
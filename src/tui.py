@@ -8,6 +8,8 @@ from .screens.create import CreateContestScreen
 from .screens.run import RunProblemScreen
 from .screens.test import TestProblemScreen
 from .screens.iotest import IOTestScreen
+from .screens.profile import ProfileScreen
+from .screens.interactive import InteractiveScreen
 from .screens.config import ConfigScreen
 
 
@@ -73,6 +75,12 @@ class SeePeeTUI(App):
         margin: 0 0 1 0;
     }
 
+    Log {
+        width: 100%;
+        height: 12;
+        margin: 0 0 1 0;
+    }
+
     Label {
         margin: 1 0;
         padding: 0;
@@ -109,6 +117,8 @@ class SeePeeTUI(App):
         "run": RunProblemScreen,
         "test": TestProblemScreen,
         "iotest": IOTestScreen,
+        "profile": ProfileScreen,
+        "interact": InteractiveScreen,
         "config": ConfigScreen,
     }
 
@@ -0,0 +1,179 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from .config import Config
+
+DEBOUNCE_SECONDS = 0.2
+IDLE_TIMEOUT = 0.5
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_IGNORED = 0x8000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class _InotifyBackend:
+    name = "inotify"
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.watches: dict[int, Path] = {}
+
+    def add(self, directories: Iterable[Path]) -> None:
+        watched = set(self.watches.values())
+        for directory in directories:
+            if directory in watched or not directory.is_dir():
+                continue
+            wd = self.libc.inotify_add_watch(
+                self.fd, os.fsencode(directory), WATCH_MASK
+            )
+            if wd >= 0:
+                self.watches[wd] = directory
+
+    def poll(self, directories: Iterable[Path], timeout: float) -> set[Path]:
+        self.add(directories)
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        data = os.read(self.fd, 1 << 16)
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+            elif wd in self.watches and name:
+                changed.add(self.watches[wd] / os.fsdecode(name))
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _PollingBackend:
+    name = "polling"
+
+    def __init__(self):
+        self.snapshot: Optional[dict[Path, tuple[int, int]]] = None
+
+    def add(self, directories: Iterable[Path]) -> None:
+        if self.snapshot is None:
+            self.snapshot = self._scan(directories)
+
+    def poll(self, directories: Iterable[Path], timeout: float) -> set[Path]:
+        self.add(directories)
+        time.sleep(timeout)
+        snapshot = self._scan(directories)
+        changed = {
+            path
+            for path in snapshot.keys() | self.snapshot.keys()
+            if snapshot.get(path) != self.snapshot.get(path)
+        }
+        self.snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+    @staticmethod
+    def _scan(directories: Iterable[Path]) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for directory in directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                snapshot[directory / entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+
+class Watcher:
+    def __init__(
+        self,
+        directories: list[Path],
+        accept: Callable[[Path], bool],
+        debounce: float = DEBOUNCE_SECONDS,
+    ):
+        self.directories = directories
+        self.accept = accept
+        self.debounce = debounce
+        try:
+            self.backend = _InotifyBackend()
+        except (AttributeError, OSError, TypeError):
+            self.backend = _PollingBackend()
+        self.backend.add(directories)
+
+    @classmethod
+    def for_problem(cls, config: Config, contest_dir: Path, problem: str) -> "Watcher":
+        tests_dir = contest_dir / config.get_tests_dir_name(problem)
+        # A problem's checker and interactor judge its answers, so editing
+        # them changes the verdicts as much as editing the solution does
+        names = {
+            config.get_problem_file_name(problem),
+            config.get_checker_file_name(problem),
+            config.get_interactor_file_name(problem),
+            config.get_contest_config_name(),
+        }
+
+        def accept(path: Path) -> bool:
+            if path.parent == tests_dir or path.name in names:
+                return True
+            for kind in ("input", "output"):
+                name = config.parse_file_name(kind, path.name)
+                if name == problem or (name or "").startswith(f"{problem}."):
+                    return True
+            return False
+
+        return cls([contest_dir, tests_dir], accept)
+
+    @property
+    def backend_name(self) -> str:
+        return self.backend.name
+
+    def wait(self, stop: Optional[threading.Event] = None) -> set[Path]:
+        changed: set[Path] = set()
+        while not changed:
+            if stop is not None and stop.is_set():
+                return changed
+            changed = self._poll(IDLE_TIMEOUT)
+
+        # Editors often save in several steps; wait for the writes to settle
+        while True:
+            more = self._poll(self.debounce)
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self) -> None:
+        self.backend.close()
+
+    def _poll(self, timeout: float) -> set[Path]:
+        return {
+            path
+            for path in self.backend.poll(self.directories, timeout)
+            if self.accept(path)
+        }
@@ -0,0 +1,22 @@
+import shutil
+from pathlib import Path
+
+import pytest
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    # The shipped config and templates, with the cache kept inside the test
+    shutil.copytree(ROOT / "config", tmp_path / "config")
+    shutil.copytree(ROOT / "templates", tmp_path / "templates")
+    config_path = tmp_path / "config" / "config.yaml"
+    config = yaml.safe_load(config_path.read_text())
+    config["cache"] = {"dir": str(tmp_path / "cache")}
+    config["history"] = {"enabled": False}
+    config["pch"] = {"enabled": False}
+    config_path.write_text(yaml.safe_dump(config))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,56 @@
+import time
+
+from src.cache import CompileCache, _flush_all
+
+
+def build(cache, key, size):
+    path = cache.temp_path(key)
+    path.write_bytes(b"x" * size)
+    return cache.store(key, path)
+
+
+def test_key_covers_every_build_input():
+    base = (b"int main(){}", "g++", ["-O2"], "{compiler}")
+    key = CompileCache.make_key(*base)
+    assert key == CompileCache.make_key(*base)
+    for index, changed in enumerate(
+        (b"int main(){ }", "clang++", ["-O0"], "{compiler} {flags}")
+    ):
+        parts = list(base)
+        parts[index] = changed
+        assert CompileCache.make_key(*parts) != key
+
+
+def test_lookup_counts_are_written_at_flush(tmp_path):
+    cache = CompileCache(tmp_path, 1 << 20)
+    assert cache.lookup("a") is None
+    path = build(cache, "a", 10)
+    assert cache.lookup("a") == path
+
+    _flush_all()
+
+    stats = CompileCache(tmp_path, 1 << 20).stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_flush_without_pending_counts_touches_nothing(tmp_path):
+    cache = CompileCache(tmp_path / "cache", 1 << 20)
+    cache.flush()
+    assert not (tmp_path / "cache").exists()
+
+
+def test_eviction_drops_least_recently_used_but_spares_recent(tmp_path):
+    cache = CompileCache(tmp_path, 25)
+    old = build(cache, "old", 10)
+    recent = build(cache, "recent", 10)
+    # Only "old" is past the grace period
+    stale = time.time() - 2 * CompileCache.EVICT_GRACE
+    index = cache._load_index()
+    index["entries"]["old"]["last_used"] = stale
+    cache._save_index(index)
+
+    newest = build(cache, "newest", 10)
+
+    assert not old.exists()
+    assert recent.exists() and newest.exists()
+    assert cache.stats()["entries"] == 2
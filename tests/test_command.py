@@ -0,0 +1,103 @@
+import shlex
+from pathlib import Path
+
+import pytest
+
+from src.command import parse_template, split_words
+from src.config import Config
+
+COMPILE = "{compiler} {flags} {source} -o {executable}"
+RUN = "./{executable} < {input_file}"
+
+
+def test_split_words_splits_pasted_entries():
+    assert split_words(["-O2 -Wall", "-std=c++20"]) == ["-O2", "-Wall", "-std=c++20"]
+    assert split_words(["ccache g++"]) == ["ccache", "g++"]
+    assert split_words(['-DNAME="a b"']) == ["-DNAME=a b"]
+    # An unbalanced quote is kept as it was written
+    assert split_words(['-D"x']) == ['-D"x']
+
+
+def test_compile_template_matches_the_baseline_command_line():
+    flags = ["-Wall", "-Wextra", "-std=c++20"]
+    command = parse_template(COMPILE).render(
+        {
+            "compiler": split_words(["g++"]),
+            "flags": split_words(flags),
+            "source": "A.cpp",
+            "executable": "A",
+        }
+    )
+    baseline = COMPILE.format(
+        compiler="g++", flags=" ".join(flags), source="A.cpp", executable="A"
+    )
+    assert not command.uses_shell
+    assert command.argv == shlex.split(baseline)
+    assert command.stdin is None
+
+
+def test_list_values_keep_spaces_inside_words():
+    command = parse_template(COMPILE).render(
+        {
+            "compiler": ["g++"],
+            "flags": ["-DNAME=a b"],
+            "source": "my file.cpp",
+            "executable": "my file",
+        }
+    )
+    assert command.argv == ["g++", "-DNAME=a b", "my file.cpp", "-o", "my file"]
+
+
+def test_run_template_reads_stdin_without_a_shell():
+    command = parse_template(RUN).render({"executable": "A", "input_file": "A.txt"})
+    assert not command.uses_shell
+    assert command.argv == ["./A"]
+    assert command.stdin == Path("A.txt")
+    assert str(command) == RUN.format(executable="A", input_file="A.txt")
+
+
+def test_extra_args_follow_their_placeholder():
+    command = parse_template(RUN).render(
+        {"executable": "A", "input_file": "A.txt"},
+        append_to="executable",
+        extra_args=["1", "two words"],
+    )
+    assert command.argv == ["./A", "1", "two words"]
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "./{executable} < {input_file} | tee log",
+        "./{executable} < {input_file} > out.txt",
+        "ulimit -s unlimited && ./{executable} < {input_file}",
+        "./{executable} $ARGS < {input_file}",
+        "TIME=1 ./{executable} < {input_file}",
+        "./{executable} < {input_file} < other.txt",
+        "./{executable} 'unbalanced < {input_file}",
+    ],
+)
+def test_shell_syntax_falls_back_to_the_baseline_string(template):
+    command = parse_template(template).render(
+        {"executable": "A", "input_file": "A.txt"}
+    )
+    assert command.uses_shell
+    assert command.shell == template.format(executable="A", input_file="A.txt")
+
+
+def test_shell_fallback_quotes_extra_args():
+    command = parse_template("./{executable} < {input_file} | cat").render(
+        {"executable": "A", "input_file": "A.txt"},
+        append_to="executable",
+        extra_args=["two words"],
+    )
+    assert command.shell == "./A 'two words' < A.txt | cat"
+
+
+def test_config_builds_commands_from_the_shipped_templates(workspace):
+    config = Config()
+    compile_command = config.get_compile_command("A.cpp", "A")
+    assert compile_command.argv[0] == config.get_compiler()
+    assert compile_command.argv[-3:] == ["A.cpp", "-o", "A"]
+    run_command = config.get_run_command("A", "A.txt", ["7"])
+    assert (run_command.argv, run_command.stdin) == (["./A", "7"], Path("A.txt"))
@@ -0,0 +1,91 @@
+import io
+
+import pytest
+
+from src import compare
+from src.compare import CompareMode, CompareOptions, compare_streams
+
+
+def check(actual, expected, mode=CompareMode.EXACT, **options):
+    return compare_streams(
+        io.BytesIO(actual), io.BytesIO(expected), CompareOptions(mode, **options)
+    )
+
+
+def baseline_equal(actual, expected):
+    # What output checking did before the compare modes existed
+    return actual.strip().splitlines() == expected.strip().splitlines()
+
+
+@pytest.mark.parametrize(
+    "actual, expected",
+    [
+        ("1 2\n3\n", "1 2\n3\n"),
+        ("1 2\n3", "1 2\n3\n\n"),
+        ("\n  1 2\n3\n", "1 2\n3\n"),
+        ("1 2\r\n3\r\n", "1 2\n3\n"),
+        ("1 2\n3\n", "1 2\n4\n"),
+        ("1  2\n3\n", "1 2\n3\n"),
+        ("1 2 \n3\n", "1 2\n3\n"),
+        ("1 2\n\n3\n", "1 2\n3\n"),
+        ("", "1\n"),
+        ("", ""),
+    ],
+)
+def test_exact_mode_matches_baseline(actual, expected):
+    mismatch = check(actual.encode(), expected.encode())
+    assert (mismatch is None) == baseline_equal(actual, expected)
+
+
+def test_exact_mismatch_position():
+    mismatch = check(b"1 2\n3 5\n", b"1 2\n3 4\n")
+    assert (mismatch.line, mismatch.column, mismatch.offset) == (2, 3, 6)
+    assert (mismatch.expected, mismatch.actual) == ("4", "5")
+
+
+def test_exact_mismatch_at_end_of_output():
+    mismatch = check(b"1 2\n", b"1 2\n3\n")
+    assert mismatch.actual == compare.END_OF_OUTPUT
+    assert mismatch.expected == "3"
+
+
+def test_tokens_mode_ignores_layout():
+    assert check(b"1   2\n\n3", b"1 2 3\n", CompareMode.TOKENS) is None
+    mismatch = check(b"1 2\n4\n", b"1 2\n3\n", CompareMode.TOKENS)
+    assert (mismatch.line, mismatch.column) == (2, 1)
+    assert (mismatch.expected, mismatch.actual) == ("3", "4")
+
+
+def test_whitespace_mode_keeps_line_breaks():
+    assert check(b"1   2 \n\n3\n", b"1 2\n3", CompareMode.WHITESPACE) is None
+    mismatch = check(b"1 2 3\n", b"1 2\n3\n", CompareMode.WHITESPACE)
+    assert (mismatch.expected, mismatch.actual) == ("<end of line>", "3")
+
+
+@pytest.mark.parametrize(
+    "actual, expected, abs_eps, rel_eps, matches",
+    [
+        (b"0.3333333", b"0.333333333", 1e-6, 1e-6, True),
+        (b"0.334", b"0.333", 1e-6, 1e-6, False),
+        (b"0.334", b"0.333", 1e-2, 0.0, True),
+        (b"1000001", b"1000000", 0.0, 1e-5, True),
+        (b"1000001", b"1000000", 0.0, 1e-7, False),
+        (b"yes", b"yes", 1e-6, 1e-6, True),
+        (b"no", b"yes", 1e-6, 1e-6, False),
+    ],
+)
+def test_float_mode_tolerances(actual, expected, abs_eps, rel_eps, matches):
+    mismatch = check(
+        actual, expected, CompareMode.FLOAT, abs_eps=abs_eps, rel_eps=rel_eps
+    )
+    assert (mismatch is None) == matches
+
+
+def test_long_outputs_compare_across_chunks(monkeypatch):
+    monkeypatch.setattr(compare, "CHUNK_SIZE", 7)
+    expected = b"".join(b"%d\n" % n for n in range(200))
+    actual = expected.replace(b"\n150\n", b"\n151\n")
+    for mode in CompareMode:
+        assert check(expected, expected, mode) is None
+        mismatch = check(actual, expected, mode)
+        assert (mismatch.line, mismatch.column) == (151, 3 if mode == "exact" else 1)
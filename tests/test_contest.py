@@ -0,0 +1,67 @@
+
+from src.contest import ContestManager, local_includes
+from src.process import CompileResult
+
+
+class RecordingClient:
+    def __init__(self):
+        self.compiled = []
+
+    def compile(self, name, source, build, with_binary, cancel=None):
+        self.compiled.append(name)
+        return CompileResult(None, "compiled remotely", 0.0), None
+
+
+def test_template_source_compiles_remotely(workspace):
+    manager = ContestManager()
+    manager.remote = RecordingClient()
+    contest_dir = manager.create_contest_dir("1000")
+    manager.create_problem_files(contest_dir, ["A"])
+
+    compiled = manager.compile(contest_dir / "A.cpp")
+
+    assert manager.remote.compiled == ["A.cpp"]
+    assert compiled.error == "compiled remotely"
+
+
+def test_source_with_own_header_compiles_locally(workspace):
+    manager = ContestManager()
+    manager.remote = RecordingClient()
+    source = workspace / "A.cpp"
+    (workspace / "util.h").write_text("#pragma once\n")
+    source.write_text('#include "util.h"\nint main() {}\n')
+
+    manager.compile(source)
+
+    assert manager.remote.compiled == []
+
+
+def test_local_includes_follows_nested_headers(workspace):
+    (workspace / "lib").mkdir()
+    (workspace / "lib" / "a.h").write_text('#include "b.h"\n')
+    (workspace / "lib" / "b.h").write_text('#include "bits/stdc++.h"\n')
+    source = workspace / "A.cpp"
+    source.write_bytes(b'#include "lib/a.h"\n#include "bits/stdc++.h"\n')
+
+    found = local_includes(source, source.read_bytes())
+
+    assert found == [
+        (workspace / "lib" / "a.h").resolve(),
+        (workspace / "lib" / "b.h").resolve(),
+    ]
+
+
+def test_editing_own_header_rebuilds(workspace):
+    manager = ContestManager(use_server=False)
+    header = workspace / "value.h"
+    source = workspace / "A.cpp"
+    header.write_text("#define VALUE 1\n")
+    source.write_text('#include "value.h"\nint main() { return VALUE; }\n')
+    first = manager.compile(source)
+
+    header.write_text("#define VALUE 2\n")
+    second = manager.compile(source)
+
+    assert first.success and second.success
+    assert not second.cached
+    assert second.executable != first.executable
@@ -0,0 +1,35 @@
+from src.history import RunHistory, RunRecord
+
+
+def make_record(source_hash, cpu_time):
+    return RunRecord(
+        contest="/contest",
+        problem="A",
+        test="A.txt",
+        source_hash=source_hash,
+        flags="-O2",
+        profile=None,
+        verdict="AC",
+        wall_time=cpu_time,
+        cpu_time=cpu_time,
+        max_rss_kb=1024,
+    )
+
+
+def test_latest_comparison_flags_slower_version(tmp_path):
+    history = RunHistory(tmp_path / "history.sqlite3")
+    assert history.record([make_record("old", 0.1)])
+    assert history.record([make_record("new", 0.5)])
+
+    comparison = history.latest_comparison("/contest", "A", 0.2, 0.005)
+
+    assert comparison is not None and comparison.regressed
+
+
+def test_unreadable_database_reports_nothing(tmp_path):
+    path = tmp_path / "history.sqlite3"
+    path.write_bytes(b"not a database" * 100)
+    history = RunHistory(path)
+
+    assert history.record([make_record("new", 0.5)]) is False
+    assert history.latest_comparison("/contest", "A", 0.2, 0.005) is None
@@ -0,0 +1,117 @@
+import signal
+
+import pytest
+
+from src import testcases
+from src.contest import ContestManager
+from src.judge import REJECT_CODES, Verdict, describe_verdict, judge
+from src.output import CapturedOutput
+from src.process import CompileResult, Limits, ProcessResult
+
+LIMITS = Limits(time=1.0, memory=256)
+
+
+def process(returncode=0, cpu_time=0.1, max_rss_kb=1024, stderr=b"", **fields):
+    return ProcessResult(
+        CapturedOutput(data=b""),
+        CapturedOutput(data=stderr),
+        returncode,
+        wall_time=cpu_time,
+        user_time=cpu_time,
+        max_rss_kb=max_rss_kb,
+        **fields,
+    )
+
+
+@pytest.mark.parametrize("matches, verdict", [(True, Verdict.AC), (False, Verdict.WA)])
+def test_clean_exit_is_judged_by_its_output(matches, verdict):
+    assert judge(process(), LIMITS, matches) == verdict
+
+
+@pytest.mark.parametrize(
+    "result",
+    [
+        process(cpu_time=1.5),
+        process(timed_out=True),
+        process(returncode=-signal.SIGXCPU),
+        process(returncode=128 + signal.SIGXCPU),
+    ],
+)
+def test_time_limit(result):
+    assert judge(result, LIMITS, matches=True) == Verdict.TLE
+
+
+@pytest.mark.parametrize(
+    "result",
+    [
+        process(max_rss_kb=257 * 1024),
+        process(returncode=-signal.SIGABRT, stderr=b"what():  std::bad_alloc\n"),
+        process(returncode=1, stderr=b"mmap: Cannot allocate memory"),
+    ],
+)
+def test_memory_limit(result):
+    assert judge(result, LIMITS, matches=True) == Verdict.MLE
+
+
+@pytest.mark.parametrize("returncode", [1, -signal.SIGSEGV, 128 + signal.SIGFPE])
+def test_runtime_error_outranks_the_output(returncode):
+    result = process(returncode=returncode, stderr=b"some other failure")
+    assert judge(result, LIMITS, matches=True) == Verdict.RE
+
+
+def test_time_limit_outranks_memory_and_crashes():
+    result = process(returncode=-signal.SIGKILL, cpu_time=2.0, max_rss_kb=1 << 30)
+    assert judge(result, LIMITS, matches=False) == Verdict.TLE
+
+
+def script(path, body):
+    path.write_text(f"#!/bin/sh\n{body}\n")
+    path.chmod(0o755)
+    return path
+
+
+@pytest.mark.parametrize(
+    "exit_code, verdict",
+    [
+        (0, Verdict.AC),
+        *((code, Verdict.WA) for code in REJECT_CODES),
+        (3, Verdict.FAIL),
+    ],
+)
+def test_checker_exit_codes(workspace, exit_code, verdict):
+    manager = ContestManager(use_server=False)
+    solution = script(workspace / "solution", "echo 42")
+    checker = script(workspace / "checker", f"echo note >&2; exit {exit_code}")
+    (workspace / "1.txt").write_text("")
+    (workspace / "1_out.txt").write_text("7\n")
+    case = testcases.TestCase("1", workspace / "1.txt", workspace / "1_out.txt")
+
+    result = manager.run_test_case(
+        solution, case, LIMITS, checker=CompileResult(checker, "", 0.0)
+    )
+    assert result.verdict == verdict
+    if verdict != Verdict.FAIL:
+        assert result.comment == "note"
+
+
+def test_output_is_compared_without_a_checker(workspace):
+    manager = ContestManager(use_server=False)
+    (workspace / "1.txt").write_text("")
+    (workspace / "1_out.txt").write_text("42\n")
+    case = testcases.TestCase("1", workspace / "1.txt", workspace / "1_out.txt")
+
+    for body, verdict in [
+        ("echo 42", Verdict.AC),
+        ("echo 41", Verdict.WA),
+        ("echo 42; exit 3", Verdict.RE),
+    ]:
+        solution = script(workspace / "solution", body)
+        assert manager.run_test_case(solution, case, LIMITS).verdict == verdict
+
+
+def test_describe_verdict():
+    assert describe_verdict(Verdict.AC) == "AC Accepted"
+    assert describe_verdict(Verdict.WA, process(returncode=1)) == "WA Wrong Answer"
+    described = describe_verdict(Verdict.RE, process(returncode=-signal.SIGSEGV))
+    assert described.startswith("RE Runtime Error (")
+    assert "SIGSEGV" in described
@@ -0,0 +1,55 @@
+import multiprocessing
+
+import pytest
+
+from src import testpack
+
+
+def read(pack, blob):
+    return b"".join(bytes(chunk) for chunk in pack.chunks(blob))
+
+
+@pytest.mark.parametrize("codec", ["none", "zlib", "bz2", "lzma"])
+def test_append_round_trip(tmp_path, codec):
+    pack = testpack.TestPack(tmp_path)
+    pack.append("1", b"1 2\n", b"3\n", codec)
+    pack.append(None, b"", b"0\n", codec)
+
+    reopened = testpack.TestPack(tmp_path)
+    tests = reopened.tests()
+    assert [test.name for test in tests] == ["1", "2"]
+    assert read(reopened, tests[0].input) == b"1 2\n"
+    assert read(reopened, tests[0].output) == b"3\n"
+    assert read(reopened, tests[1].input) == b""
+    reopened.close()
+
+
+def test_duplicate_name_is_rejected(tmp_path):
+    pack = testpack.TestPack(tmp_path)
+    pack.append("1", b"a\n", b"b\n")
+    with pytest.raises(ValueError):
+        pack.append("1", b"c\n", b"d\n")
+
+
+def _append_many(directory, worker):
+    pack = testpack.TestPack(directory)
+    for number in range(20):
+        pack.append(None, f"{worker} {number}\n".encode(), b"ok\n")
+
+
+def test_concurrent_appends_keep_every_test(tmp_path):
+    processes = [
+        multiprocessing.Process(target=_append_many, args=(tmp_path, worker))
+        for worker in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    pack = testpack.TestPack(tmp_path)
+    tests = pack.tests()
+    assert len(tests) == 80
+    assert len({test.name for test in tests}) == 80
+    inputs = {read(pack, test.input) for test in tests}
+    assert inputs == {f"{w} {n}\n".encode() for w in range(4) for n in range(20)}